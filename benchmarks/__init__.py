@@ -0,0 +1,16 @@
+# benchmarks
+"""Benchmarks of sparc.
+
+Run the benchmark suite from the repository root with
+
+    python -m benchmarks run --output results.json
+    python -m benchmarks compare base.json results.json
+
+or a single benchmark as a module, e.g.
+
+    python -m benchmarks.locking
+
+The GUI benchmarks need PyQt5 and run without a display:
+
+    python -m benchmarks.gui --output gui.json
+"""
@@ -0,0 +1,71 @@
+# __main__.py
+"""Command line runner of the benchmark suite.
+
+Usage:
+
+    python -m benchmarks run [--trees wide deep] [--sizes 100 1000] [--output results.json]
+    python -m benchmarks compare base.json new.json [--threshold 0.1]
+
+``compare`` exits with status 1 if any benchmark regressed.
+"""
+
+# system modules
+import sys
+import json
+import argparse
+
+# sparc modules
+from .suite import BENCHMARKS, run, compare
+from .trees import TREES
+
+
+def print_result(result):
+    ops_per_sec = result['ops_per_sec']
+    rate = f'{ops_per_sec:14.0f}' if ops_per_sec else f'{"-":>14}'
+    print(f'{result["benchmark"]:<12} {result["tree"]:<12} {result["size"]:>8} {rate} '
+          f'{result["peak_bytes"] / 1024:>12.1f}', flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='sparc benchmarks')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    parser_run = commands.add_parser('run', help='run benchmarks')
+    parser_run.add_argument('--trees', nargs='+', choices=list(TREES))
+    parser_run.add_argument('--sizes', nargs='+', type=int, default=[100, 1000])
+    parser_run.add_argument('--benchmarks', nargs='+', choices=list(BENCHMARKS))
+    parser_run.add_argument('--repeat', type=int, default=3)
+    parser_run.add_argument('--output', help='the JSON result file')
+
+    parser_compare = commands.add_parser('compare', help='compare two JSON result files')
+    parser_compare.add_argument('base')
+    parser_compare.add_argument('new')
+    parser_compare.add_argument('--threshold', type=float, default=0.1,
+                                help='relative change that counts as a regression')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        print(f'{"benchmark":<12} {"tree":<12} {"size":>8} {"ops/s":>14} {"peak KiB":>12}')
+        results = run(args.trees, args.sizes, args.benchmarks, args.repeat, log=print_result)
+        if args.output:
+            with open(args.output, 'w') as fp:
+                json.dump(results, fp, indent=2)
+        return 0
+
+    with open(args.base) as fp:
+        base = json.load(fp)
+    with open(args.new) as fp:
+        new = json.load(fp)
+    print(f'base {base["meta"]["commit"]}, new {new["meta"]["commit"]}')
+    print(f'{"benchmark":<12} {"tree":<12} {"size":>8} {"speed":>8} {"memory":>8}')
+    regressions = 0
+    for (benchmark, tree, size), speed, memory, regression in compare(base, new, args.threshold):
+        regressions += regression
+        flag = '  REGRESSION' if regression else ''
+        print(f'{benchmark:<12} {tree:<12} {size:>8} {speed:>7.2f}x {memory:>7.2f}x{flag}')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
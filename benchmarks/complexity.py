@@ -0,0 +1,265 @@
+# complexity.py
+"""Checks how the run time of core tree operations grows with the tree size.
+
+Every operation is timed for geometrically growing sizes N. The growth
+exponent k of ``time ~ N**k`` is fitted on a log-log scale and compared
+with the declared complexity of the operation, e.g. building a tree of
+N children must be O(N), i.e. k = 1, and looking up a fixed number of
+children by name must not depend on N, i.e. k = 0. An operation fails
+if its exponent exceeds the declared one by more than a tolerance, which
+catches accidental O(N**2) behavior.
+
+Usage:
+
+    python -m benchmarks.complexity [--sizes 1000 2000 4000 8000 16000] [--tolerance 0.4]
+
+The command exits with status 1 if any operation fails.
+"""
+
+# system modules
+import gc
+import sys
+import math
+import time
+import argparse
+from collections import namedtuple
+
+# sparc modules
+from sparc.core import ParamNode, ParamGroupNode, dumps, loads
+
+__all__ = ['OPERATIONS', 'Operation', 'fit_exponent', 'check']
+
+
+# the number of accessed nodes of operations with a fixed amount of work
+SAMPLE = 200
+
+
+Operation = namedtuple('Operation', ['name', 'exponent', 'setup'])
+Result = namedtuple('Result', ['name', 'exponent', 'fitted', 'times', 'passed'])
+
+
+def wide(size):
+    root = ParamGroupNode('root')
+    for i in range(size):
+        root.add_child(ParamNode(f'x{i}', float(i), float))
+    return root
+
+
+def chain(size):
+    """Returns the deepest node of a chain of *size* nested groups."""
+    node = ParamGroupNode('root')
+    for i in range(size):
+        node = node.add_child(ParamGroupNode(f'g{i}'))
+    return node
+
+
+def sample(root):
+    nodes = list(root.iter_children())
+    step = max(1, len(nodes) // SAMPLE)
+    return nodes[::step][:SAMPLE]
+
+
+def setup_add_child(size):
+    nodes = [ParamNode(f'x{i}', float(i), float) for i in range(size)]
+
+    def add_child():
+        root = ParamGroupNode('root')
+        for node in nodes:
+            root.add_child(node)
+    return add_child
+
+
+def setup_child(size):
+    root = wide(size)
+    names = [node.name() for node in sample(root)]
+
+    def child():
+        for name in names:
+            root.child(name)
+    return child
+
+
+def setup_index(size):
+    nodes = sample(wide(size))
+
+    def index():
+        for node in nodes:
+            node.index()
+    return index
+
+
+def setup_index_after_insert(size):
+    root = wide(size)
+    nodes = list(root.iter_children())
+    middle = ParamNode('middle', 0.0, float)
+
+    def index_after_insert():
+        # the positions of the second half are stale after the insertion and after the removal
+        root.insert_child(size // 2, middle)
+        for node in nodes:
+            node.index()
+        root.remove_child(middle)
+        for node in nodes:
+            node.index()
+    return index_after_insert
+
+
+def setup_absolute_name(size):
+    node = chain(size)
+
+    def absolute_name():
+        node.absolute_name()
+    return absolute_name
+
+
+def setup_child_count(size):
+    root = ParamGroupNode('root')
+    for i in range(0, size, 10):
+        group = root.add_child(ParamGroupNode(f'g{i}'))
+        for j in range(9):
+            group.add_child(ParamNode(f'x{j}', float(j), float))
+
+    def child_count():
+        root.child_count(recursive=True)
+    return child_count
+
+
+def setup_dumps(size):
+    root = wide(size)
+
+    def dump():
+        dumps(root)
+    return dump
+
+
+def setup_loads(size):
+    s = dumps(wide(size))
+
+    def load():
+        loads(s)
+    return load
+
+
+def setup_expression(size):
+    # expressions refer to two of many siblings
+    root = wide(size)
+    nodes = [root.add_child(ParamNode(f'e{i}', f'=x0+x{size - 1}')) for i in range(SAMPLE)]
+
+    def expression():
+        for node in nodes:
+            node.value()
+    return expression
+
+
+OPERATIONS = [
+    Operation('add_child', 1, setup_add_child),
+    Operation('child(name)', 0, setup_child),
+    Operation('index()', 0, setup_index),
+    Operation('index() after insert', 1, setup_index_after_insert),
+    Operation('absolute_name', 1, setup_absolute_name),
+    Operation('child_count(recursive)', 1, setup_child_count),
+    Operation('dumps', 1, setup_dumps),
+    Operation('loads', 1, setup_loads),
+    Operation('expression', 0, setup_expression),
+]
+
+
+def timeit(func, repeat=3, min_time=0.02):
+    """Returns the fastest time of calling *func* in seconds.
+
+    The garbage collector is disabled while timing, as in the timeit module.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return _timeit(func, repeat, min_time)
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _timeit(func, repeat, min_time):
+    calls = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(calls):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        calls *= 2
+
+    best = elapsed
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(calls):
+            func()
+        best = min(best, time.perf_counter() - start)
+    return best / calls
+
+
+def fit_exponent(sizes, times):
+    """Returns the slope of the least squares line through the log-log points."""
+    xs = [math.log(size) for size in sizes]
+    ys = [math.log(t) for t in times]
+    x_mean = sum(xs) / len(xs)
+    y_mean = sum(ys) / len(ys)
+    covariance = sum((x - x_mean) * (y - y_mean) for x, y in zip(xs, ys))
+    variance = sum((x - x_mean) ** 2 for x in xs)
+    return covariance / variance
+
+
+def check(operations=None, sizes=(1000, 2000, 4000, 8000, 16000), tolerance=0.4, log=None):
+    """Times the operations for all sizes and compares the fitted with the declared exponents.
+
+    Parameters
+    ----------
+    operations: list or None
+        A list of ``Operation`` tuples. None checks all ``OPERATIONS``.
+    sizes: list
+        At least two sizes.
+    tolerance: float
+        The maximum difference of the fitted and the declared exponent.
+    log: callable or None
+        Called with every ``Result``.
+
+    Returns
+    -------
+    list:
+        A list of ``Result`` tuples.
+    """
+    results = []
+    for operation in operations or OPERATIONS:
+        times = [timeit(operation.setup(size)) for size in sizes]
+        fitted = fit_exponent(sizes, times)
+        result = Result(operation.name, operation.exponent, fitted, times,
+                        fitted <= operation.exponent + tolerance)
+        results.append(result)
+        if log is not None:
+            log(result)
+    return results
+
+
+def print_result(result):
+    status = 'ok' if result.passed else 'FAILED'
+    times = ' '.join(f'{t * 1000:9.3f}' for t in result.times)
+    print(f'{result.name:<24} {result.exponent:>8} {result.fitted:>8.2f} {times}  {status}', flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 2000, 4000, 8000, 16000])
+    parser.add_argument('--tolerance', type=float, default=0.4)
+    parser.add_argument('--operations', nargs='+', choices=[operation.name for operation in OPERATIONS])
+    args = parser.parse_args(argv)
+
+    operations = [operation for operation in OPERATIONS
+                  if args.operations is None or operation.name in args.operations]
+    sizes = ' '.join(f'{size:>9}' for size in args.sizes)
+    print(f'{"operation":<24} {"declared":>8} {"fitted":>8} {sizes}  (ms)')
+    results = check(operations, args.sizes, args.tolerance, log=print_result)
+    return 0 if all(result.passed for result in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
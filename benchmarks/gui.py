@@ -0,0 +1,432 @@
+# gui.py
+"""Benchmarks of the model, proxy and delegate of a ``QTreeView``.
+
+Runs without a display on the offscreen Qt platform. Every scenario
+builds a view of a synthetic tree (see ``trees.TREES``) and simulates
+what a user does with it, processing events and repainting the view
+after every step. The frame time of a step is the time from the user
+action to the repainted view:
+
+- scroll: pages through the whole tree, which fetches the rows lazily,
+- expand: expands groups one by one,
+- edit: creates an editor for a value, sets its data and writes it back,
+- bulk: sets many values in one event loop iteration,
+- patch: patches the model with a tree where every tenth top level node
+  was removed and with the whole tree again,
+- filter: types a filter pattern into a ``ParamFilterProxyModel``.
+
+Scenarios repeat their steps until they recorded at least ``MIN_FRAMES``
+frames, so that the 95th percentile of the frame times is meaningful,
+except for trees that fit into the view without scrolling or have no groups.
+
+The cases of ``LARGE`` run once in addition to the given sizes, e.g. the
+filter scenario of a wide tree with 10^6 nodes, where every keystroke
+must only fetch the rows of the first matches.
+
+For every scenario, tree kind and size the results contain the number of
+``data`` calls of the model, the frame times, the steps per second and
+the peak of memory allocated by Python during a separate run with
+``tracemalloc``. The results have the format of ``suite.run``, so that
+two runs can be compared with ``python -m benchmarks compare``.
+
+With ``--check``, ``QAbstractItemModelTester`` checks the signals and
+invariants of the model and the proxy during all steps and aborts at the
+first violation, which turns the benchmark into a stress test. The tester
+walks the whole model after every change, so checked runs are slow and
+should use small sizes, e.g. ``--sizes 100``.
+
+Usage:
+
+    python -m benchmarks.gui [--trees wide deep] [--sizes 1000 100000] [--scenarios scroll edit]
+                             [--repeat 3] [--check] [--no-large] [--output gui.json]
+"""
+
+# system modules
+import os
+import math
+import itertools
+import sys
+import gc
+import time
+import json
+import argparse
+import statistics
+import tracemalloc
+
+# render into memory buffers, must be set before the QApplication is created
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+# Qt modules
+from PyQt5 import QtCore, QtWidgets
+
+try:
+    from PyQt5.QtTest import QAbstractItemModelTester
+    HAVE_TESTER = True
+except ImportError:  # Qt < 5.11
+    HAVE_TESTER = False
+
+# sparc modules
+from sparc.core import ParamNode
+from sparc.gui import ParamModel, ParamDelegate, ParamFilterProxyModel
+from .suite import metadata
+from .trees import TREES
+
+__all__ = ['SCENARIOS', 'LARGE', 'CountingModel', 'Harness', 'run']
+
+
+# the maximum number of frames of a scenario
+FRAMES = 200
+
+# the minimum number of frames of a scenario, scenarios with fewer steps repeat them
+MIN_FRAMES = 40
+
+# the size of the view in pixels
+WIDTH, HEIGHT = 800, 600
+
+# every STEP-th node is changed by the bulk and patch scenarios
+STEP = 10
+
+# the keystrokes of the filter scenario, the empty pattern shows all rows again
+PATTERNS = ['x', 'x1', 'x12', 'x123', 'x12', 'x1', 'x', '']
+
+# the (scenario, tree kind, size) cases that run once in addition to the sizes
+LARGE = [('filter', 'wide', 10 ** 6)]
+
+
+class CountingModel(ParamModel):
+    """A ParamModel that counts the calls of ``data``."""
+
+    def __init__(self, root=None, parent=None):
+        ParamModel.__init__(self, root, parent)
+        self.calls = 0
+
+    def data(self, index, role=None):
+        self.calls += 1
+        return ParamModel.data(self, index, role)
+
+
+class Harness(object):
+    """A tree view of a synthetic tree that records the times of its frames."""
+
+    def __init__(self, kind, size, proxy=False, check=False, asyncEvaluation=False):
+        """Initializes a new Harness.
+
+        Parameters
+        ----------
+        kind: str
+            The tree kind, see ``TREES``.
+        size: int
+        proxy: bool
+            Whether the view shows the model through a ``ParamFilterProxyModel``.
+        check: bool
+            Whether the models are checked with ``QAbstractItemModelTester``.
+        asyncEvaluation: bool
+            Whether the model evaluates slow values in the background.
+        """
+        self.kind = kind
+        self.size = size
+        self.model = CountingModel(TREES[kind](size))
+        self.model.setAsyncEvaluation(asyncEvaluation)
+        self.proxy = None
+        self.view = QtWidgets.QTreeView()
+        self.view.setUniformRowHeights(True)
+        self.view.setItemDelegate(ParamDelegate(self.view))
+        if proxy:
+            self.proxy = ParamFilterProxyModel()
+            self.proxy.setSourceModel(self.model)
+            self.view.setModel(self.proxy)
+        else:
+            self.view.setModel(self.model)
+
+        self.testers = []
+        if check:
+            if not HAVE_TESTER:
+                raise RuntimeError('--check requires QAbstractItemModelTester of Qt 5.11 or newer')
+            mode = QAbstractItemModelTester.FailureReportingMode.Fatal
+            for model in (self.model, self.proxy):
+                if model is not None:
+                    self.testers.append(QAbstractItemModelTester(model, mode))
+
+        self.view.resize(WIDTH, HEIGHT)
+        self.view.show()
+        QtWidgets.QApplication.processEvents()
+        self.model.calls = 0
+        self.frames = []
+        self.peak = 0  # bytes, see measure()
+
+    def close(self):
+        self.view.close()
+        self.view.deleteLater()
+        # processEvents does not delete the view, it must be deleted before its models
+        QtWidgets.QApplication.sendPostedEvents(None, QtCore.QEvent.DeferredDelete)
+        QtWidgets.QApplication.processEvents()
+        self.testers = []
+
+    def frame(self, start=None):
+        """Processes the pending events, e.g. coalesced signals, and repaints the view.
+
+        Parameters
+        ----------
+        start: float or None
+            The ``time.perf_counter()`` of the user action that the frame shows,
+            None times the frame only.
+        """
+        if start is None:
+            start = time.perf_counter()
+        QtWidgets.QApplication.processEvents()
+        self.view.viewport().repaint()
+        self.frames.append(time.perf_counter() - start)
+
+    def params(self):
+        """Returns the parameter nodes of the tree."""
+        return [node for node in self.model.root().iter_children(recursive=True) if isinstance(node, ParamNode)]
+
+    def viewIndex(self, node, column=0):
+        """Returns the index of a node in the model of the view, fetching its rows if necessary."""
+        self.model.fetchTo(node)
+        index = self.model.indexFromNode(node, column)
+        return self.proxy.mapFromSource(index) if self.proxy is not None else index
+
+
+# scenarios, they are called with a Harness and return the number of steps
+
+def scroll(harness):
+    bar = harness.view.verticalScrollBar()
+    model = harness.view.model()
+    root = QtCore.QModelIndex()
+    for _ in range(FRAMES):
+        start = time.perf_counter()
+        if bar.value() < bar.maximum():
+            bar.setValue(bar.value() + bar.pageStep())
+        elif model.canFetchMore(root):
+            # like the view does when the scroll bar reaches its end
+            model.fetchMore(root)
+        elif bar.maximum() > 0 and len(harness.frames) < MIN_FRAMES:
+            # pages through the fetched rows again
+            bar.setValue(0)
+        else:
+            break
+        harness.frame(start)
+    return len(harness.frames)
+
+
+def expand(harness):
+    model = harness.view.model()
+    groups = [QtCore.QModelIndex()]
+    count = 0
+    while count < FRAMES:
+        if not groups:
+            if not count or count >= MIN_FRAMES:
+                break
+            # expands the groups again
+            harness.view.collapseAll()
+            QtWidgets.QApplication.processEvents()
+            groups = [QtCore.QModelIndex()]
+        parent = groups.pop(0)
+        for row in range(model.rowCount(parent)):
+            index = model.index(row, 0, parent)
+            if not model.hasChildren(index):
+                continue
+            start = time.perf_counter()
+            harness.view.expand(index)
+            harness.frame(start)
+            groups.append(index)
+            count += 1
+            if count >= FRAMES:
+                break
+    return count
+
+
+def edit(harness):
+    delegate = harness.view.itemDelegate()
+    model = harness.view.model()
+    option = QtWidgets.QStyleOptionViewItem()
+    nodes = [node for node in harness.params()[:FRAMES] if node.is_editable()]
+    # edits the nodes again if there are fewer than MIN_FRAMES
+    nodes = itertools.islice(itertools.cycle(nodes), max(len(nodes), MIN_FRAMES))
+    count = 0
+    for node in nodes:
+        index = harness.viewIndex(node, 1)
+        harness.view.scrollTo(index)
+        start = time.perf_counter()
+        editor = delegate.createEditor(harness.view.viewport(), option, index)
+        delegate.setEditorData(editor, index)
+        delegate.setModelData(editor, model, index)
+        editor.deleteLater()
+        harness.frame(start)
+        count += 1
+    return count
+
+
+def bulk(harness):
+    model = harness.view.model()
+    indexes = [harness.viewIndex(node, 1) for node in harness.params()[::STEP] if node.is_editable()]
+    for _ in range(MIN_FRAMES):
+        start = time.perf_counter()
+        for index in indexes:
+            model.setData(index, model.data(index, QtCore.Qt.EditRole), QtCore.Qt.EditRole)
+        # the dataChanged signals of all changes are emitted in this frame
+        harness.frame(start)
+    return MIN_FRAMES * len(indexes)
+
+
+def patch(harness):
+    count = 0
+    for i in range(MIN_FRAMES):
+        # the nodes of the new tree are added to the model, so every patch needs a new tree
+        new = TREES[harness.kind](harness.size)
+        if i % 2 == 0:
+            for node in list(new.iter_children())[::STEP]:
+                new.remove_child(node)
+        start = time.perf_counter()
+        changes = harness.model.patch(new)
+        harness.frame(start)
+        # None if the model was reset
+        count += len(changes) if changes is not None else 1
+    return count
+
+
+def type_filter(harness):
+    patterns = PATTERNS * math.ceil(MIN_FRAMES / len(PATTERNS))
+    for pattern in patterns:
+        start = time.perf_counter()
+        harness.proxy.setFilterPattern(pattern)
+        harness.frame(start)
+    return len(patterns)
+
+
+SCENARIOS = {
+    'scroll': scroll,
+    'expand': expand,
+    'edit': edit,
+    'bulk': bulk,
+    'patch': patch,
+    'filter': type_filter,
+}
+
+
+def measure(scenario, kind, size, check=False, asyncEvaluation=False, trace=False):
+    """Runs a scenario in a new view and returns the harness, the number of steps and the time in seconds."""
+    harness = Harness(kind, size, proxy=scenario == 'filter', check=check, asyncEvaluation=asyncEvaluation)
+    gc.collect()
+    if trace:
+        tracemalloc.start()
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    steps = SCENARIOS[scenario](harness)
+    elapsed = time.perf_counter() - start
+    if trace:
+        harness.peak = tracemalloc.get_traced_memory()[1] - base
+        tracemalloc.stop()
+    harness.close()
+    return harness, steps, elapsed
+
+
+def result(scenario, kind, size, repeat=3, check=False, asyncEvaluation=False):
+    """Runs a scenario *repeat* times and returns the result of the fastest run."""
+    best = None
+    for _ in range(repeat):
+        harness, steps, elapsed = measure(scenario, kind, size, check, asyncEvaluation)
+        if best is None or elapsed < best[2]:
+            best = harness, steps, elapsed
+    harness, steps, elapsed = best
+    traced = measure(scenario, kind, size, check, asyncEvaluation, trace=True)[0]
+    frames = sorted(harness.frames) or [0.0]
+    return {
+        'benchmark': f'gui_{scenario}',
+        'tree': kind,
+        'size': size,
+        'steps': steps,
+        'ops_per_sec': steps / elapsed if steps and elapsed > 0 else None,
+        'peak_bytes': traced.peak,
+        'data_calls': harness.model.calls,
+        'frame_ms': {
+            'median': statistics.median(frames) * 1000,
+            # nearest rank, the smallest frame time of at least 95 % of the frames
+            'p95': frames[math.ceil(0.95 * len(frames)) - 1] * 1000,
+            'max': frames[-1] * 1000,
+        },
+    }
+
+
+def run(trees=None, sizes=(1000, 10000), scenarios=None, repeat=3, check=False, asyncEvaluation=False,
+        large=True, log=None):
+    """Runs the scenarios for all tree kinds and sizes.
+
+    Parameters
+    ----------
+    trees: list or None
+        The tree kinds, None runs all of ``TREES``.
+    sizes: Iterable
+    scenarios: list or None
+        The scenario names, None runs all of ``SCENARIOS``.
+    repeat: int
+        The frame times of the fastest of *repeat* runs are reported.
+    check: bool
+        Whether the models are checked with ``QAbstractItemModelTester``.
+    asyncEvaluation: bool
+        Whether the model evaluates slow values in the background.
+    large: bool
+        Whether the selected cases of ``LARGE`` run once, without check.
+    log: callable or None
+        Is called with every result.
+
+    Returns
+    -------
+    dict:
+        The metadata and the list of results.
+    """
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(['benchmarks.gui'])
+    trees = trees or list(TREES)
+    scenarios = scenarios or list(SCENARIOS)
+    cases = [(scenario, kind, size, repeat, check) for kind in trees for size in sizes for scenario in scenarios]
+    if large:
+        # QAbstractItemModelTester walks the whole model after every change
+        cases += [(scenario, kind, size, 1, False) for scenario, kind, size in LARGE
+                  if scenario in scenarios and kind in trees and size not in sizes]
+    results = []
+    for scenario, kind, size, times, checked in cases:
+        results.append(result(scenario, kind, size, times, checked, asyncEvaluation))
+        if log is not None:
+            log(results[-1])
+    app.processEvents()
+    return {
+        'meta': dict(metadata(), qt=QtCore.QT_VERSION_STR, platform_plugin=app.platformName()),
+        'results': results,
+    }
+
+
+def print_result(result):
+    ops_per_sec = result['ops_per_sec']
+    rate = f'{ops_per_sec:10.1f}' if ops_per_sec else f'{"-":>10}'
+    frames = result['frame_ms']
+    print(f'{result["benchmark"]:<12} {result["tree"]:<12} {result["size"]:>8} {rate} '
+          f'{result["data_calls"]:>10} {frames["median"]:>8.2f} {frames["p95"]:>8.2f} {frames["max"]:>8.2f} '
+          f'{result["peak_bytes"] / 1024:>12.1f}', flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.gui', description='sparc GUI benchmarks')
+    parser.add_argument('--trees', nargs='+', choices=list(TREES))
+    parser.add_argument('--sizes', nargs='+', type=int, default=[1000, 10000])
+    parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--check', action='store_true', help='check the models with QAbstractItemModelTester')
+    parser.add_argument('--async-evaluation', action='store_true', help='evaluate slow values in the background')
+    parser.add_argument('--no-large', action='store_true', help='skip the cases of LARGE')
+    parser.add_argument('--output', help='the JSON result file')
+    args = parser.parse_args(argv)
+
+    print(f'{"benchmark":<12} {"tree":<12} {"size":>8} {"steps/s":>10} {"data()":>10} '
+          f'{"median":>8} {"p95":>8} {"max ms":>8} {"peak KiB":>12}')
+    results = run(args.trees, args.sizes, args.scenarios, args.repeat, args.check, args.async_evaluation,
+                  not args.no_large, log=print_result)
+    if args.output:
+        with open(args.output, 'w') as fp:
+            json.dump(results, fp, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,99 @@
+# locking.py
+"""Read throughput of a ThreadSafeTree with an increasing number of threads.
+
+Every thread reads parameter values through the read lock for a fixed
+time. With the GIL, the total throughput cannot grow with the number of
+threads; on free-threaded builds (``python3.13t`` and later) readers run
+in parallel and the throughput should scale until the lock bookkeeping
+becomes the bottleneck. The optional writer thread shows the cost of
+exclusive write sections for the readers.
+
+Usage:
+
+    python -m benchmarks.locking [--threads 1 2 4 8] [--duration 1.0] [--writer]
+"""
+
+# system modules
+import sys
+import time
+import argparse
+import threading
+
+# sparc modules
+from sparc.core import ParamGroupNode, ThreadSafeTree
+
+
+def gil_enabled():
+    """Returns whether the GIL is enabled (always True before Python 3.13)."""
+    try:
+        return sys._is_gil_enabled()
+    except AttributeError:
+        return True
+
+
+def make_tree(size):
+    root = ParamGroupNode('root')
+    group = root.add_child('group')
+    for i in range(size):
+        group.add_child(f'x{i}', float(i), float)
+    group.add_child('sum', '=x0+x1')
+    return root
+
+
+def run(tree, names, thread_count, duration, writer):
+    counts = [0] * thread_count
+    start = threading.Barrier(thread_count + 1)
+    stop = threading.Event()
+
+    def read(index):
+        count = 0
+        start.wait()
+        while not stop.is_set():
+            tree.values(names)
+            count += 1
+        counts[index] = count * len(names)
+
+    def write():
+        value = 0.0
+        while not stop.is_set():
+            with tree.write() as root:
+                root['group.x0'].set_value(value)
+            value += 1.0
+            time.sleep(0.001)
+
+    threads = [threading.Thread(target=read, args=(i,)) for i in range(thread_count)]
+    if writer:
+        threads.append(threading.Thread(target=write))
+    for thread in threads:
+        thread.start()
+    start.wait()
+    began = time.perf_counter()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return sum(counts) / (time.perf_counter() - began)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--duration', type=float, default=1.0, help='seconds per thread count')
+    parser.add_argument('--size', type=int, default=100, help='number of parameters')
+    parser.add_argument('--writer', action='store_true', help='run a concurrent writer thread')
+    args = parser.parse_args(argv)
+
+    tree = ThreadSafeTree(make_tree(args.size))
+    names = ['group.x0', 'group.x1', 'group.sum']
+
+    print(f'Python {sys.version.split()[0]}, GIL {"enabled" if gil_enabled() else "disabled"}')
+    print(f'{"threads":>8} {"reads/s":>12} {"speedup":>8}')
+    base = None
+    for thread_count in args.threads:
+        rate = run(tree, names, thread_count, args.duration, args.writer)
+        base = base or rate
+        print(f'{thread_count:>8} {rate:>12.0f} {rate / base:>8.2f}')
+
+
+if __name__ == '__main__':
+    main()
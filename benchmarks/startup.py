@@ -0,0 +1,94 @@
+# startup.py
+"""Measures the import time of the sparc packages.
+
+Every package is imported in a fresh interpreter, and the fastest of
+several runs is reported together with the slow dependencies that the
+import loaded. Slow dependencies must be imported on first use only, so
+that command line tools that import the core do not pay for them, see
+``LAZY``.
+
+Usage:
+
+    python -m benchmarks.startup [--repeat 5] [--modules sparc sparc.gui]
+
+The command exits with status 1 if a package imports a dependency that
+it must import lazily.
+"""
+
+# system modules
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+__all__ = ['MODULES', 'LAZY', 'measure']
+
+
+MODULES = ['sparc', 'sparc.core', 'sparc.gui', 'sparc.gui.model']
+
+# slow dependencies that a package must not import
+LAZY = {
+    'sparc': ['PyQt5.QtCore', 'numpy', 'asyncio', 'concurrent.futures', 'sqlite3', 'multiprocessing',
+              'tracemalloc', 'csv'],
+    'sparc.core': ['PyQt5.QtCore', 'numpy', 'asyncio', 'concurrent.futures', 'sqlite3', 'multiprocessing',
+                   'tracemalloc', 'csv'],
+    'sparc.gui': ['PyQt5.QtCore', 'numpy', 'asyncio', 'sqlite3', 'multiprocessing'],
+    'sparc.gui.model': ['numpy', 'sqlite3', 'multiprocessing'],
+}
+
+CHECKED = sorted(set(name for names in LAZY.values() for name in names))
+
+CODE = '''
+import sys
+import json
+import time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps([elapsed, [name for name in {checked!r} if name in sys.modules]]))
+'''
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure(module, repeat=5):
+    """Returns the fastest import time of a module in seconds and the checked dependencies that it imported.
+
+    Returns None if the module cannot be imported, e.g. because PyQt5 is not installed.
+    """
+    best = None
+    loaded = []
+    for _ in range(repeat):
+        process = subprocess.run([sys.executable, '-W', 'ignore', '-c', CODE.format(module=module, checked=CHECKED)],
+                                 cwd=ROOT, capture_output=True, text=True)
+        if process.returncode != 0:
+            return None
+        elapsed, loaded = json.loads(process.stdout.splitlines()[-1])
+        best = elapsed if best is None else min(best, elapsed)
+    return best, loaded
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--modules', nargs='+', default=MODULES)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    print(f'{"module":<20} {"ms":>8}  loaded')
+    passed = True
+    for module in args.modules:
+        result = measure(module, args.repeat)
+        if result is None:
+            print(f'{module:<20} {"-":>8}  not importable')
+            continue
+        elapsed, loaded = result
+        eager = [name for name in loaded if name in LAZY.get(module, ())]
+        passed = passed and not eager
+        status = f'FAILED, imports {", ".join(eager)}' if eager else 'ok'
+        print(f'{module:<20} {elapsed * 1000:>8.1f}  {", ".join(loaded) or "-"}  {status}', flush=True)
+    return 0 if passed else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
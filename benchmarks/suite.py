@@ -0,0 +1,295 @@
+# suite.py
+"""The benchmark suite.
+
+A benchmark is a function that is called with a tree and returns a
+callable that runs the measured operations once and returns the number
+of operations. Benchmarks are registered in ``BENCHMARKS`` and measured
+for every tree kind and size by ``run``:
+
+- the throughput is the number of operations per second of the fastest
+  of several repetitions,
+- the peak memory is the peak of memory allocated by Python during a
+  separate run with ``tracemalloc``.
+"""
+
+# system modules
+import os
+import sys
+import gc
+import time
+import pickle
+import platform
+import datetime
+import subprocess
+import tracemalloc
+
+# sparc modules
+from sparc.core import ParamNode, SearchIndex, dumps, loads
+from .trees import TREES
+
+__all__ = ['BENCHMARKS', 'run', 'compare']
+
+
+# the maximum number of nodes that are accessed by a benchmark
+SAMPLE = 1000
+
+
+def params(root):
+    return [node for node in root.iter_children(recursive=True) if isinstance(node, ParamNode)]
+
+
+def sample(nodes):
+    step = max(1, len(nodes) // SAMPLE)
+    return nodes[::step][:SAMPLE]
+
+
+def bench_build(kind, size, root):
+    generator = TREES[kind]
+
+    def build():
+        generator(size)
+        return size
+    return build
+
+
+def bench_lookup(kind, size, root):
+    names = [node.relative_name(root) for node in sample(params(root))]
+
+    def lookup():
+        for name in names:
+            root.child(name)
+        return len(names)
+    return lookup
+
+
+def bench_value(kind, size, root):
+    nodes = sample(params(root))
+
+    def value():
+        for node in nodes:
+            node.value()
+        return len(nodes)
+    return value
+
+
+def bench_set_value(kind, size, root):
+    nodes = [(node, node.raw_value()) for node in sample(params(root)) if node.is_editable()]
+
+    def set_value():
+        for node, value in nodes:
+            node.set_value(value)
+        return len(nodes)
+    return set_value
+
+
+def bench_dumps(kind, size, root):
+    if kind == 'descriptor':
+        return None  # descriptors are not serialized
+
+    def dump():
+        dumps(root)
+        return size
+    return dump
+
+
+def bench_loads(kind, size, root):
+    if kind == 'descriptor':
+        return None
+    s = dumps(root)
+
+    def load():
+        loads(s)
+        return size
+    return load
+
+
+def bench_pickle(kind, size, root):
+    if kind == 'descriptor':
+        return None  # bound methods of local objects
+
+    def dump_load():
+        pickle.loads(pickle.dumps(root, pickle.HIGHEST_PROTOCOL))
+        return size
+    return dump_load
+
+
+def bench_search(kind, size, root):
+    index = SearchIndex(root)
+    patterns = [('x', 'substring'), ('x1', 'prefix'), ('x1?', 'glob'), ('missing', 'substring')]
+
+    def search():
+        for pattern, mode in patterns:
+            index.find(pattern, mode)
+        return len(patterns)
+    return search
+
+
+def bench_model_data(kind, size, root):
+    try:
+        from PyQt5 import QtCore
+        from sparc.gui.model import ParamModel
+    except ImportError:
+        return None
+
+    model = ParamModel(root)
+    indexes = []
+    stack = [QtCore.QModelIndex()]
+    while stack and len(indexes) < SAMPLE:
+        parent = stack.pop()
+        for row in range(model.rowCount(parent)):
+            index = model.index(row, 1, parent)
+            if model.isLeaf(index):
+                indexes.append(index)
+            else:
+                stack.append(model.index(row, 0, parent))
+
+    def data():
+        for index in indexes:
+            model.data(index, QtCore.Qt.DisplayRole)
+        return len(indexes)
+    return data
+
+
+BENCHMARKS = {
+    'build': bench_build,
+    'lookup': bench_lookup,
+    'value': bench_value,
+    'set_value': bench_set_value,
+    'dumps': bench_dumps,
+    'loads': bench_loads,
+    'pickle': bench_pickle,
+    'search': bench_search,
+    'model_data': bench_model_data,
+}
+
+
+def commit():
+    """Returns the current git commit or None."""
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL,
+                                       cwd=os.path.dirname(os.path.abspath(__file__))).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def measure(func, repeat, min_time=0.05):
+    """Returns the number of operations and the time of the fastest repetition.
+
+    The function is called several times per repetition if it is faster than *min_time*.
+    """
+    calls = 1
+    best = None
+    ops = 0
+    for _ in range(repeat):
+        gc.collect()
+        while True:
+            start = time.perf_counter()
+            ops = 0
+            for _ in range(calls):
+                ops += func()
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_time or best is not None:
+                break
+            calls *= 2
+        seconds = elapsed / calls
+        best = seconds if best is None else min(best, seconds)
+    return ops // calls, best
+
+
+def peak_memory(func):
+    """Returns the peak of memory that is allocated while calling *func* in bytes."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run(trees=None, sizes=(100, 1000), benchmarks=None, repeat=3, log=None):
+    """Runs the benchmarks and returns the results as a JSON serializable dict.
+
+    Parameters
+    ----------
+    trees: list or None
+        The tree kinds, see ``TREES``. None runs all kinds.
+    sizes: list
+        The tree sizes.
+    benchmarks: list or None
+        The benchmark names, see ``BENCHMARKS``. None runs all benchmarks.
+    repeat: int
+        The number of repetitions of every benchmark.
+    log: callable or None
+        Called with every result.
+    """
+    results = []
+    for kind in trees or TREES:
+        for size in sizes:
+            root = TREES[kind](size)
+            for name in benchmarks or BENCHMARKS:
+                func = BENCHMARKS[name](kind, size, root)
+                if func is None:
+                    continue
+                ops, seconds = measure(func, repeat)
+                result = {
+                    'benchmark': name,
+                    'tree': kind,
+                    'size': size,
+                    'ops': ops,
+                    'seconds': seconds,
+                    'ops_per_sec': ops / seconds if seconds else None,
+                    'peak_bytes': peak_memory(func),
+                }
+                results.append(result)
+                if log is not None:
+                    log(result)
+
+    return {
+        'meta': metadata(),
+        'results': results,
+    }
+
+
+def metadata():
+    """Returns the commit, Python version, platform and date of a benchmark run."""
+    return {
+        'commit': commit(),
+        'python': sys.version.split()[0],
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'date': datetime.datetime.now().isoformat(timespec='seconds'),
+    }
+
+
+def compare(base, new, threshold=0.1):
+    """Compares two result dicts of ``run``.
+
+    Parameters
+    ----------
+    base, new: dict
+    threshold: float
+        The relative change of throughput or peak memory that counts as a regression.
+
+    Returns
+    -------
+    list:
+        A list of ``(key, speed_ratio, memory_ratio, is_regression)`` tuples for
+        all benchmarks in both results, where *key* is ``(benchmark, tree, size)``
+        and the ratios are new / base.
+    """
+    def key(result):
+        return result['benchmark'], result['tree'], result['size']
+
+    base_results = {key(result): result for result in base['results']}
+    rows = []
+    for result in new['results']:
+        old = base_results.get(key(result))
+        if old is None or not old['ops_per_sec'] or not result['ops_per_sec']:
+            continue
+        speed = result['ops_per_sec'] / old['ops_per_sec']
+        # peaks below 1 KiB are noise
+        memory = result['peak_bytes'] / old['peak_bytes'] if old['peak_bytes'] >= 1024 else 1.0
+        regression = speed < 1 - threshold or memory > 1 + threshold
+        rows.append((key(result), speed, memory, regression))
+    return rows
@@ -0,0 +1,94 @@
+# trees.py
+"""Synthetic node trees for benchmarks.
+
+Every generator returns a ``ParamGroupNode`` tree with about *size*
+parameter nodes.
+"""
+
+# sparc modules
+from sparc.core import ParamNode, ParamGroupNode, Interval
+
+__all__ = ['TREES', 'wide_tree', 'deep_tree', 'expression_tree', 'descriptor_tree', 'choice_tree']
+
+
+# the depth of deep trees, deeper trees exceed the recursion limit of the json module
+DEPTH = 100
+
+# the number of parameters per group of expression trees
+CHAIN = 10
+
+# the number of valid values of choice trees
+CHOICES = 1000
+
+
+class Sensor(object):
+    """A descriptor target."""
+
+    def __init__(self, value):
+        self._value = value
+
+    def read(self):
+        return self._value
+
+    def write(self, value):
+        self._value = value
+
+
+def wide_tree(size):
+    """Returns a root with *size* float parameters."""
+    root = ParamGroupNode('root')
+    for i in range(size):
+        root.add_child(ParamNode(f'x{i}', float(i), float, validator=Interval(0, size)))
+    return root
+
+
+def deep_tree(size):
+    """Returns chains of nested groups with one parameter per group."""
+    root = ParamGroupNode('root')
+    parent = root
+    for i in range(size):
+        if i % DEPTH == 0:
+            parent = root
+        parent = parent.add_child(ParamGroupNode(f'g{i}'))
+        parent.add_child(ParamNode('x', float(i), float))
+    return root
+
+
+def expression_tree(size):
+    """Returns groups of parameters where every parameter is an expression of the previous one."""
+    root = ParamGroupNode('root')
+    group = None
+    for i in range(size):
+        if i % CHAIN == 0:
+            group = root.add_child(ParamGroupNode(f'g{i // CHAIN}'))
+            group.add_child(ParamNode('x0', float(i), float))
+        else:
+            group.add_child(ParamNode(f'x{i % CHAIN}', f'=x{i % CHAIN - 1}*1.5+1'))
+    return root
+
+
+def descriptor_tree(size):
+    """Returns a root with *size* parameters that are bound to sensor objects."""
+    root = ParamGroupNode('root')
+    for i in range(size):
+        sensor = Sensor(float(i))
+        root.add_child(ParamNode(f'x{i}', type=float, fget=sensor.read, fset=sensor.write))
+    return root
+
+
+def choice_tree(size):
+    """Returns a root with *size* parameters that share a validator list of many valid values."""
+    choices = list(range(0, 10 * CHOICES, 10))
+    root = ParamGroupNode('root')
+    for i in range(size):
+        root.add_child(ParamNode(f'x{i}', choices[i % CHOICES], int, validator=choices))
+    return root
+
+
+TREES = {
+    'wide': wide_tree,
+    'deep': deep_tree,
+    'expression': expression_tree,
+    'descriptor': descriptor_tree,
+    'choice': choice_tree,
+}
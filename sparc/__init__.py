@@ -1,2 +1,10 @@
 from .version import __version__
 from .core import *
+
+
+def __getattr__(name):
+    # the names of sparc.core modules that are imported on first use
+    from . import core
+    if name in core.LAZY_NAMES:
+        return getattr(core, name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -1,5 +1,39 @@
+from .batch import *
+from .depend import *
+from .diff import *
+from .frozen import *
 from .interval import *
 from .io import *
+from .lock import *
 from .node import *
+from .overlay import *
 from .param import *
+from .profile import *
+from .search import *
 from .types import *
+from .watch import *
+
+# modules with slow imports (multiprocessing, sqlite3, tracemalloc, csv) are
+# imported on first use of one of their names
+LAZY_MODULES = {
+    'memory': ['memory_report', 'deep_sizeof', 'MemoryReport', 'MemoryTrace'],
+    'shared': ['SharedTree', 'SharedGroupNode', 'SharedParamNode'],
+    'store': ['SqliteStore', 'StoreGroupNode', 'StoreParamNode'],
+    'table': ['to_columns', 'from_columns', 'update_columns', 'dump_csv', 'load_csv', 'to_array', 'from_array'],
+}
+LAZY_NAMES = {name: module for module, names in LAZY_MODULES.items() for name in names}
+
+
+def __getattr__(name):
+    try:
+        module = LAZY_NAMES[name]
+    except KeyError:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}') from None
+    import importlib
+    value = getattr(importlib.import_module(f'.{module}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(LAZY_NAMES))
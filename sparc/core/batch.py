@@ -0,0 +1,163 @@
+# batch.py
+"""Evaluating a group of parameter nodes for many objects.
+
+A ``ParamGroupNode`` of unbound descriptor nodes (``fget=Cls.method``)
+describes the parameters of any instance of ``Cls``. ``evaluate_batch``
+evaluates such a group for a sequence of objects in one call and returns
+a column of values per node. Accessors, validators and expressions are
+resolved once per call instead of once per object and node, expressions
+are compiled once, and getters can be called from a thread pool if they
+are I/O bound.
+
+Examples
+--------
+
+>>> columns = evaluate_batch(schema, motors)
+>>> columns['torque'][0] == schema['torque'].value(obj=motors[0])
+True
+"""
+
+# system modules
+import functools
+
+# sparc modules
+from . import param
+from .param import ParamNode, is_unbound, referenced_siblings
+
+__all__ = ['evaluate_batch']
+
+
+@functools.lru_cache(maxsize=1024)
+def compile_expression(expr):
+    """Returns the compiled code of an expression and the names of its variables."""
+    expr = expr.replace('= ', '')
+    names = frozenset(ParamNode.expression_vars(expr))
+    return compile(expr.strip('= '), '<expression>', 'eval'), names
+
+
+def is_expression(value):
+    return isinstance(value, str) and value.startswith('=')
+
+
+def evaluate_batch(group, objs, recursive=False, context=None, max_workers=None):
+    """Returns the values of all child parameter nodes for a sequence of objects.
+
+    The values are equal to calling ``node.value(obj=obj, context=context)``
+    for every node and object.
+
+    Parameters
+    ----------
+    group: ParamGroupNode
+    objs: Iterable
+        The objects that unbound descriptor nodes are evaluated with.
+    recursive: bool
+        Controls whether to evaluate child nodes only on the first level or
+        (recursively) on all lower levels.
+    context: mapping
+        The context provides values for external expression variables.
+    max_workers: int or None
+        The number of threads that call the getters of unbound descriptor nodes.
+        None calls the getters in the calling thread.
+
+    Returns
+    -------
+    dict:
+        A list of values per node, keyed by the node names relative to *group*.
+
+    Raises
+    ------
+    ValueError, TypeError:
+        If a value is rejected by the type or validator of its node.
+    """
+    objs = list(objs)
+    context = context or {}
+    nodes = [node for node in group.iter_children(recursive=recursive) if isinstance(node, ParamNode)]
+
+    # raw values are either a single value for all objects or a list with one value per object
+    raw_values = {}
+    executor = None
+    if max_workers:
+        from concurrent.futures import ThreadPoolExecutor  # imported on first use, it is slow to import
+        executor = ThreadPoolExecutor(max_workers)
+    try:
+        for node in nodes:
+            if not node.is_descriptor():
+                raw_values[id(node)] = (False, node.raw_value())
+            elif is_unbound(node._get):
+                if executor is not None:
+                    raw_values[id(node)] = (True, executor.map(node._get, objs))  # submitted now
+                else:
+                    raw_values[id(node)] = (True, list(map(node._get, objs)))
+            else:
+                raw_values[id(node)] = (False, node._get())
+        if executor is not None:
+            for key, (is_column, values) in raw_values.items():
+                if is_column:
+                    raw_values[key] = (True, list(values))
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    columns = {}
+    active = set()
+
+    def column(node):
+        key = id(node)
+        if key in columns:
+            return columns[key]
+        if key in active:
+            raise RecursionError(f'circular expressions at node {node.absolute_name()}')
+
+        is_column, raw = raw_values[key]
+        validate = None
+        if node.type() is not None or node.validator() is not None:
+            validate = node._ParamNode__validate_value
+
+        if not is_column and is_expression(raw):
+            active.add(key)
+            try:
+                values = evaluate_expression(node, raw, column, len(objs), context, validate)
+            finally:
+                active.discard(key)
+        elif not is_column:
+            if validate is not None:
+                validate(raw)
+            values = [raw] * len(objs)
+        elif any(is_expression(value) for value in raw):
+            # getters that return expressions are evaluated per object
+            values = [node._value(value, obj, context) for value, obj in zip(raw, objs)]
+        else:
+            if validate is not None:
+                for value in raw:
+                    validate(value)
+            values = raw
+
+        columns[key] = values
+        return values
+
+    return {node.relative_name(group): column(node) for node in nodes}
+
+
+def evaluate_expression(node, expr, column, count, context, validate):
+    """Returns the values of an expression node for *count* objects."""
+    code, names = compile_expression(expr)
+    if node.name() in names:
+        raise RecursionError('a node expression must not refer to the node itself')
+
+    # context values take precedence over sibling values
+    sibling_columns = {}
+    for sibling in referenced_siblings(node, names):
+        name = sibling.name()
+        if name not in context and isinstance(sibling, ParamNode):
+            sibling_columns[name] = column(sibling)
+
+    namespace = vars(param)
+    values = []
+    for index in range(count):
+        variables = {name: sibling_values[index] for name, sibling_values in sibling_columns.items()}
+        variables.update(context)
+        value = eval(code, namespace, variables)
+        if validate is not None:
+            validate(value)
+        values.append(value)
+    return values
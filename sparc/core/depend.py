@@ -0,0 +1,110 @@
+# depend.py
+"""Dependencies between expression nodes.
+
+An expression refers to the values of its siblings and to context
+variables. The functions of this module find the nodes whose values
+change when a node value or a context variable changes, e.g. to update
+only the affected cells of a view.
+
+Examples
+--------
+
+>>> p['m'].set_value(2.0)
+>>> [node.name() for node in dependents(p['m'])]
+['F', 'Sigma']
+"""
+
+# sparc modules
+from .param import ParamNode
+
+__all__ = ['dependents', 'context_dependents']
+
+
+def expression_names(node):
+    """Returns the variable names of an expression node or None if the node is no expression."""
+    if not isinstance(node, ParamNode) or node.is_descriptor():
+        return None
+    value = node.raw_value()
+    if not (isinstance(value, str) and value.startswith('=')):
+        return None
+    return ParamNode.expression_vars(value)
+
+
+def dependents(node):
+    """Returns the expression nodes whose values depend on the value of *node*.
+
+    Expressions refer to siblings only, so the dependents of a node are the
+    sibling expressions that refer to it directly or through other
+    sibling expressions.
+
+    Parameters
+    ----------
+    node: ParamNode
+
+    Returns
+    -------
+    list:
+        The dependent nodes.
+    """
+    parent = node.parent()
+    if parent is None:
+        return []
+
+    # sibling name -> expressions that refer to it
+    referrers = {}
+    for sibling in parent.iter_children():
+        for name in expression_names(sibling) or ():
+            referrers.setdefault(name, []).append(sibling)
+
+    return _collect(referrers, [node.name()], {node.name()})
+
+
+def context_dependents(root, names):
+    """Returns the expression nodes whose values depend on the given context variables.
+
+    Parameters
+    ----------
+    root: ParamGroupNode
+    names: Iterable
+        The names of changed context variables.
+
+    Returns
+    -------
+    list:
+        The dependent nodes.
+    """
+    names = set(names)
+    if not names:
+        return []
+
+    result = []
+    groups = [root]
+    groups.extend(node for node in root.iter_children(recursive=True) if node.has_children())
+    for group in groups:
+        referrers = {}
+        direct = []
+        for child in group.iter_children():
+            child_names = expression_names(child)
+            if child_names is None:
+                continue
+            for name in child_names:
+                referrers.setdefault(name, []).append(child)
+            if names.intersection(child_names):
+                direct.append(child)
+        if direct:
+            seen = {child.name() for child in direct}
+            result.extend(direct)
+            result.extend(_collect(referrers, list(seen), seen))
+    return result
+
+
+def _collect(referrers, stack, seen):
+    result = []
+    while stack:
+        name = stack.pop()
+        for node in referrers.get(name, ()):
+            if node.name() not in seen:
+                seen.add(node.name())
+                result.append(node)
+                stack.append(node.name())
+    return result
@@ -0,0 +1,209 @@
+# diff.py
+"""Differences between node trees.
+
+``diff`` compares two trees and returns the list of changes that turn the
+first tree into the second one. ``patch`` applies these changes to the
+first tree, so that all nodes that did not change keep their identity.
+
+Examples
+--------
+
+>>> for change in patch(live_root, load(fp)):
+>>>     print(change.kind, change.name)
+"""
+
+# system modules
+import bisect
+from collections import namedtuple
+
+# sparc modules
+from .node import AbstractNode, LEVEL_SEPARATOR
+from .param import ParamNode, ParamGroupNode
+
+__all__ = ['Change', 'diff', 'apply_change', 'patch']
+
+
+class Change(namedtuple('Change', ['kind', 'name', 'index', 'value'])):
+    """A single change of a node tree.
+
+    Attributes
+    ----------
+    kind: str
+        One of ``Change.ADDED``, ``Change.REMOVED``, ``Change.REPLACED`` and ``Change.VALUE``.
+    name: str
+        The name of the changed node relative to the tree root.
+    index: int or None
+        The child index of an added, removed or replaced node.
+    value: Any
+        The new node of an added or replaced node, or the new raw value of a node.
+
+    Notes
+    -----
+    The index of a change refers to the tree after all preceding changes were applied.
+    """
+
+    ADDED = 'added'
+    REMOVED = 'removed'
+    REPLACED = 'replaced'
+    VALUE = 'value'
+
+    __slots__ = ()
+
+
+def join_name(parent, name):
+    return parent + LEVEL_SEPARATOR + name if parent else name
+
+
+def equal(a, b):
+    """Returns whether a and b are equal values of the same type."""
+    if type(a) is not type(b):
+        return False
+    try:
+        return bool(a == b)
+    except Exception:  # e.g. element-wise comparison of arrays
+        return False
+
+
+def increasing_subsequence(values):
+    """Returns a longest strictly increasing subsequence of a list of ints."""
+    tails = []  # tails[k]: smallest last value of all increasing subsequences of length k + 1
+    ends = []  # ends[k]: index of tails[k] in values
+    previous = [-1] * len(values)
+    for index, value in enumerate(values):
+        k = bisect.bisect_left(tails, value)
+        if k:
+            previous[index] = ends[k - 1]
+        if k == len(tails):
+            tails.append(value)
+            ends.append(index)
+        else:
+            tails[k] = value
+            ends[k] = index
+
+    result = []
+    index = ends[-1] if ends else -1
+    while index >= 0:
+        result.append(values[index])
+        index = previous[index]
+    result.reverse()
+    return result
+
+
+def same_kind(old, new):
+    """Returns whether *old* can be turned into *new* by changing its value only."""
+    if isinstance(old, ParamGroupNode):
+        return isinstance(new, ParamGroupNode)
+    if not isinstance(new, ParamNode):
+        return False
+    if old.is_descriptor() or new.is_descriptor():
+        return old.is_descriptor() and new.is_descriptor() and old._get == new._get and old._set == new._set
+    return old.type() == new.type() and equal(old.validator(), new.validator()) and \
+        old.is_editable() == new.is_editable()
+
+
+def diff(old, new):
+    """Returns the list of changes that turn the tree *old* into the tree *new*.
+
+    The names of the root nodes are not compared. Children are matched by name.
+    Children that change their position relative to their siblings are removed
+    and added again. Subtrees with the same content hash are skipped without
+    visiting their children, see ``AbstractLeafNode.content_hash``.
+
+    Parameters
+    ----------
+    old: ParamGroupNode
+    new: ParamGroupNode
+    """
+    changes = []
+    stack = [('', old, new)]
+    while stack:
+        path, old, new = stack.pop()
+        if old.content_hash() == new.content_hash():
+            continue  # identical subtrees
+
+        old_children = list(old.iter_children())
+        new_children = list(new.iter_children())
+        old_index = {child.name(): index for index, child in enumerate(old_children)}
+
+        # children that keep their relative order stay in place, all
+        # others are removed and (re-)added at their new position
+        common = [old_index[child.name()] for child in new_children if child.name() in old_index]
+        stable = set(old_children[index].name() for index in increasing_subsequence(common))
+
+        for index in reversed(range(len(old_children))):
+            name = old_children[index].name()
+            if name not in stable:
+                changes.append(Change(Change.REMOVED, join_name(path, name), index, None))
+
+        for index, new_child in enumerate(new_children):
+            name = new_child.name()
+            child_path = join_name(path, name)
+
+            if name not in stable:
+                changes.append(Change(Change.ADDED, child_path, index, new_child))
+                continue
+
+            old_child = old_children[old_index[name]]
+            if not same_kind(old_child, new_child):
+                changes.append(Change(Change.REPLACED, child_path, index, new_child))
+            elif isinstance(old_child, ParamGroupNode):
+                stack.append((child_path, old_child, new_child))
+            elif not old_child.is_descriptor() and not equal(old_child.raw_value(), new_child.raw_value()):
+                changes.append(Change(Change.VALUE, child_path, None, new_child.raw_value()))
+
+    return changes
+
+
+def apply_change(root, change):
+    """Applies a single change to a tree.
+
+    Parameters
+    ----------
+    root: ParamGroupNode
+    change: Change
+    """
+    parent_name, name = AbstractNode.split_name(change.name)
+    parent = root.child(parent_name) if parent_name else root
+
+    if change.kind == Change.ADDED:
+        parent.insert_child(change.index, change.value)
+    elif change.kind == Change.REMOVED:
+        parent.remove_child(name)
+    elif change.kind == Change.REPLACED:
+        parent.remove_child(name)
+        parent.insert_child(change.index, change.value)
+    elif change.kind == Change.VALUE:
+        node = parent.child(name)
+        editable = node.is_editable()
+        node.set_editable(True)
+        try:
+            node.set_value(change.value)
+        finally:
+            node.set_editable(editable)
+    else:
+        raise ValueError(f'unexpected change kind {change.kind}')
+
+
+def patch(root, new, callback=None):
+    """Changes the tree *root* to match the tree *new*.
+
+    Nodes of *new* that are added to *root* are removed from *new*.
+
+    Parameters
+    ----------
+    root: ParamGroupNode
+    new: ParamGroupNode
+    callback: callable or None
+        Called with every Change after it was applied.
+
+    Returns
+    -------
+    list:
+        The list of applied changes.
+    """
+    changes = diff(root, new)
+    for change in changes:
+        apply_change(root, change)
+        if callback is not None:
+            callback(change)
+    return changes
@@ -0,0 +1,259 @@
+# frozen.py
+"""Immutable snapshots of node trees.
+
+``freeze`` returns an immutable snapshot of a tree that can be read from
+any number of threads without locks while the original tree is changed.
+The content of every node is stored in an immutable record, and the
+records are cached by the nodes of the original tree. A change clears the
+cached records along the path from the changed node to the root only, so
+the next snapshot shares all unchanged subtrees with the previous one and
+is created in time proportional to the depth of the change (times the
+number of siblings along that path).
+
+``SnapshotPublisher`` lets a single writer thread publish new snapshots
+that reader threads pick up atomically.
+
+Examples
+--------
+
+>>> publisher = SnapshotPublisher(root)
+>>> # reader threads
+>>> publisher.snapshot()['group.x'].value()
+>>> # writer thread
+>>> root['group.x'].set_value(2.0)
+>>> publisher.publish()
+"""
+
+# system modules
+import threading
+from collections import namedtuple
+
+# sparc modules
+from .node import LEVEL_SEPARATOR
+from .param import ParamNode, ParamGroupNode
+
+__all__ = ['freeze', 'thaw', 'FrozenGroupNode', 'FrozenParamNode', 'SnapshotPublisher']
+
+
+# children and index are None for parameter nodes
+FrozenRecord = namedtuple('FrozenRecord', ['name', 'value', 'type', 'validator', 'editable',
+                                           'children', 'index', 'hash'])
+
+
+def freeze(node):
+    """Returns an immutable snapshot of a node and all its children.
+
+    The values of bound descriptor nodes are read at the time of freezing.
+
+    Parameters
+    ----------
+    node: ParamGroupNode or ParamNode
+
+    Raises
+    ------
+    TypeError:
+        If the tree contains unbound descriptor nodes.
+    """
+    if node._f is not None:
+        return frozen_node(node._f)
+
+    nodes = []
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        nodes.append(current)
+        if isinstance(current, ParamGroupNode):
+            stack.extend(child for child in current.iter_children() if child._f is None)
+
+    # records of nodes that depend on descriptor values are not cached
+    volatile = {}
+    for current in reversed(nodes):
+        if isinstance(current, ParamGroupNode):
+            children = []
+            is_volatile = False
+            for child in current.iter_children():
+                record = child._f
+                if record is None:
+                    record = volatile[id(child)]
+                    is_volatile = True
+                children.append(record)
+            record = FrozenRecord(current.name(), None, None, None, False, tuple(children),
+                                  {child.name: index for index, child in enumerate(children)},
+                                  current.content_hash())
+        else:
+            is_volatile = current.is_descriptor()
+            if is_volatile and current.is_unbound():
+                raise TypeError(f'cannot freeze unbound descriptor node {current.absolute_name()}')
+            record = FrozenRecord(current.name(), current.raw_value(), current.type(), current.validator(),
+                                  current.is_editable(), None, None, current.content_hash())
+
+        if is_volatile:
+            volatile[id(current)] = record
+        else:
+            current._f = record
+
+    record = node._f or volatile[id(node)]
+    return frozen_node(record)
+
+
+def frozen_node(record, parent=None):
+    if record.children is None:
+        return FrozenParamNode(record, parent)
+    return FrozenGroupNode(record, parent)
+
+
+def thaw(node):
+    """Returns a mutable copy of a frozen node and all its children.
+
+    Parameters
+    ----------
+    node: FrozenGroupNode or FrozenParamNode
+    """
+    root = None
+    stack = [(node._r, None)]
+    while stack:
+        record, parent = stack.pop()
+        if record.children is None:
+            copy = ParamNode(record.name, type=record.type, validator=record.validator)
+            copy._get = record.value
+            copy._edit = record.editable
+        else:
+            copy = ParamGroupNode(record.name)
+            stack.extend((child, copy) for child in reversed(record.children))
+        if parent is None:
+            root = copy
+        else:
+            parent.add_child(copy)
+    return root
+
+
+class FrozenGroupNode(ParamGroupNode):
+    """An immutable group node, see ``freeze``."""
+
+    def __init__(self, record, parent=None):
+        self._r = record
+        self._n = record.name
+        self._p = parent
+        self._h = record.hash
+        self._f = record
+
+    def __contains__(self, node):
+        return isinstance(node, (FrozenGroupNode, FrozenParamNode)) and node._p is self
+
+    def __reduce_ex__(self, protocol):
+        return thaw(self).__reduce_ex__(protocol)
+
+    def add_child(self, *args, **kwargs):
+        raise AttributeError(f'ParamGroupNode {self.absolute_name()} is frozen')
+
+    def child(self, index):
+        if type(index) is int:
+            return frozen_node(self._r.children[index], self)
+
+        if type(index) is not str:
+            raise TypeError('Unexpected index type %s. Supported types are: int, str' % type(index))
+
+        node = self
+        for name in index.split(LEVEL_SEPARATOR):
+            if not isinstance(node, FrozenGroupNode) or name not in node._r.index:
+                raise ValueError(f'{name} is not in list')
+            node = frozen_node(node._r.children[node._r.index[name]], node)
+        return node
+
+    def child_count(self, recursive=False):
+        if not recursive:
+            return len(self._r.children)
+        return sum([1 for _ in self.iter_children(recursive)])
+
+    def has_children(self):
+        return bool(self._r.children)
+
+    def index_of_child(self, node):
+        name = self.node_name(node)
+        try:
+            return self._r.index[name]
+        except KeyError:
+            raise ValueError(f'{name} is not in list')
+
+    def insert_child(self, index, node):
+        raise AttributeError(f'ParamGroupNode {self.absolute_name()} is frozen')
+
+    def iter_children(self, recursive=False):
+        if not recursive:
+            for record in self._r.children:
+                yield frozen_node(record, self)
+            return
+        for child in ParamGroupNode.iter_children(self, recursive):
+            yield child
+
+    def pop_child(self, node):
+        raise AttributeError(f'ParamGroupNode {self.absolute_name()} is frozen')
+
+    def remove_child(self, node):
+        raise AttributeError(f'ParamGroupNode {self.absolute_name()} is frozen')
+
+
+class FrozenParamNode(ParamNode):
+    """An immutable parameter node, see ``freeze``."""
+
+    def __init__(self, record, parent=None):
+        self._r = record
+        self._n = record.name
+        self._p = parent
+        self._h = record.hash
+        self._f = record
+        self._get = record.value
+        self._t = record.type
+        self._validator = record.validator
+        self._set = None
+        self._desc = False
+        self._edit = False
+
+    def __reduce_ex__(self, protocol):
+        return thaw(self).__reduce_ex__(protocol)
+
+    def set_editable(self, editable):
+        raise AttributeError(f'ParamNode {self.absolute_name()} is frozen')
+
+    def set_validator(self, validator):
+        raise AttributeError(f'ParamNode {self.absolute_name()} is frozen')
+
+    def set_value(self, value, obj=None):
+        raise AttributeError(f'ParamNode {self.absolute_name()} is frozen')
+
+
+class SnapshotPublisher(object):
+    """Publishes snapshots of a tree that is changed by a single writer thread.
+
+    Readers call ``snapshot`` to obtain the latest published snapshot and can
+    keep using it for as long as they like. Replacing the published snapshot
+    is a single reference assignment, so readers never see a partially
+    published snapshot.
+    """
+
+    def __init__(self, root):
+        """Initializes a new SnapshotPublisher and publishes the first snapshot.
+
+        Parameters
+        ----------
+        root: ParamGroupNode
+            The mutable tree.
+        """
+        self._root = root
+        self._lock = threading.Lock()
+        self._snapshot = freeze(root)
+
+    def publish(self):
+        """Publishes a snapshot of the current state of the tree and returns it."""
+        with self._lock:
+            snapshot = freeze(self._root)
+            self._snapshot = snapshot
+        return snapshot
+
+    def root(self):
+        """Returns the mutable tree."""
+        return self._root
+
+    def snapshot(self):
+        """Returns the latest published snapshot."""
+        return self._snapshot
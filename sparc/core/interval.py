@@ -59,6 +59,15 @@ class Interval(object):
     def __bool__(self):
         return self.is_valid()
 
+    def __eq__(self, other):
+        if not isinstance(other, Interval):
+            return NotImplemented
+        return (self.min, self.max, self.min_bound, self.max_bound) == \
+            (other.min, other.max, other.min_bound, other.max_bound)
+
+    def __hash__(self):
+        return hash((self.min, self.max, self.min_bound, self.max_bound))
+
     def __contains__(self, value):
         return self._op_min(value, self.min) and self._op_max(value, self.max)
 
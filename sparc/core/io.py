@@ -10,8 +10,17 @@ __all__ = ['dumps', 'dump', 'loads', 'load']
 
 class ParamNodeEncoder(json.JSONEncoder):
 
+    def __init__(self, *args, callback=None, **kwargs):
+        json.JSONEncoder.__init__(self, *args, **kwargs)
+        self._callback = callback
+        self._count = 0
+
     def default(self, obj):
 
+        if self._callback is not None and isinstance(obj, (ParamNode, ParamGroupNode)):
+            self._count += 1
+            self._callback(self._count)
+
         if isinstance(obj, ParamNode):
 
             if obj.is_expression():
@@ -50,9 +59,10 @@ class ParamNodeEncoder(json.JSONEncoder):
 
 class ParamNodeDecoder(json.JSONDecoder):
 
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, callback=None, **kwargs):
         json.JSONDecoder.__init__(self, object_hook=self.object_hook, *args, **kwargs)
         self._nodes = {}
+        self._callback = callback
 
     def object_hook(self, obj):
 
@@ -93,30 +103,44 @@ class ParamNodeDecoder(json.JSONDecoder):
 
             self._nodes[obj.absolute_name()] = obj
 
+        if self._callback is not None and isinstance(obj, (ParamNode, ParamGroupNode)):
+            self._callback(len(self._nodes))
+
         return obj
 
 
-def dumps(node, indent=None):
+def dumps(node, indent=None, callback=None):
+    """
+
+    Parameters
+    ----------
+    node: ParamGroupNode or ParamNode
+    indent: int or None
+    callback: callable or None
+        Called with the number of encoded nodes after every node, e.g. to report progress.
+    """
     nodes = [node] + [n for n in node.iter_children(recursive=True)]
-    return json.dumps(nodes, cls=ParamNodeEncoder, indent=indent)
+    return json.dumps(nodes, cls=ParamNodeEncoder, indent=indent, callback=callback)
 
 
-def dump(node, fp, indent=None):
+def dump(node, fp, indent=None, callback=None):
     nodes = [node] + [n for n in node.iter_children(recursive=True)]
-    json.dump(nodes, fp, cls=ParamNodeEncoder, indent=indent)
+    json.dump(nodes, fp, cls=ParamNodeEncoder, indent=indent, callback=callback)
 
 
-def loads(s):
+def loads(s, callback=None):
     """
 
     Parameters
     ----------
     s: str, bytes, or bytearray
+    callback: callable or None
+        Called with the number of decoded nodes after every node, e.g. to report progress.
     """
-    nodes = json.loads(s, cls=ParamNodeDecoder)
+    nodes = json.loads(s, cls=ParamNodeDecoder, callback=callback)
     return nodes[0]
 
 
-def load(fp):
-    nodes = json.load(fp, cls=ParamNodeDecoder)
+def load(fp, callback=None):
+    nodes = json.load(fp, cls=ParamNodeDecoder, callback=callback)
     return nodes[0]
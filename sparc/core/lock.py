@@ -0,0 +1,188 @@
+# lock.py
+"""Thread-safe access to mutable node trees.
+
+Node trees are not synchronized. Threads that change a tree while other
+threads read it must access the tree through a ``ThreadSafeTree``, which
+guards the tree with a reader/writer lock: any number of threads may
+read at the same time, while a writer has exclusive access. Several
+changes can be grouped into a ``write`` section that takes the lock once.
+
+See ``sparc.core.frozen`` for lock-free snapshots, which are preferable
+when readers can work with a slightly outdated state.
+
+Examples
+--------
+
+>>> tree = ThreadSafeTree(root)
+>>> tree.value('group.x')
+>>> with tree.write() as root:
+>>>     root['group.x'].set_value(1.0)
+>>>     root['group'].add_child('y', 2.0, float)
+"""
+
+# system modules
+import threading
+import contextlib
+
+__all__ = ['RWLock', 'ThreadSafeTree']
+
+
+class RWLock(object):
+    """A reader/writer lock that prefers writers.
+
+    Both read and write locks are reentrant. A thread that holds the write
+    lock may also acquire the read lock, but a read lock cannot be upgraded
+    to a write lock.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = {}  # thread ident -> number of read locks
+        self._writer = None  # thread ident of the writer
+        self._writes = 0  # number of write locks of the writer
+        self._waiting = 0  # number of waiting writers
+
+    def acquire_read(self):
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer != me and me not in self._readers:
+                while self._writer is not None or self._waiting:
+                    self._cond.wait()
+            self._readers[me] = self._readers.get(me, 0) + 1
+
+    def acquire_write(self):
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                self._writes += 1
+                return
+            if me in self._readers:
+                raise RuntimeError('a read lock cannot be upgraded to a write lock')
+
+            self._waiting += 1
+            try:
+                while self._writer is not None or self._readers:
+                    self._cond.wait()
+            finally:
+                self._waiting -= 1
+            self._writer = me
+            self._writes = 1
+
+    @contextlib.contextmanager
+    def read(self):
+        """Returns a context manager that holds the read lock."""
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    def release_read(self):
+        me = threading.get_ident()
+        with self._cond:
+            count = self._readers[me] - 1
+            if count:
+                self._readers[me] = count
+            else:
+                del self._readers[me]
+                if not self._readers:
+                    self._cond.notify_all()
+
+    def release_write(self):
+        with self._cond:
+            if self._writer != threading.get_ident():
+                raise RuntimeError('the write lock is not held by this thread')
+            self._writes -= 1
+            if not self._writes:
+                self._writer = None
+                self._cond.notify_all()
+
+    @contextlib.contextmanager
+    def write(self):
+        """Returns a context manager that holds the write lock."""
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+
+class ThreadSafeTree(object):
+    """Guards a node tree with a reader/writer lock.
+
+    The methods of ThreadSafeTree take the lock for a single access. Use the
+    ``read`` and ``write`` context managers to access the tree directly for
+    several operations. Nodes must not be used outside of these sections.
+    """
+
+    def __init__(self, root, lock=None):
+        """Initializes a new ThreadSafeTree.
+
+        Parameters
+        ----------
+        root: ParamGroupNode
+        lock: RWLock or None
+            The lock that guards the tree. None creates a new lock.
+        """
+        self._root = root
+        self._lock = lock or RWLock()
+
+    def add_child(self, *args, **kwargs):
+        """Adds a new child to the root node, see ``ParamGroupNode.add_child``."""
+        with self._lock.write():
+            return self._root.add_child(*args, **kwargs).name()
+
+    def child_names(self, name=None, recursive=False):
+        """Returns the child names of the root node or the child with the given name."""
+        with self._lock.read():
+            return self._node(name).child_names(recursive)
+
+    def lock(self):
+        """Returns the reader/writer lock."""
+        return self._lock
+
+    @contextlib.contextmanager
+    def read(self):
+        """Returns a context manager that holds the read lock and returns the root node."""
+        with self._lock.read():
+            yield self._root
+
+    def remove_child(self, name):
+        """Removes the child with the given (relative) name."""
+        with self._lock.write():
+            parent, name = self._root.split_name(name)
+            self._node(parent or None).remove_child(name)
+
+    def set_value(self, name, value, obj=None):
+        """Sets the value of the child with the given name."""
+        with self._lock.write():
+            self._root.child(name).set_value(value, obj=obj)
+
+    def to_dict(self):
+        """Returns a dict representation of the tree, see ``ParamGroupNode.to_dict``."""
+        with self._lock.read():
+            return self._root.to_dict()
+
+    def update_values(self, other):
+        """Updates the values of many children while taking the lock once."""
+        with self._lock.write():
+            self._root.update_values(other)
+
+    def value(self, name, obj=None, context=None):
+        """Returns the value of the child with the given name."""
+        with self._lock.read():
+            return self._root.child(name).value(obj=obj, context=context)
+
+    def values(self, names, obj=None, context=None):
+        """Returns the values of many children while taking the lock once."""
+        with self._lock.read():
+            return [self._root.child(name).value(obj=obj, context=context) for name in names]
+
+    @contextlib.contextmanager
+    def write(self):
+        """Returns a context manager that holds the write lock and returns the root node."""
+        with self._lock.write():
+            yield self._root
+
+    def _node(self, name):
+        return self._root if name is None else self._root.child(name)
@@ -0,0 +1,254 @@
+# memory.py
+"""Memory footprint of node trees.
+
+``memory_report`` walks a tree and adds up the deep sizes of the nodes
+and the objects they refer to, broken down by category:
+
+- nodes: the node objects, their attribute dicts and child containers,
+  by node class,
+- names: the node name strings,
+- values: the raw values of parameter nodes, by value type,
+- validators: the validators of parameter nodes, by validator type,
+- accessors: the getters and setters of descriptor nodes (without the
+  objects they are bound to),
+- caches: cached content hashes, frozen records and child positions.
+
+Every object is counted once, so objects that are shared by many nodes
+(e.g. the same validator list) or by several categories are attributed
+to the first node and category they are found in.
+
+``MemoryTrace`` measures the memory that is allocated while building or
+loading a tree with ``tracemalloc``.
+
+Examples
+--------
+
+>>> print(memory_report(root))
+>>> with MemoryTrace() as trace:
+>>>     root = load(fp)
+>>> trace.current, trace.peak
+"""
+
+# system modules
+import sys
+import types
+import linecache
+import tracemalloc
+from collections import deque
+
+# sparc modules
+from .node import AbstractLeafNode, AbstractNode
+from .param import ParamNode
+
+__all__ = ['memory_report', 'deep_sizeof', 'MemoryReport', 'MemoryTrace']
+
+
+# objects that are not owned by a tree
+NOT_OWNED = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType,
+             types.CodeType, AbstractLeafNode)
+
+CATEGORIES = ['nodes', 'names', 'values', 'validators', 'accessors', 'caches']
+
+
+def deep_sizeof(obj, seen=None):
+    """Returns the size of an object and all objects it refers to in bytes.
+
+    Classes, modules, functions, methods and nodes are not included.
+
+    Parameters
+    ----------
+    obj: object
+    seen: set or None
+        The ids of objects that were counted already. The set is updated,
+        so that shared objects are counted once across several calls.
+    """
+    if seen is None:
+        seen = set()
+
+    size = 0
+    stack = [obj]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, NOT_OWNED):
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+            stack.extend(obj)
+        else:
+            if hasattr(obj, '__dict__'):
+                stack.append(obj.__dict__)
+            for cls in type(obj).__mro__:
+                for slot in getattr(cls, '__slots__', ()):
+                    if hasattr(obj, slot):
+                        stack.append(getattr(obj, slot))
+    return size
+
+
+class MemoryReport(object):
+    """The memory footprint of a tree, see ``memory_report``."""
+
+    def __init__(self):
+        # category -> key -> [count, bytes]
+        self._categories = {category: {} for category in CATEGORIES}
+
+    def __str__(self):
+        return self.format()
+
+    def add(self, category, key, size):
+        entry = self._categories[category].setdefault(key, [0, 0])
+        entry[0] += 1
+        entry[1] += size
+
+    def category(self, name):
+        """Returns a dict of ``(count, bytes)`` tuples keyed by class or type name."""
+        return {key: tuple(entry) for key, entry in self._categories[name].items()}
+
+    def category_size(self, name):
+        """Returns the size of a category in bytes."""
+        return sum(entry[1] for entry in self._categories[name].values())
+
+    def format(self):
+        """Returns the report as a table."""
+        lines = [f'{"category":<12} {"key":<32} {"count":>8} {"bytes":>12}']
+        for category in CATEGORIES:
+            entries = sorted(self._categories[category].items(), key=lambda item: item[1][1], reverse=True)
+            for key, (count, size) in entries:
+                lines.append(f'{category:<12} {key:<32} {count:>8} {size:>12}')
+        lines.append(f'{"total":<12} {"":<32} {"":>8} {self.total:>12}')
+        return '\n'.join(lines)
+
+    @property
+    def total(self):
+        """The total size in bytes."""
+        return sum(self.category_size(category) for category in CATEGORIES)
+
+
+def type_name(obj):
+    return type(obj).__qualname__
+
+
+def memory_report(root):
+    """Returns the memory footprint of a node and all its children.
+
+    Parameters
+    ----------
+    root: AbstractLeafNode
+
+    Returns
+    -------
+    MemoryReport
+    """
+    report = MemoryReport()
+    seen = set()
+
+    def sizeof(obj):
+        # shallow size of objects that are owned by a node, counted once
+        if id(obj) in seen:
+            return 0
+        seen.add(id(obj))
+        return sys.getsizeof(obj)
+
+    nodes = [root]
+    nodes.extend(root.iter_children(recursive=True))
+
+    for node in nodes:
+        size = sizeof(node)
+        if hasattr(node, '__dict__'):
+            size += sizeof(node.__dict__)
+        if isinstance(node, AbstractNode) and '_c' in node.__dict__:
+            size += sizeof(node._c) + sizeof(node._m)
+        report.add('nodes', type_name(node), size)
+
+    for node in nodes:
+        report.add('names', 'str', deep_sizeof(node.name(), seen))
+
+    for node in nodes:
+        if not isinstance(node, ParamNode):
+            continue
+        if node.is_descriptor():
+            for accessor in (node._get, node._set):
+                if accessor is not None:
+                    report.add('accessors', type_name(accessor), sizeof(accessor))
+        else:
+            value = node.raw_value()
+            report.add('values', type_name(value), deep_sizeof(value, seen))
+
+        validator = node.validator()
+        if validator is not None:
+            report.add('validators', type_name(validator), deep_sizeof(validator, seen))
+
+    for node in nodes:
+        for attr in ('_h', '_f', '_rows'):
+            cache = node.__dict__.get(attr) if hasattr(node, '__dict__') else None
+            if cache is not None:
+                report.add('caches', type_name(cache), deep_sizeof(cache, seen))
+
+    return report
+
+
+class MemoryTrace(object):
+    """Measures the memory allocated by Python within a ``with`` block.
+
+    Uses ``tracemalloc``, which slows down allocations considerably while it
+    is tracing. Traces can be nested with other tracemalloc users, the
+    tracing is only stopped if it was started by the MemoryTrace. Note that
+    entering the block resets the peak of tracemalloc, which an outer user
+    shares: its peak is the maximum of ``outer_peak``, the peak before the
+    block, and the peak that tracemalloc reports afterwards.
+    """
+
+    def __init__(self, frames=1):
+        """Initializes a new MemoryTrace.
+
+        Parameters
+        ----------
+        frames: int
+            The number of frames that are stored per allocation.
+        """
+        self._frames = frames
+        self._started = False
+        self._start = None
+        self._base = 0
+        self._snapshot = None
+        self.outer_peak = None  # the peak of an outer tracemalloc user before the block
+        self.current = 0  # bytes allocated in the block that are still in use at its end
+        self.peak = 0  # peak of allocated bytes during the block
+
+    def __enter__(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self._frames)
+            self._started = True
+        else:
+            self.outer_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.reset_peak()
+        self._start = tracemalloc.take_snapshot()
+        self._base = tracemalloc.get_traced_memory()[0]
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        current, peak = tracemalloc.get_traced_memory()
+        self._snapshot = tracemalloc.take_snapshot()
+        self.current = current - self._base
+        self.peak = peak - self._base
+        if self._started:
+            tracemalloc.stop()
+            self._started = False
+
+    def top(self, n=10, key_type='lineno'):
+        """Returns the *n* source locations that allocated the most memory that is still in use.
+
+        Returns
+        -------
+        list:
+            A list of ``(location, bytes, count)`` tuples.
+        """
+        filters = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, linecache.__file__)]
+        snapshot = self._snapshot.filter_traces(filters)
+        start = self._start.filter_traces(filters)
+        stats = snapshot.compare_to(start, key_type)
+        return [(str(stat.traceback), stat.size_diff, stat.count_diff) for stat in stats[:n]]
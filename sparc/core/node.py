@@ -10,11 +10,44 @@ Classes:
 
     AbstractNode: A class that implements basic tree node functionality for
     adding, accessing, and removing child nodes.
+
+Node trees are pickled as a flat list of node records instead of the
+default recursive object graph (see ``AbstractLeafNode.__reduce_ex__``).
 """
 
+import hashlib
+
 LEVEL_SEPARATOR = '.'  # level separation character
 
 
+def hash_object():
+    """Returns a new hash object for content hashes."""
+    return hashlib.blake2b(digest_size=16)
+
+
+def restore_tree(records):
+    """Rebuilds a node tree from the flat records created by ``AbstractLeafNode.__reduce_ex__``.
+
+    Parameters
+    ----------
+    records: list
+        A list of ``(cls, parent_index, state)`` tuples in pre-order, i.e.
+        every parent record precedes the records of its children.
+        The root record has the parent index -1.
+    """
+    nodes = []
+    for cls, parent_index, state in records:
+        node = cls.__new__(cls)
+        node.__setstate__(state)
+        if parent_index >= 0:
+            parent = nodes[parent_index]
+            node._p = parent
+            parent._c.append(node)
+            parent._m[node._n] = node
+        nodes.append(node)
+    return nodes[0]
+
+
 class AbstractLeafNode(object):
     """Base class of all node classes.
 
@@ -28,6 +61,9 @@ class AbstractLeafNode(object):
     can hold arbitrary data.
     """
 
+    _h = None  # the cached content hash, see content_hash()
+    _f = None  # the cached frozen record, see sparc.core.frozen
+
     def __init__(self, name, parent=None):
         """Initializes a new AbstractLeafNode.
 
@@ -48,15 +84,94 @@ class AbstractLeafNode(object):
         self._p = None  # the parent node
 
         if parent is not None:
-            if self._n in parent.child_names():
+            try:
+                parent.child(self._n)
+            except ValueError:
+                parent.add_child(self)  # sets self._p = parent
+            else:
                 raise NameError('Node {} already has a child with name {}'.format(parent.name(), self._n))
-            parent.add_child(self)  # sets self._p = parent
+
+    def __reduce_ex__(self, protocol):
+        """Pickles the node and all its children as a flat list of node records.
+
+        The records are collected iteratively, so that the pickle payload
+        does not depend on the tree depth and parent back-references do not
+        have to go through the pickle memo. The parent of ``self`` is not
+        pickled, i.e. the unpickled node is always a root node.
+        """
+        records = []
+        stack = [(self, -1)]
+        while stack:
+            node, parent_index = stack.pop()
+            records.append((type(node), parent_index, node._pickle_state(protocol)))
+            if node.has_children():
+                index = len(records) - 1
+                stack.extend((child, index) for child in reversed(node._c))
+        return restore_tree, (records,)
+
+    def __getstate__(self):
+        """Returns the node state without parent and child references."""
+        state = self.__dict__.copy()
+        state['_p'] = None
+        state.pop('_f', None)
+        state.pop('_rows', None)
+        state.pop('_scanned', None)
+        if '_c' in state:
+            state['_c'] = []
+            state['_m'] = {}
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if '_c' in state and '_m' not in state:  # pickled by an older version
+            self._m = {child.name(): child for child in self._c}
+
+    def _pickle_state(self, protocol):
+        """Returns the node state that is pickled with the given pickle protocol."""
+        return self.__getstate__()
+
+    def content_hash(self):
+        """Returns a digest of the node content and the content of all its children.
+
+        The content of a node is its name and, depending on the node class,
+        its type, validator, raw value, and children, but not its parent.
+        Nodes with the same content hash have the same content, so the hash
+        can be used to compare (sub)trees or as a cache key for results
+        that are computed from a (sub)tree.
+
+        The hash is cached and only recomputed for nodes whose content
+        changed since the last call, i.e. after a change it is recomputed
+        along the path from the changed node to the root.
+
+        Returns
+        -------
+        bytes
+        """
+        if self._h is not None:
+            return self._h
+
+        # collect all nodes without a cached hash and compute their
+        # hashes bottom-up, without recursion
+        nodes = []
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            nodes.append(node)
+            if node.has_children():
+                stack.extend(child for child in node.iter_children() if child._h is None)
+
+        for node in reversed(nodes):
+            h = hash_object()
+            node._update_hash(h)
+            node._h = h.digest()
+
+        return self._h
 
     def index(self):
         """Returns the index of the node if it has a parent, otherwise None."""
         if self.parent() is None:
             return None
-        return self.parent().index_of_child(self.name())
+        return self.parent().index_of_child(self)
 
     def sibling(self, node):
         """Returns a sibling node.
@@ -170,6 +285,20 @@ class AbstractLeafNode(object):
 
         self._p = parent
 
+    def _invalidate(self):
+        """Clears the cached content hash and frozen record of the node and all its parents."""
+        node = self
+        # a parent can only have cached data if its children have
+        while node is not None and (node._h is not None or node._f is not None):
+            node._h = None
+            node._f = None
+            node = node.parent()
+
+    def _update_hash(self, h):
+        """Updates the hash object *h* with the node content."""
+        h.update(self.name().encode('utf-8'))
+        h.update(b'\0')
+
     @staticmethod
     def node_name(node_or_str):
         """Utility function that returns a str object representing a node name.
@@ -211,6 +340,9 @@ class AbstractNode(AbstractLeafNode):
     can hold arbitrary data.
     """
 
+    _rows = None  # the cached child positions by child id, see index_of_child()
+    _scanned = 0  # the number of children scanned for stale positions since _rows was built
+
     def __init__(self, name, children=(), parent=None):
         """Constructor.
 
@@ -226,6 +358,7 @@ class AbstractNode(AbstractLeafNode):
                 raise TypeError()
 
         self._c = []
+        self._m = {}  # the children by name
         for child in children:
             self.add_child(child)
 
@@ -272,15 +405,7 @@ class AbstractNode(AbstractLeafNode):
         if not isinstance(node, AbstractLeafNode):
             raise TypeError('node must be a str or AbstractLeafNode instance')
 
-        if node.name() in self.child_names():
-            raise KeyError('A node with name "%s" already exists!' % node.name())
-
-        node.set_parent(self)
-
-        # add param to child list
-        self._c.append(node)
-
-        return node
+        return self.insert_child(len(self._c), node)
 
     def child(self, index):
         """Returns the child with given name or index.
@@ -335,7 +460,10 @@ class AbstractNode(AbstractLeafNode):
             return child
 
         # else, i.e. index does not contain LEVEL_SEPARATOR
-        return self._c[self.index_of_child(index)]  # may raise ValueError
+        try:
+            return self._m[index]
+        except KeyError:
+            raise ValueError(f'{index!r} is not in list')
 
     def child_count(self, recursive=False):
         """Returns the number of child nodes.
@@ -365,11 +493,62 @@ class AbstractNode(AbstractLeafNode):
         ValueError:
             If `node` is not a child.
         """
-        if isinstance(node, AbstractLeafNode):
-            return self._c.index(node)  # may raise ValueError
+        if not isinstance(node, AbstractLeafNode):
+            name = self.node_name(node)  # may raise TypeError
+            try:
+                node = self._m[name]
+            except KeyError:
+                raise ValueError(f'{name!r} is not in list')
+
+        rows = self._rows
+        if rows is None:
+            rows = self._rows = {id(child): row for row, child in enumerate(self._c)}
+            self._scanned = 0
+        row = rows.get(id(node))
+        if row is not None and row < len(self._c) and self._c[row] is node:
+            return row
+
+        # the position is stale after inserting or removing a child before it.
+        # Scanning is cheap for children near the front, e.g. when children are
+        # removed from the front one by one, but a pass over all children after
+        # an insertion at the front would scan O(n**2) children, so the positions
+        # are rebuilt once the scans cost as much as rebuilding
+        row = self._c.index(node)  # may raise ValueError
+        self._scanned += row + 1
+        if self._scanned > len(self._c):
+            self._rows = None
+        else:
+            rows[id(node)] = row
+        return row
+
+    def insert_child(self, index, node):
+        """Inserts the given node as a child at the given position.
+
+        Checks whether a node with same name already exists.
+
+        Parameters
+        ----------
+        index: int
+            The list index of the new child.
+        node: AbstractLeafNode or AbstractNode
+            The parent of node will be reset to self.
+        """
+        if not isinstance(node, AbstractLeafNode):
+            raise TypeError('node must be an AbstractLeafNode instance')
 
-        name = self.node_name(node)  # may raise TypeError
-        return self.child_names().index(name)  # may raise ValueError
+        if node.name() in self._m:
+            raise KeyError('A node with name "%s" already exists!' % node.name())
+
+        node.set_parent(self)
+
+        # add param to child list
+        if self._rows is not None and index >= len(self._c):
+            self._rows[id(node)] = len(self._c)
+        self._c.insert(index, node)
+        self._m[node.name()] = node
+        self._invalidate()
+
+        return node
 
     def remove_child(self, node):
         """Removes the specified first level child node.
@@ -380,7 +559,7 @@ class AbstractNode(AbstractLeafNode):
             node must be a first level child.
         """
         if isinstance(node, AbstractLeafNode):
-            self._c.remove(node)
+            self._pop(self.index_of_child(node))  # may raise ValueError
         else:  # node is int or str
             self.remove_child(self.child(node))  # let remove_child raise an error if necessary
 
@@ -395,7 +574,15 @@ class AbstractNode(AbstractLeafNode):
         ------
         ValueError: raises ValueError if param is not a child
         """
-        node = self._c.pop(self.index_of_child(node))
+        return self._pop(self.index_of_child(node))
+
+    def _pop(self, index):
+        node = self._c.pop(index)
+        del self._m[node.name()]
+        if self._rows is not None:
+            self._rows.pop(id(node), None)
+        node._p = None
+        self._invalidate()
         return node
 
     def delete_child(self, node):
@@ -448,11 +635,28 @@ class AbstractNode(AbstractLeafNode):
         >>> for child in parent.iter_children(recursive=True):
         >>>     print(child.name())
         """
-        for child in self._c:
-            yield child
-            if recursive and child.has_children():
-                for grand_child in child.iter_children(recursive=recursive):
-                    yield grand_child
+        if not recursive:
+            for child in self._c:
+                yield child
+            return
+
+        # iterate depth-first without recursion, so that deep trees do
+        # not hit the interpreter's recursion limit
+        stack = [self.iter_children()]
+        while stack:
+            for child in stack[-1]:
+                yield child
+                if child.has_children():
+                    stack.append(child.iter_children())
+                    break
+            else:
+                stack.pop()
+
+    def _update_hash(self, h):
+        AbstractLeafNode._update_hash(self, h)
+        h.update(b'G')
+        for child in self.iter_children():
+            h.update(child.content_hash())
 
     @staticmethod
     def split_name(name):
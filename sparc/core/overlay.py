@@ -0,0 +1,266 @@
+# overlay.py
+"""Copy-on-write value overlays of node trees.
+
+An ``OverlayGroupNode`` presents a base tree with a sparse layer of
+overridden values on top. Reading a value falls through to the base tree
+unless the value was overridden, and ``set_value`` writes into the layer
+only, so that the base tree is never changed. Expressions are evaluated
+with the overridden values of their siblings. Overlays can be stacked,
+i.e. the base of an overlay can be another overlay.
+
+Overlay nodes are created on access and only the layer is stored, so an
+overlay costs memory proportional to the number of overridden values.
+The structure of an overlay cannot be changed.
+
+Examples
+--------
+
+>>> scenario = OverlayGroupNode(base)
+>>> scenario['group.x'].set_value(2.0)
+>>> scenario['group.y'].value()  # an expression of x
+>>> scenario.overrides()
+{'group.x': 2.0}
+"""
+
+# system modules
+import copy
+
+# sparc modules
+from .node import LEVEL_SEPARATOR, hash_object
+from .param import ParamNode, ParamGroupNode
+
+__all__ = ['OverlayGroupNode', 'OverlayParamNode']
+
+
+def content_hash(node):
+    """Returns the content hash of an overlay node.
+
+    Overlay nodes are created on access, so the hashes are cached by node
+    path in a dict that all nodes of an overlay share. The base tree may
+    change without notifying its overlays, so a cached hash is only used
+    while the base node has the same content hash. Overriding a value
+    removes the cached hashes of the node and its ancestors, see
+    ``invalidate``.
+    """
+    base_hash = node._base.content_hash()
+    cached = node._hashes.get(node._path)
+    if cached is not None and cached[0] == base_hash:
+        return cached[1]
+    h = hash_object()
+    node._update_hash(h)
+    digest = h.digest()
+    node._hashes[node._path] = base_hash, digest
+    return digest
+
+
+def invalidate(hashes, path):
+    """Removes the cached hashes of the node at *path* and its ancestors."""
+    while True:
+        hashes.pop(path, None)
+        if not path:
+            return
+        path = path.rpartition(LEVEL_SEPARATOR)[0]
+
+
+def overlay(base, layer, path, parent):
+    """Returns the overlay node of *base*."""
+    if isinstance(base, ParamGroupNode):
+        return OverlayGroupNode(base, parent, layer, path)
+    return OverlayParamNode(base, parent, layer, path)
+
+
+def join_path(parent, name):
+    return parent + LEVEL_SEPARATOR + name if parent else name
+
+
+class OverlayGroupNode(ParamGroupNode):
+    """A group node that overrides values of a base group node."""
+
+    # the base tree may change without notice, so frozen records are not cached
+    _f = property(lambda self: None, lambda self, record: None)
+
+    def __init__(self, base, parent=None, layer=None, path=''):
+        """Initializes a new OverlayGroupNode.
+
+        Parameters
+        ----------
+        base: ParamGroupNode
+            The base group node.
+        parent: OverlayGroupNode or None
+            The parent overlay node. None creates a new overlay.
+        layer: dict or None
+            The layer of overridden raw values keyed by the node name relative to
+            the overlay root. None creates an empty layer.
+        path: str
+            The name of the node relative to the overlay root.
+        """
+        self._base = base
+        self._n = base.name()
+        self._p = parent
+        self._layer = {} if layer is None else layer
+        self._path = path
+        # content hashes by path, shared by all nodes of the overlay
+        self._hashes = {} if parent is None else parent._hashes
+
+    def __contains__(self, node):
+        return isinstance(node, (OverlayGroupNode, OverlayParamNode)) and node._layer is self._layer \
+            and node._base in self._base
+
+    def __reduce_ex__(self, protocol):
+        return self.flatten().__reduce_ex__(protocol)
+
+    def add_child(self, *args, **kwargs):
+        raise AttributeError(f'the structure of overlay {self.absolute_name()} cannot be changed')
+
+    def base(self):
+        """Returns the base group node."""
+        return self._base
+
+    def child(self, index):
+        if type(index) is int:
+            base = self._base.child(index)
+            return overlay(base, self._layer, join_path(self._path, base.name()), self)
+
+        if type(index) is not str:
+            raise TypeError('Unexpected index type %s. Supported types are: int, str' % type(index))
+
+        node = self
+        for name in index.split(LEVEL_SEPARATOR):
+            if not isinstance(node, OverlayGroupNode):
+                raise ValueError(f'{name} is not in list')
+            base = node._base.child(name)  # may raise ValueError
+            node = overlay(base, node._layer, join_path(node._path, name), node)
+        return node
+
+    def child_count(self, recursive=False):
+        return self._base.child_count(recursive)
+
+    def content_hash(self):
+        return content_hash(self)
+
+    def flatten(self):
+        """Returns an independent copy of the base tree with the overridden values."""
+        tree = copy.deepcopy(self._base)
+        for name, value in self.overrides().items():
+            node = tree.child(name)
+            node._get = value
+            node._invalidate()
+        return tree
+
+    def has_children(self):
+        return self._base.has_children()
+
+    def index_of_child(self, node):
+        return self._base.index_of_child(self.node_name(node))
+
+    def insert_child(self, index, node):
+        raise AttributeError(f'the structure of overlay {self.absolute_name()} cannot be changed')
+
+    def iter_children(self, recursive=False):
+        if not recursive:
+            for base in self._base.iter_children():
+                yield overlay(base, self._layer, join_path(self._path, base.name()), self)
+            return
+        for child in ParamGroupNode.iter_children(self, recursive):
+            yield child
+
+    def overrides(self):
+        """Returns a dict of all overridden raw values below this node.
+
+        The keys are node names relative to this node.
+        """
+        if not self._path:
+            return dict(self._layer)
+        prefix = self._path + LEVEL_SEPARATOR
+        return {name[len(prefix):]: value for name, value in self._layer.items() if name.startswith(prefix)}
+
+    def pop_child(self, node):
+        raise AttributeError(f'the structure of overlay {self.absolute_name()} cannot be changed')
+
+    def remove_child(self, node):
+        raise AttributeError(f'the structure of overlay {self.absolute_name()} cannot be changed')
+
+    def reset(self, name=None):
+        """Removes overridden values, so that the base values are used again.
+
+        Parameters
+        ----------
+        name: str or None
+            The name of a child node relative to this node, or None to remove
+            all overridden values below this node.
+        """
+        if name is not None:
+            self.child(name).reset()
+            return
+        for name in self.overrides():
+            path = join_path(self._path, name)
+            del self._layer[path]
+            invalidate(self._hashes, path)
+        self._invalidate()
+
+    def _invalidate(self):
+        invalidate(self._hashes, self._path)
+
+
+class OverlayParamNode(ParamNode):
+    """A parameter node that can override the value of a base parameter node."""
+
+    _f = property(lambda self: None, lambda self, record: None)
+
+    def __init__(self, base, parent, layer, path):
+        self._base = base
+        self._n = base.name()
+        self._p = parent
+        self._layer = layer
+        self._path = path
+        self._hashes = parent._hashes
+        self._t = base.type()
+        self._validator = base.validator()
+        self._desc = base.is_descriptor()
+        self._set = base._set
+        self._edit = base._edit
+
+    def __reduce_ex__(self, protocol):
+        node = copy.deepcopy(self._base)
+        node._get = self._get
+        node._invalidate()
+        return node.__reduce_ex__(protocol)
+
+    @property
+    def _get(self):
+        # the raw value (or getter of descriptors) used by the ParamNode methods
+        if self._desc:
+            return self._base._get
+        try:
+            return self._layer[self._path]
+        except KeyError:
+            return self._base.raw_value()
+
+    @_get.setter
+    def _get(self, value):
+        self._layer[self._path] = value
+
+    def base(self):
+        """Returns the base parameter node."""
+        return self._base
+
+    def content_hash(self):
+        return content_hash(self)
+
+    def is_overridden(self):
+        """Returns a bool indicating whether the value is overridden."""
+        return self._path in self._layer
+
+    def reset(self):
+        """Removes the overridden value, so that the base value is used again."""
+        self._layer.pop(self._path, None)
+        self._invalidate()
+
+    def set_editable(self, editable):
+        raise AttributeError(f'overlay node {self.absolute_name()} cannot change its base node')
+
+    def set_validator(self, validator):
+        raise AttributeError(f'overlay node {self.absolute_name()} cannot change its base node')
+
+    def _invalidate(self):
+        invalidate(self._hashes, self._path)
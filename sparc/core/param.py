@@ -2,12 +2,15 @@
 
 # system modules
 import re
+import array
 import types
-import collections
+import pickle
+import itertools
+import collections.abc
 import logging
 
 # sparc modules
-from .node import AbstractNode, AbstractLeafNode
+from .node import AbstractNode, AbstractLeafNode, LEVEL_SEPARATOR
 from .types import Types
 
 __all__ = ['ParamGroupNode', 'ParamNode']
@@ -79,12 +82,46 @@ class ParamGroupNode(AbstractNode):
         for child in children:
             if isinstance(child, (ParamNode, ParamGroupNode)):
                 self.add_child(child)
-            elif isinstance(child, collections.Mapping):
+            elif isinstance(child, collections.abc.Mapping):
                 self.add_child(**child)
             else:
                 child_type = type(child)
                 raise TypeError(f'unexpected type of child {child_type}')
 
+    async def agather_values(self, recursive=False, obj=None, context=None, limit=None):
+        """Returns the values of all child parameter nodes and awaits coroutine accessors.
+
+        The accessors of all nodes (and of the siblings that their expressions
+        refer to) are awaited concurrently, so that reading many descriptor
+        nodes takes about the time of the slowest accessor.
+
+        Parameters
+        ----------
+        recursive: bool
+            Controls whether to gather the values of child nodes only on the first level or
+            (recursively) of all lower levels.
+        obj: object
+        context: mapping
+            The context provides values for external expression variables.
+        limit: int or None
+            The maximum number of accessors that are awaited at the same time. None for no limit.
+
+        Returns
+        -------
+        dict:
+            The values keyed by the node names relative to this node.
+        """
+        nodes = []
+        for node in self.iter_children(recursive=recursive):
+            if isinstance(node, ParamNode):
+                nodes.append(node)
+        raw_values = await fetch_raw_values(nodes, obj, limit)
+
+        values = {}
+        for node in nodes:
+            values[node.relative_name(self)] = node._value(raw_values[id(node)], obj, context, raw_values)
+        return values
+
     def iter_child_values(self, recursive=False):
         """Iterates through all child node values (recursively).
         Parameters
@@ -119,6 +156,117 @@ class ParamGroupNode(AbstractNode):
             self.child(name).set_value(value)
 
 
+def restore_buffer(cls, typecode, data):
+    """Restores a buffer value that was pickled by ``BufferValue``."""
+    if cls is array.array:
+        value = array.array(typecode)
+        value.frombytes(memoryview(data).cast('B'))
+        return value
+    return cls(data)
+
+
+class BufferValue(object):
+    """Wraps a buffer node value to pickle it as an out-of-band buffer.
+
+    Pickle protocol 5 passes ``pickle.PickleBuffer`` instances to the
+    ``buffer_callback`` of the pickler instead of copying their data
+    into the pickle stream. NumPy arrays implement protocol 5 themselves
+    and do not need to be wrapped.
+    """
+
+    TYPES = (bytes, bytearray, array.array)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __reduce_ex__(self, protocol):
+        value = self.value
+        typecode = value.typecode if isinstance(value, array.array) else None
+        return restore_buffer, (type(value), typecode, pickle.PickleBuffer(value))
+
+
+def hash_name(cls):
+    """Returns the qualified name of a type (or None) for content hashes."""
+    if cls is None:
+        return 'None'
+    return f'{cls.__module__}.{cls.__qualname__}'
+
+
+# values of these types are described completely by their repr
+REPR_TYPES = (type(None), bool, int, float, complex, str, bytes)
+
+# tokens of values that cannot be hashed by content, see hash_value()
+_unique_tokens = itertools.count()
+
+
+def has_complete_repr(value):
+    """Returns whether the repr of a value describes it completely, e.g. for nested lists of numbers."""
+    stack = [value]
+    while stack:
+        value = stack.pop()
+        if type(value) in REPR_TYPES:
+            continue
+        if type(value) in (tuple, list, set, frozenset):
+            stack.extend(value)
+        elif type(value) is dict:
+            stack.extend(value.keys())
+            stack.extend(value.values())
+        else:
+            return False
+    return True
+
+
+def hash_value(h, value):
+    """Updates the hash object *h* with the content of a value.
+
+    Buffers (e.g. arrays) are hashed by their data, values of builtin types
+    by their repr, and other values by their pickle. Values that cannot be
+    pickled update the hash with a unique token, so that two content hashes
+    never match and ``diff`` compares the values instead.
+    """
+    if isinstance(value, str):
+        h.update(value.encode('utf-8'))
+        return
+    try:
+        view = memoryview(value)
+    except TypeError:  # no buffer
+        pass
+    else:
+        h.update(repr((view.format, view.shape)).encode('utf-8'))
+        # tobytes copies strided and Fortran order buffers in C order
+        h.update(view.tobytes())
+        return
+
+    # the repr of other objects may be abbreviated or contain an address
+    if has_complete_repr(value):
+        h.update(repr(value).encode('utf-8'))
+        return
+    try:
+        h.update(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        h.update(f'unique {next(_unique_tokens)}'.encode('utf-8'))
+
+
+def referenced_siblings(node, names):
+    """Returns the siblings of *node* whose names are in *names*.
+
+    Siblings are looked up by name, so that the cost does not depend on
+    the number of siblings.
+    """
+    parent = node.parent()
+    siblings = []
+    if parent is None:
+        return siblings
+    for name in dict.fromkeys(names):
+        if LEVEL_SEPARATOR in name or name == node.name():
+            continue
+        try:
+            siblings.append(parent.child(name))
+        except ValueError:  # e.g. a context variable
+            pass
+    return siblings
+
+
 def is_unbound(func):
     # builtin types
     if hasattr(func, '__objclass__'):
@@ -132,6 +280,47 @@ def is_unbound(func):
     return False
 
 
+async def fetch_raw_values(nodes, obj=None, limit=None):
+    """Returns the raw values of parameter nodes and of all siblings that their expressions refer to.
+
+    Coroutine accessors of descriptor nodes are awaited concurrently, with at
+    most *limit* accessors at the same time.
+
+    Returns
+    -------
+    dict:
+        The raw values keyed by the node ids.
+    """
+    import asyncio  # imported on first use, it is slow to import
+
+    semaphore = asyncio.Semaphore(limit) if limit else None
+
+    async def fetch(node):
+        if semaphore is None:
+            return await node.araw_value(obj)
+        async with semaphore:
+            return await node.araw_value(obj)
+
+    raw_values = {}
+    nodes = list({id(node): node for node in nodes}.values())
+    while nodes:
+        values = await asyncio.gather(*[fetch(node) for node in nodes])
+        for node, value in zip(nodes, values):
+            raw_values[id(node)] = value
+
+        # the siblings that expressions refer to are fetched in the next round
+        referenced = {}
+        for node, value in zip(nodes, values):
+            if not ParamNode._ParamNode__is_expression(value):
+                continue
+            names = ParamNode.expression_vars(value)
+            for sibling in referenced_siblings(node, names):
+                if isinstance(sibling, ParamNode) and id(sibling) not in raw_values:
+                    referenced[id(sibling)] = sibling
+        nodes = list(referenced.values())
+    return raw_values
+
+
 class ParamNode(AbstractLeafNode):
 
     VarPattern = r'([a-zA-Z_0-9]+(\.[a-zA-Z_0-9]+)*)(?![([a-zA-Z_0-9]])'
@@ -208,6 +397,28 @@ class ParamNode(AbstractLeafNode):
 
         self.set_editable(editable)  # set editable after value to enable value initialization
 
+    def _pickle_state(self, protocol):
+        """Returns the node state that is pickled with the given pickle protocol.
+
+        Descriptor callables are pickled by reference, therefore lambdas
+        and functions that are defined locally raise a PicklingError.
+        Buffer values are pickled out-of-band if the protocol supports it.
+        """
+        state = self.__getstate__()
+
+        for func in (self._get if self._desc else None, self._set):
+            if func is None:
+                continue
+            qualname = getattr(func, '__qualname__', '')
+            if '<lambda>' in qualname or '<locals>' in qualname:
+                raise pickle.PicklingError(f'ParamNode {self.absolute_name()} has a descriptor callable '
+                                           f'{qualname} that cannot be pickled')
+
+        if not self._desc and protocol >= 5 and type(self._get) in BufferValue.TYPES:
+            state['_get'] = BufferValue(self._get)
+
+        return state
+
     def __call__(self, fget):
         self._desc = True
         self._get = fget
@@ -220,6 +431,38 @@ class ParamNode(AbstractLeafNode):
     def __set__(self, obj, value):
         return self.set_value(value, obj=obj)
 
+    async def araw_value(self, obj=None):
+        """Returns the node's raw value and awaits coroutine accessors."""
+        import inspect  # imported on first use, it is slow to import
+
+        value = self.raw_value(obj)
+        if inspect.isawaitable(value):
+            value = await value
+        return value
+
+    async def aset_value(self, value, obj=None):
+        """Sets the node value and awaits coroutine accessors, see ``set_value``."""
+        import inspect
+
+        result = self.set_value(value, obj=obj)
+        if inspect.isawaitable(result):
+            await result
+
+    async def avalue(self, obj=None, context=None):
+        """Returns the node value and awaits coroutine accessors.
+
+        The accessors of the siblings that an expression refers to are
+        awaited concurrently.
+
+        Parameters
+        ----------
+        obj: object
+        context: mapping
+            The context provides values for external expression variables.
+        """
+        raw_values = await fetch_raw_values([self], obj)
+        return self._value(raw_values[id(self)], obj, context, raw_values)
+
     def is_descriptor(self):
         """Returns a bool indicating whether the node is a descriptor.
         Descriptors manage access to values that are hold by some other object.
@@ -267,11 +510,13 @@ class ParamNode(AbstractLeafNode):
         """
         """
         self._edit = editable
+        self._invalidate()
 
     def set_validator(self, validator):
         if validator is not None and not hasattr(validator, '__contains__'):
             raise AttributeError(f'validator {validator:!r} does not implement __contains__')
         self._validator = validator
+        self._invalidate()
 
     def set_value(self, value, obj=None):
         """Sets the node value.
@@ -303,20 +548,50 @@ class ParamNode(AbstractLeafNode):
             value = self.__validate_value(value)
 
         if self.is_descriptor():
+            # the result is returned for coroutine accessors, see aset_value
             if self.is_unbound():
                 _log.debug('Calling unbound fset({}): {}'.format(value, self._set))
-                self._set(obj, value)
+                return self._set(obj, value)
             else:
                 _log.debug('Calling bound fset({}): {}'.format(value, self._set))
-                self._set(value)
+                return self._set(value)
 
         else:
             self._get = value
+            self._invalidate()
 
     def type(self):
         """Returns the node value data type or None if type has not been set."""
         return self._t
 
+    def _assign(self, value):
+        """Sets a value that was converted and validated already, e.g. by ``update_columns``."""
+        self._get = value
+        self._invalidate()
+
+    def _validate(self, value):
+        """Returns the converted value or raises ValueError or TypeError like ``set_value``."""
+        return self.__validate_value(value)
+
+    def _update_hash(self, h):
+        AbstractLeafNode._update_hash(self, h)
+        h.update(b'P')
+        h.update(hash_name(self._t).encode('utf-8'))
+        h.update(b'\0')
+        hash_value(h, self._validator)
+        h.update(b'\0')
+        h.update(repr(self._edit).encode('utf-8'))
+        h.update(b'\0')
+
+        if self._desc:
+            # the value of a descriptor is not known, use the accessors instead
+            h.update(repr((self._get, self._set)).encode('utf-8'))
+        else:
+            value = self._get
+            h.update(hash_name(type(value)).encode('utf-8'))
+            h.update(b'\0')
+            hash_value(h, value)
+
     @staticmethod
     def expression_vars(expr):
         expr = expr.replace('= ', '')
@@ -372,10 +647,15 @@ class ParamNode(AbstractLeafNode):
         context: mapping
             The context provides values for external expression variables.
         """
-        value = self.raw_value(obj)
+        return self._value(self.raw_value(obj), obj, context)
+
+    def _value(self, value, obj=None, context=None, raw_values=None):
+        """Returns the node value for the given raw value.
 
+        *raw_values* maps node ids to prefetched raw values of siblings.
+        """
         if self.__is_expression(value):
-            value = self.__eval_expression(value, obj=obj, context=context)
+            value = self.__eval_expression(value, obj=obj, context=context, raw_values=raw_values)
 
         self.__validate_value(value)
         return value
@@ -384,7 +664,7 @@ class ParamNode(AbstractLeafNode):
         """Returns the node validator."""
         return self._validator
 
-    def __eval_expression(self, expr, obj=None, context=None):
+    def __eval_expression(self, expr, obj=None, context=None, raw_values=None):
         """
         Parameters
         ----------
@@ -392,6 +672,8 @@ class ParamNode(AbstractLeafNode):
         context: Mapping or None
             Variable dict extension.
             NOTE: context values take precedence over sibling values!
+        raw_values: Mapping or None
+            Prefetched raw values of siblings keyed by node id.
         Raises
         ------
         NameError:
@@ -405,10 +687,13 @@ class ParamNode(AbstractLeafNode):
 
         sibling_context = {}
         # overwrites kwargs with sibling node values
-        for sibling in self.iter_siblings():
-            if sibling.name() in vars:
-                # TODO: check if sibling is a ParamGroupNode
-                sibling_context[sibling.name()] = sibling.value(obj=obj, context=context)
+        for sibling in referenced_siblings(self, vars):
+            # TODO: check if sibling is a ParamGroupNode
+            if raw_values is not None and id(sibling) in raw_values:
+                value = sibling._value(raw_values[id(sibling)], obj, context, raw_values)
+            else:
+                value = sibling.value(obj=obj, context=context)
+            sibling_context[sibling.name()] = value
 
         sibling_context.update(context or {})
 
@@ -0,0 +1,253 @@
+# profile.py
+"""Per-node profiling of value access.
+
+A ``Profiler`` collects statistics for every parameter node that is
+accessed while it is running: the number of ``value``/``set_value``
+calls, content hash cache hits and misses, and the time spent in
+expression evaluation, validation, and descriptor getters and setters.
+The expression time of a node excludes the time spent evaluating the
+siblings it refers to, so that the slowest nodes can be found with
+``Profiler.top``.
+
+The profiler instruments the node classes while it is running only, so
+there is no overhead when no profiler is running.
+
+Examples
+--------
+
+>>> with Profiler() as profiler:
+>>>     view.repaint()
+>>> print(profiler.report(10))
+"""
+
+# system modules
+import time
+import functools
+import threading
+
+# sparc modules
+from .node import AbstractLeafNode
+from .param import ParamNode
+
+__all__ = ['Profiler', 'NodeStats', 'record_cache']
+
+
+# the running profiler
+_active = None
+
+
+def record_cache(node, hit):
+    """Records a cache hit or miss of a node with the running profiler.
+
+    Caches outside of the core node classes call this function, it does
+    nothing if no profiler is running.
+    """
+    if _active is not None:
+        _active._stats_of(node).record_cache(hit)
+
+
+class NodeStats(object):
+    """The statistics of a single node. Times are in seconds."""
+
+    __slots__ = ('node', 'value_calls', 'set_value_calls', 'cache_hits', 'cache_misses', 'value_time',
+                 'set_value_time', 'expression_time', 'validation_time', 'fget_time', 'fset_time')
+
+    def __init__(self, node):
+        self.node = node
+        self.value_calls = 0
+        self.set_value_calls = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.value_time = 0.0  # including evaluation of referenced siblings
+        self.set_value_time = 0.0
+        self.expression_time = 0.0  # excluding evaluation of referenced siblings
+        self.validation_time = 0.0
+        self.fget_time = 0.0
+        self.fset_time = 0.0
+
+    def __repr__(self):
+        return f'NodeStats({self.node.absolute_name()!r}, own_time={self.own_time:.6f})'
+
+    @property
+    def own_time(self):
+        """The time spent for this node, excluding the evaluation of other nodes."""
+        return self.expression_time + self.validation_time + self.fget_time + self.fset_time
+
+    def record_cache(self, hit):
+        if hit:
+            self.cache_hits += 1
+        else:
+            self.cache_misses += 1
+
+
+class Profiler(object):
+    """Collects per-node statistics of value access while it is running.
+
+    Only one profiler can run at a time.
+    """
+
+    COLUMNS = [('value_calls', 'value()'), ('set_value_calls', 'set_value()'), ('cache_hits', 'hits'),
+               ('cache_misses', 'misses'), ('value_time', 'value ms'), ('own_time', 'own ms'),
+               ('expression_time', 'expr ms'), ('validation_time', 'valid ms'), ('fget_time', 'fget ms'),
+               ('fset_time', 'fset ms')]
+
+    def __init__(self, clock=time.perf_counter):
+        """Initializes a new Profiler.
+
+        Parameters
+        ----------
+        clock: callable
+            Returns the current time in seconds.
+        """
+        self._clock = clock
+        self._stats = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._originals = []
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def is_running(self):
+        return _active is self
+
+    def report(self, n=10, key='own_time'):
+        """Returns a table of the top *n* nodes as str, see ``top``."""
+        rows = [['node'] + [title for _, title in self.COLUMNS]]
+        for stats in self.top(n, key):
+            row = [stats.node.absolute_name()]
+            for attr, title in self.COLUMNS:
+                value = getattr(stats, attr)
+                row.append(f'{value * 1000:.3f}' if attr.endswith('_time') else str(value))
+            rows.append(row)
+
+        widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+        lines = []
+        for row in rows:
+            cells = [row[0].ljust(widths[0])] + [cell.rjust(width) for cell, width in zip(row[1:], widths[1:])]
+            lines.append('  '.join(cells))
+        return '\n'.join(lines)
+
+    def reset(self):
+        """Removes all collected statistics."""
+        self._stats = {}
+
+    def start(self):
+        """Starts collecting statistics.
+
+        Raises
+        ------
+        RuntimeError:
+            If a profiler is running already.
+        """
+        global _active
+        if _active is not None:
+            raise RuntimeError('a profiler is running already')
+
+        instrumented = [
+            (ParamNode, 'value', self._record_value),
+            (ParamNode, 'set_value', self._record_set_value),
+            (ParamNode, 'raw_value', self._record_raw_value),
+            (ParamNode, '_ParamNode__eval_expression', self._record_expression),
+            (ParamNode, '_ParamNode__validate_value', self._record_validation),
+        ]
+        for cls, name, record in instrumented:
+            func = cls.__dict__[name]
+            self._originals.append((cls, name, func))
+            setattr(cls, name, self._instrument(func, record))
+
+        func = AbstractLeafNode.__dict__['content_hash']
+        self._originals.append((AbstractLeafNode, 'content_hash', func))
+        setattr(AbstractLeafNode, 'content_hash', self._instrument_cache(func))
+        _active = self
+
+    def stats(self):
+        """Returns a list of the statistics of all accessed nodes."""
+        return list(self._stats.values())
+
+    def stop(self):
+        """Stops collecting statistics and removes the instrumentation."""
+        global _active
+        if _active is not self:
+            return
+        for cls, name, func in reversed(self._originals):
+            setattr(cls, name, func)
+        self._originals = []
+        _active = None
+
+    def top(self, n=10, key='own_time'):
+        """Returns the statistics of the *n* nodes with the highest *key*.
+
+        Parameters
+        ----------
+        n: int
+        key: str
+            A NodeStats attribute, e.g. 'own_time', 'value_time' or 'value_calls'.
+        """
+        return sorted(self._stats.values(), key=lambda stats: getattr(stats, key), reverse=True)[:n]
+
+    def _instrument(self, func, record):
+        clock = self._clock
+        local = self._local
+
+        @functools.wraps(func)
+        def wrapper(node, *args, **kwargs):
+            # every stack entry collects the time of nested instrumented calls
+            try:
+                stack = local.stack
+            except AttributeError:
+                stack = local.stack = [0.0]
+            stack.append(0.0)
+            start = clock()
+            try:
+                return func(node, *args, **kwargs)
+            finally:
+                elapsed = clock() - start
+                nested = stack.pop()
+                stack[-1] += elapsed
+                record(self._stats_of(node), node, elapsed, elapsed - nested)
+        return wrapper
+
+    def _instrument_cache(self, func):
+        @functools.wraps(func)
+        def wrapper(node):
+            if isinstance(node, ParamNode):
+                self._stats_of(node).record_cache(node._h is not None)
+            return func(node)
+        return wrapper
+
+    @staticmethod
+    def _record_expression(stats, node, elapsed, own):
+        stats.expression_time += own
+
+    @staticmethod
+    def _record_raw_value(stats, node, elapsed, own):
+        if node._desc:
+            stats.fget_time += own
+
+    @staticmethod
+    def _record_set_value(stats, node, elapsed, own):
+        stats.set_value_calls += 1
+        stats.set_value_time += elapsed
+        if node._desc:
+            stats.fset_time += own
+
+    @staticmethod
+    def _record_validation(stats, node, elapsed, own):
+        stats.validation_time += own
+
+    @staticmethod
+    def _record_value(stats, node, elapsed, own):
+        stats.value_calls += 1
+        stats.value_time += elapsed
+
+    def _stats_of(self, node):
+        try:
+            return self._stats[id(node)]
+        except KeyError:
+            with self._lock:
+                return self._stats.setdefault(id(node), NodeStats(node))
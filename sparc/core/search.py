@@ -0,0 +1,263 @@
+# search.py
+"""Searching node trees by name, path, type and value.
+
+A ``SearchIndex`` holds the searchable texts of all nodes of a tree, so
+that repeated searches, e.g. one per keystroke in a filter field, do not
+visit the nodes. The texts are kept in chunks of joined lines, which are
+searched with compiled regular expressions, i.e. a search scans the texts
+in C instead of calling Python code per node. Changes of the tree are
+applied to the index incrementally with ``add``, ``remove`` and ``update``,
+which only rebuild the joined text of the affected chunks.
+
+Examples
+--------
+
+>>> index = SearchIndex(root, values=True)
+>>> index.find('volt', mode='prefix')
+>>> index.find('*.gain', mode='glob', fields=('path',))
+>>> index.remove(root['channels.ch1'])
+"""
+
+# system modules
+import re
+import bisect
+import itertools
+
+# sparc modules
+from .node import AbstractNode
+from .param import ParamNode
+
+__all__ = ['SearchIndex', 'with_ancestors']
+
+
+FIELDS = ('name', 'path', 'type', 'value')
+MODES = ('prefix', 'substring', 'glob')
+
+# the number of nodes per chunk
+CHUNK_SIZE = 4096
+
+
+def compile_pattern(pattern, mode='substring'):
+    """Returns a regular expression that finds the lines of a joined text and its offset.
+
+    Joined texts start and end with a line break. Anchored patterns match
+    the line break before a line instead of using ``^``, which keeps the
+    fast literal search of the regex engine, so the start of the line is
+    the start of the match plus the returned offset.
+
+    Parameters
+    ----------
+    pattern: str
+    mode: str
+        'prefix', 'substring' or 'glob'. Glob patterns must match the whole
+        line, ``*`` matches any text and ``?`` matches a single character.
+
+    Returns
+    -------
+    tuple:
+        The compiled regular expression and the offset of its matches.
+    """
+    if mode == 'prefix' or mode == 'substring' and not pattern:
+        return re.compile('\n' + re.escape(pattern)), 1
+    elif mode == 'substring':
+        return re.compile(re.escape(pattern)), 0
+    elif mode == 'glob':
+        parts = []
+        for char in pattern:
+            if char == '*':
+                parts.append('[^\n]*')
+            elif char == '?':
+                parts.append('[^\n]')
+            else:
+                parts.append(re.escape(char))
+        return re.compile('\n' + ''.join(parts) + '(?=\n)'), 1
+    else:
+        raise ValueError(f'mode must be one of {MODES}, not {mode!r}')
+
+
+def with_ancestors(nodes, root):
+    """Returns the set of the given nodes and all their ancestors below *root*.
+
+    Shows the paths to search results in a tree view.
+    """
+    result = set()
+    for node in nodes:
+        while node is not None and node is not root and node not in result:
+            result.add(node)
+            node = node.parent()
+    return result
+
+
+class Chunk(object):
+    """A block of index entries with their joined texts by field."""
+
+    def __init__(self):
+        self.nodes = []
+        self.texts = []
+        self.removed = 0
+        self.joined = {}  # (field, case_sensitive) -> (text, line starts)
+
+    def __len__(self):
+        return len(self.nodes)
+
+
+class SearchIndex(object):
+    """An index of the searchable texts of all nodes of a tree.
+
+    The fields of a node are its name, its path relative to the root, the
+    name of its value type, and, if enabled, its raw value as a string.
+    The values of descriptors are not indexed, as reading them may be
+    slow or have side effects.
+
+    The index is not updated automatically, changes of the tree must be
+    applied with ``add``, ``remove`` and ``update``.
+    """
+
+    def __init__(self, root, values=False, chunk_size=CHUNK_SIZE):
+        """Builds the index of all children of *root*.
+
+        Parameters
+        ----------
+        root: AbstractNode
+        values: bool
+            Whether raw values are indexed.
+        chunk_size: int
+            The number of nodes whose texts are joined in a chunk.
+        """
+        self._root = root
+        self._values = values
+        self._chunk_size = chunk_size
+        self._chunks = []
+        self._where = {}  # node -> chunk
+        self.rebuild()
+
+    def __contains__(self, node):
+        return node in self._where
+
+    def __len__(self):
+        return len(self._where)
+
+    def add(self, node):
+        """Adds a node and its children, or updates them if they are in the index already."""
+        for node in self._subtree(node):
+            if node in self._where:
+                self.update(node)
+            else:
+                self._append(node)
+
+    def find(self, pattern, mode='substring', fields=('name',), case_sensitive=False, limit=None):
+        """Returns the nodes with a field that matches a pattern.
+
+        Parameters
+        ----------
+        pattern: str
+        mode: str
+            'prefix', 'substring' or 'glob', see ``compile_pattern``.
+        fields: Iterable
+            Some of 'name', 'path', 'type' and 'value'.
+        case_sensitive: bool
+        limit: int or None
+            The maximum number of returned nodes.
+
+        Returns
+        -------
+        list:
+            The matching nodes in the order in which they were added to the index.
+        """
+        for field in fields:
+            if field not in FIELDS:
+                raise ValueError(f'field must be one of {FIELDS}, not {field!r}')
+            if field == 'value' and not self._values:
+                raise ValueError('values are not indexed')
+        # case-insensitive searches use lower case texts, which is much faster than re.IGNORECASE
+        if not case_sensitive:
+            pattern = pattern.lower()
+        regex, offset = compile_pattern(pattern, mode)
+
+        result = []
+        for chunk in self._chunks:
+            rows = set()
+            for field in fields:
+                text, starts = self._joined(chunk, field, case_sensitive)
+                for match in regex.finditer(text):
+                    rows.add(bisect.bisect_right(starts, match.start() + offset) - 1)
+            result.extend(chunk.nodes[row] for row in sorted(rows))
+            if limit is not None and len(result) >= limit:
+                return result[:limit]
+        return result
+
+    def rebuild(self):
+        """Rebuilds the index of the whole tree."""
+        self._chunks = []
+        self._where = {}
+        for node in self._root.iter_children(recursive=True):
+            self._append(node)
+
+    def remove(self, node):
+        """Removes a node and its children."""
+        for node in self._subtree(node):
+            chunk = self._where.pop(node, None)
+            if chunk is None:
+                continue
+            row = self._row(chunk, node)
+            chunk.nodes[row] = None
+            chunk.texts[row] = None
+            chunk.removed += 1
+            chunk.joined.clear()
+            if chunk.removed == len(chunk):
+                # the empty text of the chunk would match e.g. an empty pattern
+                self._chunks.remove(chunk)
+
+    def update(self, node):
+        """Updates the texts of a node, e.g. after its value changed."""
+        chunk = self._where.get(node)
+        if chunk is None:
+            raise ValueError(f'{node!r} is not in the index')
+        chunk.texts[self._row(chunk, node)] = self._texts(node)
+        chunk.joined.clear()
+
+    def _append(self, node):
+        if not self._chunks or len(self._chunks[-1]) >= self._chunk_size:
+            self._chunks.append(Chunk())
+        chunk = self._chunks[-1]
+        chunk.nodes.append(node)
+        chunk.texts.append(self._texts(node))
+        chunk.joined.clear()
+        self._where[node] = chunk
+
+    def _joined(self, chunk, field, case_sensitive):
+        """Returns the joined text of a field of a chunk and the start positions of its lines."""
+        try:
+            return chunk.joined[field, case_sensitive]
+        except KeyError:
+            pass
+
+        if chunk.removed:
+            chunk.nodes = [node for node in chunk.nodes if node is not None]
+            chunk.texts = [texts for texts in chunk.texts if texts is not None]
+            chunk.removed = 0
+
+        i = FIELDS.index(field)
+        lines = [texts[i] if case_sensitive else texts[i].lower() for texts in chunk.texts]
+        starts = list(itertools.accumulate(itertools.chain([1], (len(line) + 1 for line in lines[:-1]))))
+        chunk.joined[field, case_sensitive] = result = '\n' + '\n'.join(lines) + '\n', starts
+        return result
+
+    def _row(self, chunk, node):
+        # chunks are small, nodes are compared by identity
+        return chunk.nodes.index(node)
+
+    def _subtree(self, node):
+        yield node
+        if isinstance(node, AbstractNode):
+            yield from node.iter_children(recursive=True)
+
+    def _texts(self, node):
+        if isinstance(node, ParamNode):
+            value_type = node.type()
+            type_name = value_type.__name__ if value_type is not None else ''
+            value = str(node.raw_value()) if self._values and not node.is_descriptor() else ''
+        else:
+            type_name = value = ''
+        texts = (node.name(), node.relative_name(self._root), type_name, value)
+        return tuple(text.replace('\n', ' ') for text in texts)
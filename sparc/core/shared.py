@@ -0,0 +1,370 @@
+# shared.py
+"""Read-only node trees in shared memory.
+
+A ``ParamGroupNode`` tree can be frozen into a single
+``multiprocessing.shared_memory`` block. Worker processes attach to the
+block by name and access the tree through read-only views that provide
+the usual ``child()`` and ``value()`` API. Views are created on access and
+decode only the nodes that are actually used, so attaching to a tree does
+not copy it into the worker process.
+
+Examples
+--------
+
+>>> tree = SharedTree.freeze(root)
+>>> # in a worker process (SharedTree instances pickle by block name)
+>>> tree = SharedTree.attach(tree.name)
+>>> tree.root()['group.x'].value()
+...
+>>> tree.close()
+>>> # in the owning process, when all workers are done
+>>> tree.unlink()
+"""
+
+# system modules
+import pickle
+import struct
+import threading
+from multiprocessing import shared_memory, resource_tracker
+
+# sparc modules
+from .node import LEVEL_SEPARATOR
+from .param import ParamNode, ParamGroupNode
+
+__all__ = ['SharedTree', 'SharedGroupNode', 'SharedParamNode']
+
+
+MAGIC = b'SPRC'
+VERSION = 1
+
+# serializes the attaching without tracking on Python < 3.13
+_attach_lock = threading.Lock()
+
+# magic, version, node count, records offset, sorted children offset, data offset
+HEADER = struct.Struct('<4sIIQQQ')
+
+# parent, first child, child count, name offset, name length, data offset, data length, is group
+RECORD = struct.Struct('<iIIQIQI?')
+
+# index of a child node, children of a node are sorted by name
+CHILD = struct.Struct('<I')
+
+
+def _attach_untracked(name):
+    """Attaches to a shared memory block without registering it with the resource tracker.
+
+    Unregistering the block after attaching would also remove the registration
+    of the owning process from a tracker that it shares with its worker
+    processes, so the registration is skipped instead, like ``track=False``.
+    Blocks that other threads create meanwhile are not tracked either.
+    """
+    with _attach_lock:
+        register = resource_tracker.register
+
+        def skip(resource, rtype):
+            if rtype != 'shared_memory':
+                register(resource, rtype)
+
+        resource_tracker.register = skip
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+
+class SharedTree(object):
+    """A node tree that is stored in a shared memory block.
+
+    Use ``SharedTree.freeze`` to create a new block from a node tree and
+    ``SharedTree.attach`` to access an existing block.
+    """
+
+    def __init__(self, shm, owner=False):
+        """Initializes a new SharedTree.
+
+        Parameters
+        ----------
+        shm: multiprocessing.shared_memory.SharedMemory
+        owner: bool
+            Whether the shared memory block was created by this instance.
+        """
+        self._shm = shm
+        self._owner = owner
+        self._buf = shm.buf
+
+        magic, version, count, records, children, data = HEADER.unpack_from(self._buf, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'shared memory block {shm.name} does not contain a sparc node tree')
+
+        self._count = count
+        self._records = records
+        self._children = children
+        self._data = data
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        if self._owner:
+            self.unlink()
+
+    def __len__(self):
+        """Returns the number of nodes in the tree."""
+        return self._count
+
+    def __reduce__(self):
+        # workers attach to the same block instead of copying it
+        return SharedTree.attach, (self.name,)
+
+    @property
+    def name(self):
+        """The name of the shared memory block."""
+        return self._shm.name
+
+    @staticmethod
+    def attach(name):
+        """Attaches to an existing shared memory block.
+
+        Parameters
+        ----------
+        name: str
+            The name of the shared memory block.
+        """
+        try:
+            # do not let the resource tracker of a worker process unlink the block
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:  # Python < 3.13
+            shm = _attach_untracked(name)
+        return SharedTree(shm)
+
+    def close(self):
+        """Closes the access to the shared memory block from this instance."""
+        if self._buf is not None:
+            self._buf.release()
+            self._buf = None
+            self._shm.close()
+
+    @staticmethod
+    def freeze(root, name=None):
+        """Copies a node tree into a new shared memory block.
+
+        Parameters
+        ----------
+        root: ParamGroupNode or ParamNode
+            The root of the tree. The values of bound descriptor nodes are
+            stored at the time of freezing.
+        name: str or None
+            The name of the new shared memory block or None to generate a
+            unique name.
+
+        Raises
+        ------
+        TypeError:
+            If the tree contains unbound descriptor nodes.
+        """
+        # breadth-first order, so that the children of a node are stored contiguously
+        nodes = [root]
+        parents = [-1]
+        first_children = []
+        index = 0
+        while index < len(nodes):
+            node = nodes[index]
+            first_children.append(len(nodes))
+            if isinstance(node, ParamGroupNode):
+                for child in node.iter_children():
+                    nodes.append(child)
+                    parents.append(index)
+            index += 1
+
+        count = len(nodes)
+        records = HEADER.size
+        children = records + count * RECORD.size
+        data = children + count * CHILD.size
+
+        table = bytearray(data - HEADER.size)
+        blobs = bytearray()
+        for index, node in enumerate(nodes):
+            name_bytes = node.name().encode('utf-8')
+            name_offset = data + len(blobs)
+            blobs += name_bytes
+
+            is_group = isinstance(node, ParamGroupNode)
+            if is_group:
+                blob = b''
+                child_count = node.child_count()
+                first = first_children[index]
+                order = sorted(range(first, first + child_count), key=lambda i: nodes[i].name().encode('utf-8'))
+                for position, child in enumerate(order):
+                    CHILD.pack_into(table, children - HEADER.size + (first + position) * CHILD.size, child)
+            else:
+                if node.is_descriptor() and node.is_unbound():
+                    raise TypeError(f'cannot freeze unbound descriptor node {node.absolute_name()}')
+                blob = pickle.dumps((node.raw_value(), node.type(), node.validator()), pickle.HIGHEST_PROTOCOL)
+                child_count = 0
+                first = first_children[index]
+            data_offset = data + len(blobs)
+            blobs += blob
+
+            RECORD.pack_into(table, index * RECORD.size, parents[index], first, child_count,
+                             name_offset, len(name_bytes), data_offset, len(blob), is_group)
+
+        size = data + len(blobs)
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        HEADER.pack_into(shm.buf, 0, MAGIC, VERSION, count, records, children, data)
+        shm.buf[HEADER.size:data] = table
+        shm.buf[data:size] = blobs
+        return SharedTree(shm, owner=True)
+
+    def node(self, index, parent=None):
+        """Returns a view of the node at the given position in the block.
+
+        Parameters
+        ----------
+        index: int
+        parent: SharedGroupNode or None
+            The view of the parent node. Created if None and the node is not the root.
+        """
+        record = RECORD.unpack_from(self._buf, self._records + index * RECORD.size)
+        if parent is None and record[0] >= 0:
+            parent = self.node(record[0])
+        if record[7]:
+            return SharedGroupNode(self, index, record, parent)
+        return SharedParamNode(self, index, record, parent)
+
+    def root(self):
+        """Returns a view of the root node."""
+        return self.node(0)
+
+    def unlink(self):
+        """Requests the shared memory block to be destroyed.
+
+        Should be called once by the process that created the tree.
+        """
+        self._shm.unlink()
+
+    def _child_index(self, record, name):
+        """Returns the block index of the child with the given name or -1."""
+        key = name.encode('utf-8')
+        lo = record[1]
+        hi = lo + record[2]
+        while lo < hi:
+            mid = (lo + hi) // 2
+            child = CHILD.unpack_from(self._buf, self._children + mid * CHILD.size)[0]
+            child_name = self._name(RECORD.unpack_from(self._buf, self._records + child * RECORD.size))
+            if child_name < key:
+                lo = mid + 1
+            elif child_name > key:
+                hi = mid
+            else:
+                return child
+        return -1
+
+    def _name(self, record):
+        return bytes(self._buf[record[3]:record[3] + record[4]])
+
+    def _value(self, record):
+        return pickle.loads(self._buf[record[5]:record[5] + record[6]])
+
+
+class SharedGroupNode(ParamGroupNode):
+    """A read-only view of a group node in a SharedTree."""
+
+    def __init__(self, tree, index, record, parent=None):
+        self._tree = tree
+        self._i = index
+        self._r = record
+        self._n = tree._name(record).decode('utf-8')
+        self._p = parent
+
+    def __contains__(self, node):
+        return isinstance(node, (SharedGroupNode, SharedParamNode)) and node._tree is self._tree \
+            and node._r[0] == self._i
+
+    def __reduce_ex__(self, protocol):
+        return self._tree.node, (self._i,)
+
+    def add_child(self, *args, **kwargs):
+        raise AttributeError(f'ParamGroupNode {self.absolute_name()} is read-only')
+
+    def child(self, index):
+        if type(index) is int:
+            count = self._r[2]
+            if index < 0:
+                index += count
+            if not 0 <= index < count:
+                raise IndexError('child index out of range')
+            return self._tree.node(self._r[1] + index, self)
+
+        if type(index) is not str:
+            raise TypeError('Unexpected index type %s. Supported types are: int, str' % type(index))
+
+        node = self
+        for name in index.split(LEVEL_SEPARATOR):
+            if not isinstance(node, SharedGroupNode):
+                raise ValueError(f'{name} is not in list')
+            child = node._tree._child_index(node._r, name)
+            if child < 0:
+                raise ValueError(f'{name} is not in list')
+            node = node._tree.node(child, node)
+        return node
+
+    def child_count(self, recursive=False):
+        if not recursive:
+            return self._r[2]
+        return sum([1 for _ in self.iter_children(recursive)])
+
+    def has_children(self):
+        return self._r[2] > 0
+
+    def index_of_child(self, node):
+        name = self.node_name(node)
+        child = self._tree._child_index(self._r, name)
+        if child < 0:
+            raise ValueError(f'{name} is not in list')
+        return child - self._r[1]
+
+    def insert_child(self, index, node):
+        raise AttributeError(f'ParamGroupNode {self.absolute_name()} is read-only')
+
+    def iter_children(self, recursive=False):
+        if not recursive:
+            first = self._r[1]
+            for index in range(first, first + self._r[2]):
+                yield self._tree.node(index, self)
+            return
+        for child in ParamGroupNode.iter_children(self, recursive):
+            yield child
+
+    def pop_child(self, node):
+        raise AttributeError(f'ParamGroupNode {self.absolute_name()} is read-only')
+
+    def remove_child(self, node):
+        raise AttributeError(f'ParamGroupNode {self.absolute_name()} is read-only')
+
+
+class SharedParamNode(ParamNode):
+    """A read-only view of a parameter node in a SharedTree."""
+
+    def __init__(self, tree, index, record, parent=None):
+        self._tree = tree
+        self._i = index
+        self._r = record
+        self._n = tree._name(record).decode('utf-8')
+        self._p = parent
+        self._get, self._t, self._validator = tree._value(record)
+        self._set = None
+        self._desc = False
+        self._edit = False
+
+    def __reduce_ex__(self, protocol):
+        return self._tree.node, (self._i,)
+
+    def set_editable(self, editable):
+        raise AttributeError(f'ParamNode {self.absolute_name()} is read-only')
+
+    def set_validator(self, validator):
+        raise AttributeError(f'ParamNode {self.absolute_name()} is read-only')
+
+    def set_value(self, value, obj=None):
+        raise AttributeError(f'ParamNode {self.absolute_name()} is read-only')
@@ -0,0 +1,459 @@
+# store.py
+"""Persistent node trees in a SQLite database.
+
+A ``SqliteStore`` keeps every node of a tree in one table row that is
+indexed by the node path. The tree is accessed through ``StoreGroupNode``
+and ``StoreParamNode`` instances that are loaded lazily, i.e. only the
+nodes that are actually accessed are read from the database, and
+``child('a.b')`` or iterating a subtree are answered by indexed queries.
+Therefore, the tree does not need to fit into memory.
+
+Values are written through to the database on ``set_value``. Use
+``SqliteStore.batch`` to collect many writes into a single transaction.
+
+Examples
+--------
+
+>>> store = SqliteStore('params.db')
+>>> store.import_tree(root)
+>>> store.root()['group.x'].set_value(2.0)
+>>> with store.batch():
+>>>     for node in store.root()['group'].iter_children():
+>>>         node.set_value(0.0)
+"""
+
+# system modules
+import pickle
+import sqlite3
+import contextlib
+
+# sparc modules
+from .node import LEVEL_SEPARATOR
+from .param import ParamNode, ParamGroupNode
+from .types import Types
+
+__all__ = ['SqliteStore', 'StoreGroupNode', 'StoreParamNode']
+
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS nodes (
+    path TEXT PRIMARY KEY,
+    parent TEXT,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    is_group INTEGER NOT NULL,
+    value BLOB,
+    type TEXT,
+    validator BLOB,
+    editable INTEGER
+);
+CREATE INDEX IF NOT EXISTS nodes_parent ON nodes (parent, position);
+'''
+
+COLUMNS = 'path, parent, position, name, is_group, value, type, validator, editable'
+
+# upper bound of all paths that start with "prefix" + LEVEL_SEPARATOR
+PREFIX_END = chr(ord(LEVEL_SEPARATOR) + 1)
+
+
+def join_path(parent, name):
+    """Returns the path of the child *name* of the node with path *parent*."""
+    return parent + LEVEL_SEPARATOR + name if parent else name
+
+
+class SqliteStore(object):
+    """A node tree that is stored in a SQLite database."""
+
+    def __init__(self, filename, name='root'):
+        """Opens or creates a store.
+
+        Parameters
+        ----------
+        filename: str
+            The database file name or ':memory:'.
+        name: str
+            The name of the root node if a new store is created.
+        """
+        self._db = sqlite3.connect(filename)
+        self._db.executescript(SCHEMA)
+        self._pending = {}
+        self._batch = 0
+        self._root = None
+
+        if self._fetchone('SELECT path FROM nodes WHERE path = ?', ('',)) is None:
+            self._db.execute(f'INSERT INTO nodes ({COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                             ('', None, 0, ParamGroupNode.validate_name(name), 1, None, None, None, None))
+            self._db.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @contextlib.contextmanager
+    def batch(self):
+        """Returns a context manager that collects value writes and commits them at once."""
+        self._batch += 1
+        try:
+            yield self
+        finally:
+            self._batch -= 1
+            if not self._batch:
+                self.flush()
+
+    def close(self):
+        """Writes pending changes and closes the database."""
+        self.flush()
+        self._db.close()
+
+    def flush(self):
+        """Writes all pending value changes to the database."""
+        if self._pending:
+            self._db.executemany('UPDATE nodes SET value = ?, type = ?, validator = ?, editable = ? WHERE path = ?',
+                                 [params + (path,) for path, params in self._pending.items()])
+            self._pending.clear()
+        self._db.commit()
+
+    def import_tree(self, node, parent=''):
+        """Copies a node and all its children into the store.
+
+        Parameters
+        ----------
+        node: ParamGroupNode or ParamNode
+            The node to be copied. If *parent* is the root path '', the children
+            of a ParamGroupNode are copied into the root of the store.
+        parent: str
+            The path of the store group that receives the node.
+        """
+        if parent == '' and isinstance(node, ParamGroupNode):
+            rows = []
+            position = self._next_position(parent)
+            for index, child in enumerate(node.iter_children()):
+                rows.extend(self._rows(child, parent, position + index))
+        else:
+            rows = self._rows(node, parent, self._next_position(parent))
+        self._insert(rows)
+
+    def items(self, prefix=''):
+        """Iterates the (path, raw value) pairs of all parameter nodes below *prefix*.
+
+        The pairs are ordered by path and read with a single indexed query.
+
+        Parameters
+        ----------
+        prefix: str
+            The path of a group node, e.g. 'a.b', or '' for the whole tree.
+        """
+        for path, value in self._db.execute('SELECT path, value FROM nodes WHERE ' + self._below(prefix) +
+                                            ' AND is_group = 0 ORDER BY path', self._bounds(prefix)):
+            pending = self._pending.get(path)
+            yield path, pickle.loads(pending[0] if pending is not None else value)
+
+    def root(self):
+        """Returns the root group node."""
+        if self._root is None:
+            self._root = self._node(self._fetchone(f'SELECT {COLUMNS} FROM nodes WHERE path = ?', ('',)), None)
+        return self._root
+
+    def to_tree(self, path=''):
+        """Returns an in-memory copy of the node with the given path and all its children."""
+        rows = [self._fetchone(f'SELECT {COLUMNS} FROM nodes WHERE path = ?', (path,))]
+        if rows[0] is None:
+            raise ValueError(f'{path} is not in list')
+        rows.extend(self._subtree(path))
+
+        nodes = {}
+        for row in self._preorder(rows):
+            path, parent, _, name, is_group, value, type_name, validator, editable = row
+            if is_group:
+                node = ParamGroupNode(name)
+            else:
+                # writes of a batch are not in the database yet
+                pending = self._pending.get(path)
+                if pending is not None:
+                    value, type_name, validator, editable = pending
+                node = ParamNode(name, type=Types.get_type(type_name) if type_name else None,
+                                 validator=pickle.loads(validator))
+                node._get = pickle.loads(value)
+                node.set_editable(bool(editable))
+            if parent in nodes:
+                nodes[parent].add_child(node)
+            nodes[path] = node
+        return nodes[rows[0][0]]
+
+    def _below(self, prefix):
+        if prefix == '':
+            return 'path > ?'
+        return 'path > ? AND path < ?'
+
+    def _bounds(self, prefix):
+        if prefix == '':
+            return ('',)
+        return prefix + LEVEL_SEPARATOR, prefix + PREFIX_END
+
+    def _delete(self, path):
+        for key in [key for key in self._pending if key == path or key.startswith(path + LEVEL_SEPARATOR)]:
+            del self._pending[key]
+        self._db.execute('DELETE FROM nodes WHERE path = ? OR (' + self._below(path) + ')',
+                         (path,) + self._bounds(path))
+        if not self._batch:
+            self._db.commit()
+
+    def _fetchone(self, sql, params=()):
+        return self._db.execute(sql, params).fetchone()
+
+    def _insert(self, rows):
+        self._db.executemany(f'INSERT INTO nodes ({COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', rows)
+        if not self._batch:
+            self._db.commit()
+
+    def _next_position(self, parent):
+        position = self._fetchone('SELECT MAX(position) FROM nodes WHERE parent = ?', (parent,))[0]
+        return 0 if position is None else position + 1
+
+    def _node(self, row, parent):
+        if row[4]:
+            return StoreGroupNode(self, row, parent)
+        return StoreParamNode(self, row, parent)
+
+    @staticmethod
+    def _preorder(rows):
+        """Sorts the rows of a subtree, ordered by path, in pre-order."""
+        children = {}
+        for row in rows[1:]:
+            children.setdefault(row[1], []).append(row)
+        ordered = []
+        stack = [rows[0]]
+        while stack:
+            row = stack.pop()
+            ordered.append(row)
+            stack.extend(sorted(children.get(row[0], ()), key=lambda r: r[2], reverse=True))
+        return ordered
+
+    def _rows(self, node, parent, position):
+        """Returns the table rows of a node and all its children."""
+        rows = []
+        stack = [(node, parent, position)]
+        while stack:
+            node, parent, position = stack.pop()
+            path = join_path(parent, node.name())
+            if isinstance(node, ParamGroupNode):
+                rows.append((path, parent, position, node.name(), 1, None, None, None, None))
+                stack.extend((child, path, index) for index, child in enumerate(node.iter_children()))
+            else:
+                if node.is_descriptor():
+                    raise TypeError(f'cannot store descriptor node {node.absolute_name()}')
+                rows.append((path, parent, position, node.name(), 0) + self._values(node))
+        return rows
+
+    def _subtree(self, prefix):
+        return self._db.execute(f'SELECT {COLUMNS} FROM nodes WHERE ' + self._below(prefix) + ' ORDER BY path',
+                                self._bounds(prefix)).fetchall()
+
+    @staticmethod
+    def _values(node):
+        type_name = Types.get_name(node.type()) if node.type() is not None else None
+        return (pickle.dumps(node.raw_value(), pickle.HIGHEST_PROTOCOL), type_name,
+                pickle.dumps(node.validator(), pickle.HIGHEST_PROTOCOL), int(node._edit))
+
+    def _write(self, node):
+        self._pending[node._path] = self._values(node)
+        if not self._batch:
+            self.flush()
+
+
+class StoreGroupNode(ParamGroupNode):
+    """A group node of a SqliteStore.
+
+    Child nodes are loaded from the database on first access and kept by
+    their parent afterwards, so that a node is represented by the same
+    instance as long as its parent exists.
+    """
+
+    def __init__(self, store, row, parent=None):
+        self._store = store
+        self._path = row[0]
+        self._n = row[3]
+        self._p = parent
+        self._loaded = {}
+
+    def __contains__(self, node):
+        return isinstance(node, (StoreGroupNode, StoreParamNode)) and node._p is self
+
+    def __reduce_ex__(self, protocol):
+        # pickle an in-memory copy
+        return self._store.to_tree(self._path).__reduce_ex__(protocol)
+
+    def add_child(self, *args, **kwargs):
+        """Adds a new child to the node and writes it to the store.
+
+        Takes the same arguments as ``ParamGroupNode.add_child``.
+        """
+        if not len(args):
+            args = [kwargs.pop('name')]
+        first = args[0]
+
+        if isinstance(first, str):
+            parent_name, name = self.split_name(first)
+            if parent_name != '':
+                return self.child(parent_name).add_child(name, *args[1:], **kwargs)
+            node = ParamGroupNode.add_child(ParamGroupNode('_'), *args, **kwargs)
+            node.set_parent(None)
+        elif isinstance(first, (ParamNode, ParamGroupNode)):
+            node = first
+        else:
+            raise TypeError('unexpected parameter type {}'.format(type(first)))
+
+        return self.insert_child(self.child_count(), node)
+
+    def child(self, index):
+        if type(index) is int:
+            count = self.child_count()
+            if index < 0:
+                index += count
+            if not 0 <= index < count:
+                raise IndexError('child index out of range')
+            row = self._store._fetchone(f'SELECT {COLUMNS} FROM nodes WHERE parent = ? '
+                                        'ORDER BY position LIMIT 1 OFFSET ?', (self._path, index))
+            return self._load(row)
+
+        if type(index) is not str:
+            raise TypeError('Unexpected index type %s. Supported types are: int, str' % type(index))
+
+        node = self
+        names = index.split(LEVEL_SEPARATOR)
+        for level, name in enumerate(names):
+            if not isinstance(node, StoreGroupNode):
+                raise ValueError(f'{name} is not in list')
+            if name in node._loaded:
+                node = node._loaded[name]
+                continue
+
+            # load all missing levels with one query
+            paths = [join_path(node._path, LEVEL_SEPARATOR.join(names[level:end + 1]))
+                     for end in range(level, len(names))]
+            rows = self._store._db.execute(f'SELECT {COLUMNS} FROM nodes WHERE path IN '
+                                           f'({", ".join("?" * len(paths))}) ORDER BY path', paths).fetchall()
+            rows = {row[0]: row for row in rows}
+            for path in paths:
+                if path not in rows or not isinstance(node, StoreGroupNode):
+                    raise ValueError(f'{path} is not in list')
+                node = node._load(rows[path])
+            break
+
+        return node
+
+    def child_count(self, recursive=False):
+        if not recursive:
+            return self._store._fetchone('SELECT COUNT(*) FROM nodes WHERE parent = ?', (self._path,))[0]
+        return self._store._fetchone('SELECT COUNT(*) FROM nodes WHERE ' + self._store._below(self._path),
+                                     self._store._bounds(self._path))[0]
+
+    def has_children(self):
+        return self._store._fetchone('SELECT 1 FROM nodes WHERE parent = ? LIMIT 1', (self._path,)) is not None
+
+    def index_of_child(self, node):
+        name = self.node_name(node)
+        row = self._child_row(name)
+        if row is None:
+            raise ValueError(f'{name} is not in list')
+        return self._store._fetchone('SELECT COUNT(*) FROM nodes WHERE parent = ? AND position < ?',
+                                     (self._path, row[2]))[0]
+
+    def insert_child(self, index, node):
+        """Inserts a copy of the given node and all its children into the store."""
+        if self._child_row(node.name()) is not None:
+            raise KeyError('A node with name "%s" already exists!' % node.name())
+
+        if index < self.child_count():
+            position = self._store._fetchone('SELECT position FROM nodes WHERE parent = ? '
+                                             'ORDER BY position LIMIT 1 OFFSET ?', (self._path, index))[0]
+            self._store._db.execute('UPDATE nodes SET position = position + 1 WHERE parent = ? AND position >= ?',
+                                    (self._path, position))
+            self._store._insert(self._store._rows(node, self._path, position))
+        else:
+            self._store.import_tree(node, self._path)
+        self._invalidate()
+        return self.child(node.name())
+
+    def iter_children(self, recursive=False):
+        if not recursive:
+            rows = self._store._db.execute(f'SELECT {COLUMNS} FROM nodes WHERE parent = ? ORDER BY position',
+                                           (self._path,)).fetchall()
+            for row in rows:
+                yield self._load(row)
+            return
+
+        # load the whole subtree with one query
+        rows = self._store._subtree(self._path)
+        nodes = {self._path: self}
+        for row in SqliteStore._preorder([(self._path,)] + rows)[1:]:
+            node = nodes[row[1]]._load(row)
+            nodes[row[0]] = node
+            yield node
+
+    def pop_child(self, node):
+        """Removes a first level child node from the store and returns an in-memory copy."""
+        name = self.node_name(node)
+        path = join_path(self._path, name)
+        copy = self._store.to_tree(path)
+        self.remove_child(name)
+        return copy
+
+    def remove_child(self, node):
+        if type(node) is int:
+            node = self.child(node)
+        name = self.node_name(node)
+        if self._child_row(name) is None:
+            raise ValueError(f'{name} is not in list')
+        child = self._loaded.pop(name, None)
+        if child is not None:
+            child._p = None
+        self._store._delete(join_path(self._path, name))
+        self._invalidate()
+
+    def _child_row(self, name):
+        return self._store._fetchone(f'SELECT {COLUMNS} FROM nodes WHERE path = ?',
+                                     (join_path(self._path, name),))
+
+    def _load(self, row):
+        node = self._loaded.get(row[3])
+        if node is None:
+            node = self._store._node(row, self)
+            self._loaded[row[3]] = node
+        return node
+
+
+class StoreParamNode(ParamNode):
+    """A parameter node of a SqliteStore. Value changes are written to the store."""
+
+    def __init__(self, store, row, parent=None):
+        self._store = store
+        self._path = row[0]
+        self._n = row[3]
+        self._p = parent
+        pending = store._pending.get(row[0])
+        value, type_name, validator, editable = pending if pending is not None else row[5:]
+        self._get = pickle.loads(value)
+        self._t = Types.get_type(type_name) if type_name else None
+        self._validator = pickle.loads(validator)
+        self._edit = bool(editable)
+        self._set = None
+        self._desc = False
+
+    def __reduce_ex__(self, protocol):
+        # pickle an in-memory copy
+        return self._store.to_tree(self._path).__reduce_ex__(protocol)
+
+    def set_editable(self, editable):
+        ParamNode.set_editable(self, editable)
+        self._store._write(self)
+
+    def set_validator(self, validator):
+        ParamNode.set_validator(self, validator)
+        self._store._write(self)
+
+    def set_value(self, value, obj=None):
+        ParamNode.set_value(self, value, obj)
+        self._store._write(self)
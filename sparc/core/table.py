@@ -0,0 +1,259 @@
+# table.py
+"""Columnar export and import of many trees with the same structure.
+
+A table has one column per parameter node, named by the node name relative
+to the tree root, and one row per tree. Tables are represented as a dict
+of columns, CSV text, or a NumPy structured array (if NumPy is installed).
+Values are converted column by column with the type of the respective
+node, see ``ParamNode.type()``.
+
+Examples
+--------
+
+>>> variants = [...]  # trees with the same structure
+>>> with open('variants.csv', 'w', newline='') as fp:
+>>>     dump_csv(variants, fp)
+>>> with open('variants.csv', 'r', newline='') as fp:
+>>>     variants = load_csv(fp, template=variants[0])
+"""
+
+# system modules
+import csv
+import pickle
+
+# 3rd party modules
+try:
+    import numpy as np
+    HAVE_NUMPY = True
+except ImportError:
+    np = None
+    HAVE_NUMPY = False
+
+# sparc modules
+from .param import ParamNode
+from .types import Types, TYPE_NAMES
+
+__all__ = ['to_columns', 'from_columns', 'update_columns', 'dump_csv', 'load_csv', 'to_array', 'from_array']
+
+
+NUMPY_TYPES = {
+    bool: '?',
+    int: 'i8',
+    float: 'f8'
+}
+
+
+def leaves(tree, expressions=False):
+    """Returns all parameter nodes of a tree.
+
+    Parameters
+    ----------
+    tree: ParamGroupNode
+    expressions: bool
+        Whether to include expression nodes.
+    """
+    return [node for node in tree.iter_children(recursive=True)
+            if isinstance(node, ParamNode) and (expressions or not node.is_expression())]
+
+
+def resolve(trees, expressions=False):
+    """Returns the relative names of the parameter nodes of the first tree and the nodes of every tree.
+
+    Raises
+    ------
+    ValueError:
+        If a tree does not have the parameter nodes of the first tree.
+    """
+    names = [node.relative_name(trees[0]) for node in leaves(trees[0], expressions)]
+    tree_nodes = []
+    for tree in trees:
+        nodes = leaves(tree, expressions)
+        if tree is not trees[0] and [node.relative_name(tree) for node in nodes] != names:
+            raise ValueError(f'tree {tree.name()} does not have the structure of tree {trees[0].name()}')
+        tree_nodes.append(nodes)
+    return names, tree_nodes
+
+
+def to_columns(trees, expressions=False):
+    """Returns a dict with one list of values per parameter node.
+
+    Parameters
+    ----------
+    trees: Sequence of ParamGroupNode
+        Trees with the same structure. The columns are taken from the first tree.
+    expressions: bool
+        Whether to include the (evaluated) values of expression nodes.
+    """
+    if not len(trees):
+        return {}
+    names, tree_nodes = resolve(trees, expressions)
+    rows = [[node.value() for node in nodes] for nodes in tree_nodes]
+    return dict(zip(names, map(list, zip(*rows))))
+
+
+def update_columns(trees, columns):
+    """Sets the values of many trees from a dict of columns.
+
+    Columns of expression nodes and nodes that are not editable are skipped.
+
+    Parameters
+    ----------
+    trees: Sequence of ParamGroupNode
+        Trees with the same structure. The i-th tree receives the i-th value of every column.
+    columns: Mapping
+        A dict with relative node names as keys and sequences of values as values.
+    """
+    if not len(trees):
+        return
+    # resolve the nodes of all trees once, instead of a name lookup per value
+    names, tree_nodes = resolve(trees, expressions=True)
+    positions = {name: i for i, name in enumerate(names)}
+    for name, column in columns.items():
+        if len(column) != len(trees):
+            raise ValueError(f'column {name} has {len(column)} instead of {len(trees)} values')
+        if name not in positions:
+            raise ValueError(f'tree {trees[0].name()} has no parameter node {name}')
+
+        i = positions[name]
+        node = tree_nodes[0][i]
+        if node.is_expression() or not node.is_editable():
+            continue
+        column_nodes = [nodes[i] for nodes in tree_nodes]
+
+        if node.is_descriptor() or any(isinstance(value, str) and value.startswith('=') for value in column):
+            # setters and expressions are handled by set_value
+            for node, value in zip(column_nodes, column):
+                node.set_value(value)
+            continue
+
+        # check the types of the whole column once, only other values are converted like by set_value
+        node_type = node.type()
+        if node_type is not None and not all(type(value) is node_type for value in column):
+            column = [node._validate(value) for value in column]
+        else:
+            validator = node.validator()
+            if validator is not None:
+                for value in column:
+                    if value not in validator:
+                        raise ValueError(f'validator rejected value {value}')
+
+        for node, value in zip(column_nodes, column):
+            node._assign(value)
+
+
+def from_columns(columns, template):
+    """Returns a new tree for every row of a dict of columns.
+
+    Parameters
+    ----------
+    columns: Mapping
+        A dict with relative node names as keys and sequences of values as values.
+    template: ParamGroupNode
+        The tree that is copied for every row. Nodes without a column keep the template value.
+    """
+    count = len(next(iter(columns.values()))) if len(columns) else 0
+    data = pickle.dumps(template, pickle.HIGHEST_PROTOCOL)
+    trees = [pickle.loads(data) for _ in range(count)]
+    update_columns(trees, columns)
+    return trees
+
+
+def dump_csv(trees, fp, expressions=False):
+    """Writes the parameter values of many trees to a CSV file.
+
+    Parameters
+    ----------
+    trees: Sequence of ParamGroupNode
+    fp: file-like object
+        A text file that was opened with ``newline=''``.
+    expressions: bool
+        Whether to include the (evaluated) values of expression nodes.
+    """
+    if not len(trees):
+        return
+    columns = to_columns(trees, expressions)
+    text_columns = []
+    for name, column in columns.items():
+        node_type = trees[0].child(name).type()
+        if node_type is str:
+            text_columns.append(column)
+        else:
+            serializer = Types.get_serializer(node_type or object)
+            text_columns.append(list(map(serializer.serialize, column)))
+
+    writer = csv.writer(fp)
+    writer.writerow(columns.keys())
+    writer.writerows(zip(*text_columns))
+
+
+def load_csv(fp, template):
+    """Returns a new tree for every row of a CSV file written by ``dump_csv``.
+
+    Parameters
+    ----------
+    fp: file-like object
+        A text file that was opened with ``newline=''``.
+    template: ParamGroupNode
+        The tree that is copied for every row.
+    """
+    reader = csv.reader(fp)
+    names = next(reader, [])
+    text_columns = list(zip(*reader)) or [() for _ in names]
+
+    columns = {}
+    for name, column in zip(names, text_columns):
+        node_type = template.child(name).type()
+        if node_type is str:
+            columns[name] = column
+        else:
+            deserialize = Types.get_serializer(node_type or object).deserialize
+            columns[name] = [deserialize(text, **TYPE_NAMES) for text in column]
+    return from_columns(columns, template)
+
+
+def to_array(trees, expressions=False):
+    """Returns the parameter values of many trees as a NumPy structured array.
+
+    Columns of nodes with type bool, int, or float get the corresponding NumPy
+    data type, str columns a unicode data type, and all other columns the
+    object data type.
+
+    Parameters
+    ----------
+    trees: Sequence of ParamGroupNode
+    expressions: bool
+        Whether to include the (evaluated) values of expression nodes.
+    """
+    if not HAVE_NUMPY:
+        raise ImportError('to_array requires NumPy which is not installed')
+
+    columns = to_columns(trees, expressions)
+    arrays = []
+    for name, column in columns.items():
+        node_type = trees[0].child(name).type()
+        if node_type in NUMPY_TYPES:
+            arrays.append(np.asarray(column, dtype=NUMPY_TYPES[node_type]))
+        elif node_type is str:
+            arrays.append(np.asarray(column, dtype=str))
+        else:
+            array = np.empty(len(column), dtype=object)
+            array[:] = column
+            arrays.append(array)
+
+    table = np.empty(len(trees), dtype=[(name, array.dtype) for name, array in zip(columns, arrays)])
+    for name, array in zip(columns, arrays):
+        table[name] = array
+    return table
+
+
+def from_array(table, template):
+    """Returns a new tree for every row of a NumPy structured array written by ``to_array``.
+
+    Parameters
+    ----------
+    table: numpy.ndarray
+    template: ParamGroupNode
+        The tree that is copied for every row.
+    """
+    # tolist converts whole columns to Python objects at once
+    return from_columns({name: table[name].tolist() for name in table.dtype.names}, template)
@@ -1,6 +1,7 @@
 # types.py
 
 # system modules
+import importlib
 from datetime import time, date, datetime
 
 # sparc modules
@@ -24,6 +25,17 @@ TYPE_NAMES = {
 
 TYPE_SERIALIZER = {}
 
+# modules that register types when they are imported, see Types.register_module
+TYPE_MODULES = {}
+
+
+def import_type_modules():
+    """Imports the modules that registered types on import and were not imported yet."""
+    for name, module in list(TYPE_MODULES.items()):
+        del TYPE_MODULES[name]
+        if name not in TYPE_NAMES:
+            importlib.import_module(module)
+
 
 class ReprSerializer(object):
 
@@ -54,14 +66,20 @@ class Types(object):
 
     @staticmethod
     def get_name(cls):
-        for k, v in TYPE_NAMES.items():
-            if v == cls:
-                return k
+        for _ in range(2):
+            for k, v in TYPE_NAMES.items():
+                if v == cls:
+                    return k
+            if not TYPE_MODULES:
+                break
+            import_type_modules()
         raise KeyError(f'no conversion exists for type {cls:!r}')
 
     @staticmethod
     def get_type(name):
         if isinstance(name, str):
+            if name not in TYPE_NAMES and name in TYPE_MODULES:
+                import_type_modules()
             return TYPE_NAMES[name]
         raise TypeError('unexpected type of "name": {}'.format(type(name)))
 
@@ -76,6 +94,8 @@ class Types(object):
         if isinstance(cls, str):
             cls = Types.get_type(cls)
         if isinstance(cls, type):
+            if cls not in TYPE_SERIALIZER and TYPE_MODULES:
+                import_type_modules()
             return TYPE_SERIALIZER.get(cls, ReprSerializer)
         raise TypeError('unexpected type of "cls"')
 
@@ -90,6 +110,22 @@ class Types(object):
         else:
             raise KeyError(f'a type with key "{name}" is already registered')
 
+    @staticmethod
+    def register_module(name, module):
+        """Registers a module that registers the type *name* when it is imported.
+
+        The module is imported when the type is needed, e.g. to load a file,
+        so that modules with slow imports are not imported in advance.
+
+        Parameters
+        ----------
+        name: str
+        module: str
+            The absolute module name.
+        """
+        if name not in TYPE_NAMES:
+            TYPE_MODULES[name] = module
+
     @staticmethod
     def serialize(cls, obj):
         serializer = Types.get_serializer(cls)
@@ -0,0 +1,159 @@
+# watch.py
+"""Reloading node trees when their file changes.
+
+A ``FileWatcher`` polls the modification time of a parameter file. When
+the file changes, it is loaded and the live tree is patched to match it
+(see ``sparc.core.diff.patch``), i.e. only changed values and nodes are
+replaced and every applied change is reported to a callback.
+
+Node trees are not synchronized, so a tree that other threads use, e.g.
+a tree shown in a ``ParamModel``, must not be patched by the polling
+thread of ``start`` without precautions. Either pass the ``RWLock`` that
+guards the tree (see ``sparc.core.lock``), or a *dispatch* function that
+hands the patch over to the thread that owns the tree.
+
+Examples
+--------
+
+>>> watcher = FileWatcher('params.json', root, callback=print)
+>>> watcher.start()  # polls in a background thread
+...
+>>> watcher.stop()
+
+>>> # patch the tree of a ParamModel in the GUI thread
+>>> pending = queue.Queue()
+>>> watcher = FileWatcher('params.json', model.root(), dispatch=pending.put)
+>>> watcher.start()
+>>> timer.timeout.connect(lambda: [pending.get()() for _ in range(pending.qsize())])
+"""
+
+# system modules
+import os
+import logging
+import functools
+import threading
+
+# sparc modules
+from .diff import patch
+from .io import load
+
+__all__ = ['FileWatcher']
+
+
+_log = logging.getLogger(__name__)
+
+
+def load_json(filename):
+    with open(filename, 'r') as fp:
+        return load(fp)
+
+
+class FileWatcher(object):
+    """Patches a live node tree when the file it was loaded from changes.
+
+    ``poll`` loads and patches in the calling thread. The polling thread of
+    ``start`` loads the file in the background, and then either patches the
+    tree itself, holding the write *lock* if there is one, or passes the
+    patch to *dispatch*. The callback is called by the thread that patches.
+    """
+
+    def __init__(self, filename, root, loader=None, callback=None, interval=1.0, lock=None, dispatch=None):
+        """Initializes a new FileWatcher.
+
+        Parameters
+        ----------
+        filename: str
+            The watched file.
+        root: ParamGroupNode
+            The live tree that is patched.
+        loader: callable or None
+            Called with *filename* to load the new tree. Defaults to loading a JSON
+            file with ``sparc.core.io.load``.
+        callback: callable or None
+            Called with every applied ``Change``.
+        interval: float
+            The polling interval of ``start`` in seconds.
+        lock: RWLock or None
+            The lock that guards the tree, it is held for writing while the tree is patched.
+        dispatch: callable or None
+            Called by the polling thread of ``start`` with a function without
+            arguments that patches the tree and returns the list of applied
+            changes. The function must be called by the thread that owns the
+            tree, e.g. the GUI thread. None patches in the polling thread.
+        """
+        self._filename = filename
+        self._root = root
+        self._loader = loader or load_json
+        self._callback = callback
+        self._interval = interval
+        self._lock = lock
+        self._dispatch = dispatch
+        self._stat = self._file_stat()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def poll(self):
+        """Patches the live tree if the file changed since the last call.
+
+        Returns
+        -------
+        list:
+            The list of applied changes.
+        """
+        new = self._load()
+        if new is None:
+            return []
+        return self._patch(new)
+
+    def start(self):
+        """Starts polling the file in a daemon thread, see the notes on threads of ``FileWatcher``."""
+        if self._thread is not None:
+            raise RuntimeError('FileWatcher is already running')
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='FileWatcher', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stops the polling thread."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def _file_stat(self):
+        try:
+            stat = os.stat(self._filename)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _load(self):
+        """Returns the new tree if the file changed since the last call, None otherwise."""
+        stat = self._file_stat()
+        if stat == self._stat or stat is None:
+            return None
+
+        new = self._loader(self._filename)
+        # only remember the file state once the file could be loaded, so that
+        # a partially written file is loaded again on the next change
+        self._stat = stat
+        return new
+
+    def _patch(self, new):
+        if self._lock is None:
+            return patch(self._root, new, self._callback)
+        with self._lock.write():
+            return patch(self._root, new, self._callback)
+
+    def _run(self):
+        while not self._stop.wait(self._interval):
+            try:
+                if self._dispatch is None:
+                    self.poll()
+                    continue
+                new = self._load()
+                if new is not None:
+                    self._dispatch(functools.partial(self._patch, new))
+            except Exception:
+                _log.exception('Failed to reload {}'.format(self._filename))
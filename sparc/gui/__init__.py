@@ -1,16 +1,40 @@
 import warnings
+import importlib
+import importlib.util
 
-try:
-    import PyQt5
-    HAVE_QT = True
-except ImportError:
-    HAVE_QT = False
+from sparc.core import Types
+
+# PyQt5 is imported with the first name of sparc.gui, as importing it is slow
+HAVE_QT = importlib.util.find_spec('PyQt5') is not None
+if not HAVE_QT:
     warnings.warn('sparc.gui requires PyQt5 which is not installed.\n'
                   'You can install PyQt5 in the terminal with\n'
                   'pip install PyQt5')
 
+# name -> module
+NAMES = {
+    'ParamDelegate': 'delegate',
+    'ParamModel': 'model',
+    'ParamFilterProxyModel': 'proxy',
+    'DEFAULT_SETTINGS': 'settings',
+    'print_Qt_config': 'settings',
+    'setting': 'settings',
+    'ColorSerializer': 'types',
+}
+
+__all__ = list(NAMES)
+
 if HAVE_QT:
-    from .delegate import *
-    from .model import *
-    from .settings import *
-    from .types import *
+    Types.register_module('Color', 'sparc.gui.types')
+
+
+def __getattr__(name):
+    if not HAVE_QT or name not in NAMES:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(importlib.import_module(f'.{NAMES[name]}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(NAMES))
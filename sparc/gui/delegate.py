@@ -1,29 +1,112 @@
 # delegate.py
 
 # system modules
-import collections
+import collections.abc
 
-# 3rd party modules
-import numpy as np
+# Qt modules
 from PyQt5 import QtCore, QtGui, QtWidgets
 
 # sparc modules
 from sparc.core import *
-from .settings import DEFAULT_SETTINGS as SETTINGS
+from .settings import setting
 from .model import ParamModel
 
 __all__ = ['ParamDelegate']
 
 
+# the value limits of editors without Interval validators
+INT32_MAX = 2 ** 31 - 1
+FLOAT32_MAX = 3.4028234663852886e+38
+
+
+def source_index(index):
+    """Returns the model and index of a ParamModel for an index of a proxy model, e.g. ParamFilterProxyModel."""
+    model = index.model()
+    while isinstance(model, QtCore.QAbstractProxyModel):
+        index = model.mapToSource(index)
+        model = model.sourceModel()
+    return model, index
+
+
+class ValidatorListModel(QtCore.QAbstractListModel):
+    """A read-only list model of the valid values of a collection validator.
+
+    Combo boxes and completers share the model of a validator, see
+    ``ParamDelegate.validatorModel``. The texts of the values and the rows
+    by text are computed on first use.
+    """
+
+    def __init__(self, validator, colors=False, parent=None):
+        """
+        Parameters
+        ----------
+        validator: Sized
+            The valid values.
+        colors: bool
+            Whether the values are QColors, which are shown as background colors without text.
+        """
+        QtCore.QAbstractListModel.__init__(self, parent)
+        self._validator = validator
+        self._values = validator if isinstance(validator, collections.abc.Sequence) else list(validator)
+        # sequences are not copied, rows that are appended later are not reported
+        self._count = len(self._values)
+        self._colors = colors
+        self._texts = None
+        self._rows = None
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        value = self._values[index.row()]
+        if role in (QtCore.Qt.DisplayRole, QtCore.Qt.EditRole):
+            return '' if self._colors else self.text(index.row())
+        elif role == QtCore.Qt.UserRole:  # QComboBox.currentData
+            return value
+        elif role == QtCore.Qt.BackgroundColorRole and self._colors:
+            return value
+        return None
+
+    def isValid(self, validator):
+        """Returns whether the model still shows the values of a validator.
+
+        The check takes constant time, so changes of a validator that keep its
+        length are not detected.
+        """
+        return validator is self._validator and len(validator) == self._count
+
+    def row(self, value):
+        """Returns the row of a value or -1."""
+        if self._rows is None:
+            self._rows = {}
+            for row, valid_value in enumerate(self._values[:self._count]):
+                self._rows.setdefault(self._key(valid_value), row)
+        return self._rows.get(self._key(value), -1)
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else self._count
+
+    def text(self, row):
+        if self._texts is None:
+            self._texts = [None] * self._count
+        text = self._texts[row]
+        if text is None:
+            text = self._texts[row] = str(self._values[row])
+        return text
+
+    def _key(self, value):
+        return value.name() if self._colors else str(value)
+
+
 class ParamDelegate(QtWidgets.QStyledItemDelegate):
 
     def __init__(self, parent=None):
         QtWidgets.QStyledItemDelegate.__init__(self, parent)
+        self._validatorModels = {}  # id(validator) -> ValidatorListModel
 
     def createEditor(self, parent, option, index):
         """
         """
-        model = index.model()
+        model, index = source_index(index)
         assert isinstance(model, ParamModel), 'ParamModelDelegate can only be used with ParamModel!'
         node = model.nodeFromIndex(index)
 
@@ -44,21 +127,23 @@ class ParamDelegate(QtWidgets.QStyledItemDelegate):
 
             # if validator is a Sized, the delegate is a QComboBox
             # Sized := limited number of known choices
-            if isinstance(validator, collections.Sized):
-
-                if node_type == QtGui.QColor:
-                    editor = QtWidgets.QComboBox(parent)
-                    for row, valid_value in enumerate(validator):
-                        editor.addItem('', valid_value)
-                        editor.setItemData(row, valid_value, QtCore.Qt.BackgroundColorRole)
-                    editor.setCurrentText(node.value().name())
-                    return editor
-                else:
-                    editor = QtWidgets.QComboBox(parent)
-                    for valid_value in validator:
-                        editor.addItem(str(valid_value), valid_value)
-                    editor.setCurrentText(str(node.value()))
-                    return editor
+            if isinstance(validator, collections.abc.Sized):
+
+                # the items are shared by all editors of the validator
+                choices = self.validatorModel(validator, colors=node_type == QtGui.QColor)
+                editor = QtWidgets.QComboBox(parent)
+                editor.view().setUniformItemSizes(True)
+                editor.setModel(choices)
+                if node_type != QtGui.QColor:
+                    # type to search
+                    editor.setEditable(True)
+                    editor.setInsertPolicy(QtWidgets.QComboBox.NoInsert)
+                    completer = QtWidgets.QCompleter(choices, editor)
+                    completer.setCaseSensitivity(QtCore.Qt.CaseInsensitive)
+                    completer.setFilterMode(QtCore.Qt.MatchContains)
+                    editor.setCompleter(completer)
+                editor.setCurrentIndex(choices.row(node.value()))
+                return editor
 
             if node_type is str:
                 editor = QtWidgets.QLineEdit(parent)
@@ -71,22 +156,18 @@ class ParamDelegate(QtWidgets.QStyledItemDelegate):
                     # TODO: make sure spinbox can handle min and max
                     editor.setRange(validator.min, validator.max)
                 else:
-                    # TODO: replace numpy code
-                    maxi = np.iinfo(np.int32).max
-                    editor.setRange(-maxi, maxi)
+                    editor.setRange(-INT32_MAX, INT32_MAX)
                 editor.setValue(node.value())
                 return editor
                 
             if node_type is float:
                 editor = QtWidgets.QDoubleSpinBox(parent)
-                editor.setDecimals(SETTINGS.value('decimals'))
+                editor.setDecimals(setting('decimals'))
                 if isinstance(validator, Interval):
                     # TODO: make sure spinbox can handle min and max
                     editor.setRange(validator.min, validator.max)
                 else:
-                    # TODO: replace numpy code
-                    maxf = np.finfo(np.float32).max
-                    editor.setRange(-maxf, maxf)
+                    editor.setRange(-FLOAT32_MAX, FLOAT32_MAX)
                 editor.setValue(node.value())
                 return editor
                 
@@ -106,6 +187,13 @@ class ParamDelegate(QtWidgets.QStyledItemDelegate):
 
         return QtWidgets.QStyledItemDelegate.createEditor(self, parent, option, index)
 
+    def validatorModel(self, validator, colors=False):
+        """Returns the cached list model of the valid values of a collection validator."""
+        model = self._validatorModels.get(id(validator))
+        if model is None or not model.isValid(validator):
+            model = self._validatorModels[id(validator)] = ValidatorListModel(validator, colors, self)
+        return model
+
     def paint(self, painter, option, index):
         QtWidgets.QStyledItemDelegate.paint(self, painter, option, index)
 
@@ -113,11 +201,14 @@ class ParamDelegate(QtWidgets.QStyledItemDelegate):
         QtWidgets.QStyledItemDelegate.setEditorData(self, editor, index)
 
     def setModelData(self, editor, model, index):
-        node = model.nodeFromIndex(index)
-
         if isinstance(editor, QtWidgets.QComboBox):
-            # get user data (with correct type) instead of str
-            model.setData(index, editor.currentData(), QtCore.Qt.EditRole)
+            row = editor.currentIndex()
+            if editor.isEditable():
+                # the typed text may not have selected an item
+                row = editor.model().row(editor.currentText())
+            if row >= 0:
+                # get user data (with correct type) instead of str
+                model.setData(index, editor.itemData(row), QtCore.Qt.EditRole)
         elif isinstance(editor, QtWidgets.QColorDialog):
             if editor.result() == QtWidgets.QDialog.Accepted:
                 model.setData(index, editor.selectedColor(), QtCore.Qt.EditRole)
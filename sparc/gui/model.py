@@ -1,28 +1,107 @@
 # model.py
 
 # system modules
+import os
 import pickle
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 # Qt modules
 from PyQt5 import QtCore, QtGui
 
 # sparc modules
 from sparc.core import *
-from .settings import DEFAULT_SETTINGS as SETTINGS
+from sparc.core.param import referenced_siblings
+from .settings import setting
+from . import types  # registers the Color type
 
 __all__ = ['ParamModel']
 
 
+# the roles whose data depends on the value of a node
+VALUE_ROLES = (QtCore.Qt.DisplayRole, QtCore.Qt.CheckStateRole, QtCore.Qt.BackgroundColorRole)
+
+
+def evaluate(node, context):
+    """Returns a tuple of the value of a node and the raised exception or None."""
+    try:
+        return node.value(context=context), None
+    except Exception as e:
+        return None, e
+
+
+def write_tree(node, filename, binary=True, callback=None):
+    """Writes a tree to a temporary file that replaces *filename* when it is complete.
+
+    A failed write leaves an existing file unchanged.
+
+    Parameters
+    ----------
+    node: ParamGroupNode
+    filename: str
+    binary: bool
+        Whether the tree is pickled or written as JSON.
+    callback: callable or None
+        Called with the number of written nodes, see ``dump``. Not called for binary files.
+    """
+    temp = f'{filename}.{threading.get_ident()}.tmp'
+    try:
+        if binary:
+            with open(temp, 'wb') as spc:
+                pickle.dump(node, spc, protocol=pickle.HIGHEST_PROTOCOL)
+        else:
+            with open(temp, 'w') as spj:
+                dump(node, spj, indent=2, callback=callback)
+        os.replace(temp, filename)
+    except BaseException:
+        if os.path.exists(temp):
+            os.remove(temp)
+        raise
+
+
+def read_tree(filename, binary=True, callback=None):
+    """Reads a tree written by ``write_tree``.
+
+    The content hash of the tree is computed as well, so that comparing it
+    with the tree of a model in ``ParamModel.patch`` later does not have to.
+    """
+    if binary:
+        with open(filename, 'rb') as spc:
+            root = pickle.load(spc)
+    else:
+        with open(filename, 'r') as spj:
+            root = load(spj, callback=callback)
+    root.content_hash()
+    return root
+
+
 class ParamItem(object):
 
-    def __init__(self, node):
+    def __init__(self, node, evaluated=None):
+        """
+        Parameters
+        ----------
+        node: ParamNode or ParamGroupNode
+        evaluated: tuple or None
+            The result of ``evaluate`` if the value was evaluated in advance.
+        """
         if not isinstance(node, (ParamNode, ParamGroupNode)):
             raise TypeError('node must be ParamNode or ParamGroupNode instance')
         if isinstance(node, ParamNode) and node.is_unbound():
             raise TypeError('ParamModel does not support unbound ParamNode instances')
         self.node = node
+        self.evaluated = evaluated
+
+    def value(self, context=None):
+        """Returns the value of the node."""
+        if self.evaluated is None:
+            return self.node.value(context=context)
+        value, error = self.evaluated
+        if error is not None:
+            raise error
+        return value
 
-    def data(self, column, role, context=None):
+    def data(self, column, role, context=None, decimals=None):
 
         if role == QtCore.Qt.CheckStateRole:
             if column == 1:  # value column
@@ -30,7 +109,7 @@ class ParamItem(object):
                     return None
 
                 if self.node.type() is bool:
-                    return QtCore.Qt.Checked if self.node.value() else QtCore.Qt.Unchecked
+                    return QtCore.Qt.Checked if self.value() else QtCore.Qt.Unchecked
 
         if role == QtCore.Qt.DisplayRole:
             if column == 0:  # name column
@@ -40,7 +119,7 @@ class ParamItem(object):
                     return None
 
                 try:
-                    value = self.node.value(context=context)
+                    value = self.value(context=context)
                 except Exception as e:
                     value = str(e)
 
@@ -49,7 +128,9 @@ class ParamItem(object):
                 if value_type == QtGui.QColor:
                     return None
                 elif value_type is float:
-                    return '{v:.{d}f}'.format(v=value, d=SETTINGS.value('decimals'))
+                    if decimals is None:
+                        decimals = setting('decimals')
+                    return '{v:.{d}f}'.format(v=value, d=decimals)
                 elif value_type is not bool:
                     return str(value)
 
@@ -69,7 +150,7 @@ class ParamItem(object):
             if isinstance(self.node, ParamGroupNode):
                 return QtGui.QBrush(QtCore.Qt.lightGray)
             elif column == 1 and self.node.type() == QtGui.QColor:
-                return QtGui.QBrush(self.node.value())
+                return QtGui.QBrush(self.value())
 
         elif role == QtCore.Qt.ForegroundRole:
             if isinstance(self.node, ParamNode) and not self.node.is_editable():
@@ -118,13 +199,95 @@ class ParamModel(QtCore.QAbstractItemModel):
     # TODO: catch all exceptions and emit them as errorMessage
     errorMessage = QtCore.pyqtSignal(str)
     valueChanged = QtCore.pyqtSignal(str)
+    # emitted for nodes that are inserted or removed with the model, also in rows that were not fetched yet
+    nodeInserted = QtCore.pyqtSignal(object)
+    nodeAboutToBeRemoved = QtCore.pyqtSignal(object)
+    # the progress of saveAsync and loadAsync as the number of processed nodes and the total, 0 if it is not known
+    ioProgress = QtCore.pyqtSignal(int, int)
+    # emitted with the file name when saveAsync or loadAsync finished
+    saveFinished = QtCore.pyqtSignal(str)
+    loadFinished = QtCore.pyqtSignal(str)
+    # emitted by worker threads with a node and the future of its value
+    _evaluated = QtCore.pyqtSignal(object, object)
+    # emitted by the IO thread with a (handler, filename) tuple and a future
+    _ioDone = QtCore.pyqtSignal(object, object)
+
+    # the default number of rows that are added to a group by fetchMore
+    FETCH_BATCH_SIZE = 256
+    # the text of values that are evaluated in the background
+    PLACEHOLDER = '...'
+    # patch resets the model if a tree has more changes
+    RESET_THRESHOLD = 1000
 
     def __init__(self, root=None, parent=None):
         """
         """
         QtCore.QAbstractItemModel.__init__(self, parent)
         self._context = {}
-        self._root = root or ParamGroupNode('root')
+        self._root = root if root is not None else ParamGroupNode('root')
+
+        # display data by node and (column, role), see data()
+        self._cache = {}
+        self._cacheable = {}
+        self._cached = {}  # parent -> children with cache entries
+        # read once, QSettings reads are slow
+        self._decimals = setting('decimals')
+        # changed nodes whose dataChanged signals are emitted in the next event loop iteration
+        self._changed = {}
+        # the number of rows of a group that are visible to views, see fetchMore()
+        self._batchSize = self.FETCH_BATCH_SIZE
+        self._fetched = {}
+        # the child counts of groups, child_count() may be slow, e.g. a query of a StoreGroupNode
+        self._counts = {}
+        self._fetching = False
+        # background evaluation, see setAsyncEvaluation()
+        self._executor = None
+        self._values = {}  # node -> result of evaluate()
+        self._pending = {}  # node -> future
+
+        # a single thread saves and loads files in the order of the calls
+        self._ioExecutor = None
+
+        self._evaluated.connect(self._onEvaluated, QtCore.Qt.QueuedConnection)
+        self._ioDone.connect(self._onIODone, QtCore.Qt.QueuedConnection)
+
+        self.dataChanged.connect(self._onDataChanged)
+        self.modelReset.connect(self.invalidate)
+        self.layoutChanged.connect(self.invalidate)
+        self.rowsInserted.connect(self._onRowsInserted)
+        self.rowsMoved.connect(self.invalidate)
+        self.rowsRemoved.connect(self._onRowsRemoved)
+
+    def batchSize(self):
+        """Returns the number of rows that are added to a group by fetchMore."""
+        return self._batchSize
+
+    def cancelEvaluation(self, node=None):
+        """Cancels the pending evaluation of a node or of all nodes if *node* is None.
+
+        Evaluations that already started are finished.
+        """
+        nodes = list(self._pending) if node is None else [node]
+        for node in nodes:
+            future = self._pending.get(node)
+            if future is not None and future.cancel():
+                del self._pending[node]
+
+    def cancelHidden(self, view):
+        """Cancels the pending evaluations of cells that are not visible in a view."""
+        rect = view.viewport().rect()
+        for node in list(self._pending):
+            if not self._isVisible(node) or not rect.intersects(view.visualRect(self.indexFromNode(node, 1))):
+                self.cancelEvaluation(node)
+
+    def canFetchMore(self, parent):
+        """Returns whether the group at *parent* has rows that were not fetched yet."""
+        if parent.isValid() and parent.column() != 0:
+            return False
+        node = self.nodeFromIndex(parent)
+        if isinstance(node, ParamNode):
+            return False
+        return self._fetchedCount(node) < self._childCount(node)
 
     def columnCount(self, parentIndex=None, *args, **kwargs):
         """
@@ -140,9 +303,51 @@ class ParamModel(QtCore.QAbstractItemModel):
             return None
 
         node = self.nodeFromIndex(index)
-        item = ParamItem(node)
-
-        return item.data(index.column(), role, context=self._context)
+        key = (index.column(), role)
+        try:
+            data = self._cache[node][key]
+        except KeyError:
+            pass
+        else:
+            record_cache(node, True)
+            return data
+        record_cache(node, False)
+
+        cacheable = self._isCacheable(node)
+        evaluated = None
+        if self._executor is not None and index.column() == 1 and role in VALUE_ROLES and self._isSlow(node):
+            evaluated = self._values.get(node)
+            if evaluated is None:
+                self._requestValue(node)
+                return self.PLACEHOLDER if role == QtCore.Qt.DisplayRole else None
+
+        item = ParamItem(node, evaluated)
+        data = item.data(index.column(), role, context=self._context, decimals=self._decimals)
+        if cacheable:
+            self._cache[node][key] = data
+        return data
+
+    def decimals(self):
+        """Returns the number of decimals of displayed float values."""
+        return self._decimals
+
+    def fetchMore(self, parent):
+        """Adds the next batch of rows of the group at *parent*."""
+        if not self.canFetchMore(parent):
+            return
+        node = self.nodeFromIndex(parent)
+        self._fetchRows(parent, node, min(self._childCount(node), self._fetchedCount(node) + self._batchSize))
+
+    def fetchTo(self, node):
+        """Fetches the rows of a node and its ancestors, so that views can show it."""
+        path = []
+        while node is not self._root:
+            path.append(node)
+            node = node.parent()
+        for node in reversed(path):
+            group = node.parent()
+            if node.index() >= self._fetchedCount(group):
+                self._fetchRows(self.indexFromNode(group), group, node.index() + 1)
 
     def flags(self, index):
         """
@@ -162,6 +367,13 @@ class ParamModel(QtCore.QAbstractItemModel):
         else:
             return f | QtCore.Qt.ItemIsEditable
 
+    def hasChildren(self, parent=QtCore.QModelIndex()):
+        """Returns whether the group at *parent* has children, including rows that were not fetched yet."""
+        if parent.isValid() and parent.column() != 0:
+            return False
+        node = self.nodeFromIndex(parent)
+        return isinstance(node, ParamGroupNode) and self._childCount(node) > 0
+
     def headerData(self, section, orientation, role=None):
         """
         """
@@ -169,6 +381,36 @@ class ParamModel(QtCore.QAbstractItemModel):
             return ['Name', 'Value'][section]
         return None
 
+    def indexFromNode(self, node, column=0):
+        """Returns the index of a node in the model."""
+        if node is self._root:
+            return QtCore.QModelIndex()
+        return self.createIndex(node.index(), column, node)
+
+    def invalidate(self, node=None, *args):
+        """Clears cached display data.
+
+        Must be called if the tree is changed without using the model.
+
+        Parameters
+        ----------
+        node: ParamNode, ParamGroupNode, or None
+            The node whose data (and the data of its siblings, which may refer
+            to it in expressions) is cleared. None clears all data.
+        """
+        if not isinstance(node, (ParamNode, ParamGroupNode)):  # also called by signals
+            self._cache.clear()
+            self._cacheable.clear()
+            self._cached.clear()
+            self._counts.clear()
+            self._dropValues(list(self._values) + list(self._pending))
+            return
+
+        # the node may have been added or removed
+        self._counts.pop(node, None)
+        self._counts.pop(node.parent(), None)
+        self._invalidateChildren(node.parent())
+
     def index(self, row, column, parent=None, *args, **kwargs):
         """
 
@@ -184,6 +426,56 @@ class ParamModel(QtCore.QAbstractItemModel):
         parent_node = self.nodeFromIndex(parent)
         return self.createIndex(row, column, parent_node.child(row))
 
+    def insertNode(self, node, row=None, parent=QtCore.QModelIndex()):
+        """Inserts a node into the group at *parent* and notifies the views.
+
+        Parameters
+        ----------
+        node: ParamNode or ParamGroupNode
+            The new node, which is removed from its former parent.
+        row: int or None
+            The row of the new node. None appends the node.
+        parent: QModelIndex
+
+        Returns
+        -------
+        ParamNode or ParamGroupNode:
+            The inserted node.
+        """
+        group = self.nodeFromIndex(parent)
+        if not isinstance(group, ParamGroupNode):
+            raise TypeError('nodes can only be inserted into groups')
+        if row is None:
+            row = self._childCount(group)
+        try:
+            group.child(node.name())
+        except ValueError:
+            pass
+        else:
+            raise KeyError(f'A node with name "{node.name()}" already exists!')
+
+        # a move within the model is a removal and an insertion
+        former = node.parent()
+        if former is not None and node.root() is self._root:
+            self.removeNode(node)
+
+        if not self._isVisible(group) or row > self.rowCount(parent):
+            # views learn about the row with fetchMore
+            group.insert_child(row, node)
+            self._addChildCount(group, 1)
+        else:
+            self.beginInsertRows(parent, row, row)
+            group.insert_child(row, node)
+            self._addChildCount(group, 1)
+            self._fetched[group] = self._fetchedCount(group) + 1
+            self.endInsertRows()
+        self.nodeInserted.emit(node)
+        return node
+
+    def isAsyncEvaluation(self):
+        """Returns whether slow values are evaluated in the background, see setAsyncEvaluation."""
+        return self._executor is not None
+
     def isName(self, index):
         return index.column() == 0
 
@@ -206,14 +498,21 @@ class ParamModel(QtCore.QAbstractItemModel):
         return node.is_editable()
 
     def load(self, filename, binary=True):
-        if binary:
-            with open(filename, 'rb') as spc:
-                root = pickle.load(spc)
-                self.setRoot(root)
-        else:
-            with open(filename, 'r') as spj:
-                root = load(spj)
-                self.setRoot(root)
+        """Loads a tree and replaces the tree of the model with ``setRoot``, see also ``loadAsync``.
+
+        ``patch(read_tree(filename))`` keeps the tree of the model and the
+        state of the views instead.
+        """
+        self.setRoot(read_tree(filename, binary))
+
+    def loadAsync(self, filename, binary=True):
+        """Loads a tree in a worker thread and replaces the tree of the model with ``setRoot``.
+
+        ioProgress is emitted while JSON files are read, the total number of
+        nodes is not known in advance. loadFinished is emitted after the tree
+        was replaced, errorMessage if the file cannot be read.
+        """
+        self._submitIO(self._onLoaded, filename, read_tree, filename, binary, self._progressCallback(0))
 
     def nodeFromIndex(self, index):
         """
@@ -229,6 +528,83 @@ class ParamModel(QtCore.QAbstractItemModel):
                 return self.createIndex(parent.index(), 0, parent)
         return QtCore.QModelIndex()
 
+    def patch(self, root):
+        """Changes the tree of the model to match *root*.
+
+        Unlike ``setRoot``, only the changed rows are inserted, removed or
+        updated, so that views keep their expanded groups, selection and
+        scroll position. Trees with different root names replace the tree
+        with ``setRoot``.
+
+        Parameters
+        ----------
+        root: ParamGroupNode
+            The new tree. Nodes that are added to the model are removed from it.
+
+        Returns
+        -------
+        list:
+            The list of applied changes, see ``sparc.core.diff``, or None if
+            the tree was replaced.
+        """
+        if root.name() != self._root.name():
+            self.setRoot(root)
+            return None
+
+        changes = diff(self._root, root)
+        if len(changes) > self.RESET_THRESHOLD:
+            # a single reset is faster than many row signals
+            self.setRoot(root)
+            return None
+        changed = []
+        for change in changes:
+            parent_name, name = AbstractNode.split_name(change.name)
+            group = self._root.child(parent_name) if parent_name else self._root
+            parent = self.indexFromNode(group)
+            if change.kind in (Change.REMOVED, Change.REPLACED):
+                self.removeRows(group.index_of_child(name), 1, parent)
+            if change.kind in (Change.ADDED, Change.REPLACED):
+                self.insertNode(change.value, change.index, parent)
+            elif change.kind == Change.VALUE:
+                apply_change(self._root, change)
+                node = group.child(name)
+                changed.append(node)
+                changed.extend(dependents(node))
+        self._notifyChanged(changed)
+        return changes
+
+    def removeNode(self, node):
+        """Removes a node of the model and notifies the views."""
+        return self.removeRows(node.index(), 1, self.indexFromNode(node.parent()))
+
+    def removeRows(self, row, count, parent=QtCore.QModelIndex()):
+        """Removes *count* rows starting with *row* from the group at *parent*.
+
+        Returns
+        -------
+        bool:
+            Whether the rows were removed.
+        """
+        group = self.nodeFromIndex(parent)
+        if not isinstance(group, ParamGroupNode) or row < 0 or count < 1 or row + count > self._childCount(group):
+            return False
+
+        visible = self.rowCount(parent) if self._isVisible(group) else 0
+        last = min(row + count, visible) - 1
+        if row <= last:
+            self.beginRemoveRows(parent, row, last)
+        # removing from the end keeps the positions of the other children
+        for i in reversed(range(row, row + count)):
+            node = group.child(i)
+            self.nodeAboutToBeRemoved.emit(node)
+            self._forget(node)
+            group.remove_child(i)
+            self._addChildCount(group, -1)
+        if row <= last:
+            self._fetched[group] = self._fetchedCount(group) - (last - row + 1)
+            self.endRemoveRows()
+        return True
+
     def root(self):
         """
         """
@@ -246,19 +622,94 @@ class ParamModel(QtCore.QAbstractItemModel):
         node = self.nodeFromIndex(parent)
         if isinstance(node, ParamNode):
             return 0
-        return node.child_count()
+        # only fetched rows are reported, so that views do not lay out all rows of huge groups
+        return min(self._childCount(node), self._fetchedCount(node))
 
     def save(self, filename, binary=True):
-        if binary:
-            with open(filename, 'wb') as spc:
-                pickle.dump(self.root(), spc)
-        else:
-            with open(filename, 'w') as spj:
-                dump(self.root(), spj, indent=2)
+        """Saves the tree, see also ``saveAsync``."""
+        write_tree(self.root(), filename, binary)
+
+    def saveAsync(self, filename, binary=True):
+        """Saves an immutable snapshot of the tree in a worker thread.
+
+        The tree can be changed while the snapshot is written, the file
+        contains the tree at the time of the call. The values of descriptors
+        are read at the time of the call, too, and saved as plain values.
+        ioProgress is emitted while the nodes are written, saveFinished when
+        the file is complete, errorMessage if it cannot be written.
+        """
+        snapshot = freeze(self._root)
+        total = snapshot.child_count(recursive=True) + 1
+        self.ioProgress.emit(0, total)
+        self._submitIO(self._onSaved, filename, self._writeSnapshot, snapshot, filename, binary,
+                       self._progressCallback(total))
+
+    def setDecimals(self, decimals):
+        """Sets the number of decimals of displayed float values."""
+        self._decimals = decimals
+        self._refreshValues()
+
+    def setAsyncEvaluation(self, enabled, maxWorkers=None):
+        """Enables or disables the evaluation of slow values in a thread pool.
+
+        Expressions and descriptor getters may call slow code. In asynchronous
+        mode their values are evaluated in worker threads, the cells show
+        ``PLACEHOLDER`` until the value is available, and dataChanged is
+        emitted when it arrives. Concurrent requests of a node are evaluated
+        once. The values of descriptors are kept until the node is changed
+        with the model or ``invalidate`` is called.
+
+        The tree is read by the worker threads, so it must not be changed
+        by other threads without a lock, see ``ThreadSafeTree``.
+
+        Parameters
+        ----------
+        enabled: bool
+        maxWorkers: int or None
+            The number of worker threads, see ``ThreadPoolExecutor``.
+        """
+        if self._executor is not None:
+            self.cancelEvaluation()
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        self._dropValues(list(self._values) + list(self._pending))
+        if enabled:
+            self._executor = ThreadPoolExecutor(maxWorkers, thread_name_prefix='ParamModel')
+        self._refreshValues()
+
+    def setBatchSize(self, size):
+        """Sets the number of rows that are added to a group by fetchMore.
+
+        The first batch of a group is available without calling fetchMore.
+        Groups that were already reported keep their rows, the new size
+        applies to the next fetchMore.
+        """
+        if size < 1:
+            raise ValueError('the batch size must be positive')
+        self._batchSize = size
 
     def setExpressionContext(self, context):
-        self._context = context
-        # TODO: init re-evaluation of expression nodes
+        """Sets the context of expression variables and updates the dependent expressions.
+
+        The context is copied, so a dict that was changed in place can be set
+        again. Variables are compared by value, values that cannot be compared,
+        e.g. arrays, count as changed. Values that are changed in place, e.g.
+        lists, must be replaced by a copy to be detected.
+        """
+        old = self._context
+        changed = []
+        for name in set(old) | set(context):
+            if name not in old or name not in context:
+                changed.append(name)
+                continue
+            try:
+                if not bool(old[name] != context[name]):
+                    continue
+            except Exception:
+                pass
+            changed.append(name)
+        self._context = dict(context)
+        self._notifyChanged(context_dependents(self._root, changed))
 
     def setData(self, index, value, role=None):
         """
@@ -276,13 +727,271 @@ class ParamModel(QtCore.QAbstractItemModel):
             success = False
 
         if role in (QtCore.Qt.EditRole, QtCore.Qt.CheckStateRole) and success:
+            self._notifyChanged([node] + dependents(node))
             self.valueChanged.emit(node.absolute_name())
 
         return success
 
     def setRoot(self, root):
-        """
+        """Replaces the tree of the model and resets the views, see also ``patch``.
         """
         self.beginResetModel()
         self._root = root
+        self._fetched.clear()
+        self._counts.clear()
         self.endResetModel()
+
+    def watchView(self, view):
+        """Cancels the pending evaluations of cells that *view* scrolls out of sight or collapses."""
+        def cancel(*args):
+            self.cancelHidden(view)
+
+        view.verticalScrollBar().valueChanged.connect(cancel)
+        if hasattr(view, 'collapsed'):  # QTreeView
+            view.collapsed.connect(cancel)
+
+    def _onIODone(self, handler, future):
+        done, filename = handler
+        try:
+            result = future.result()
+        except Exception as e:
+            self.errorMessage.emit(f'{filename}: {e}')
+            return
+        done(filename, result)
+
+    def _onLoaded(self, filename, root):
+        self.setRoot(root)
+        count = self._root.child_count(recursive=True) + 1
+        self.ioProgress.emit(count, count)
+        self.loadFinished.emit(filename)
+
+    def _onSaved(self, filename, total):
+        self.ioProgress.emit(total, total)
+        self.saveFinished.emit(filename)
+
+    def _progressCallback(self, total):
+        """Returns a callback that emits ioProgress from the IO thread for every percent or 1000 nodes."""
+        step = max(1, total // 100) if total else 1000
+
+        def callback(count):
+            if count % step == 0:
+                self.ioProgress.emit(count, total)
+        return callback
+
+    def _submitIO(self, done, filename, func, *args):
+        if self._ioExecutor is None:
+            self._ioExecutor = ThreadPoolExecutor(1, thread_name_prefix='ParamModelIO')
+        future = self._ioExecutor.submit(func, *args)
+        future.add_done_callback(lambda f: self._ioDone.emit((done, filename), f))
+
+    @staticmethod
+    def _writeSnapshot(snapshot, filename, binary, callback):
+        # thawed nodes keep the flags that frozen nodes do not report, e.g. editable
+        root = thaw(snapshot)
+        write_tree(root, filename, binary, callback)
+        return root.child_count(recursive=True) + 1
+
+    def _forget(self, node):
+        """Drops the cached data and fetched counts of a removed subtree."""
+        self._cached.get(node.parent(), set()).discard(node)
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            self._cache.pop(node, None)
+            self._cacheable.pop(node, None)
+            self._fetched.pop(node, None)
+            self._counts.pop(node, None)
+            self._dropValues([node])
+            stack.extend(self._cached.pop(node, ()))
+
+    def _fetchRows(self, parent, node, count):
+        """Makes the first *count* rows of the group at *parent* visible."""
+        if self._fetching:
+            return  # called by a slot of rowsAboutToBeInserted, the rows are not inserted yet
+        fetched = self._fetchedCount(node)
+        if count <= fetched:
+            return
+        self._fetching = True
+        try:
+            self.beginInsertRows(parent, fetched, count - 1)
+            self._fetched[node] = count
+            self.endInsertRows()
+        finally:
+            self._fetching = False
+
+    def _addChildCount(self, group, delta):
+        if group in self._counts:
+            self._counts[group] += delta
+
+    def _childCount(self, node):
+        """Returns the cached child count of a group."""
+        try:
+            return self._counts[node]
+        except KeyError:
+            count = self._counts[node] = node.child_count()
+            return count
+
+    def _fetchedCount(self, node):
+        """Returns the number of fetched rows of a group, the first batch is recorded when it is reported."""
+        try:
+            return self._fetched[node]
+        except KeyError:
+            count = self._fetched[node] = self._batchSize
+            return count
+
+    def _invalidateChildren(self, group):
+        """Clears the cached data and the evaluated values of the children of a group."""
+        for child in self._cached.pop(group, ()):
+            self._cache.pop(child, None)
+            self._cacheable.pop(child, None)
+        self._dropValues([node for node in list(self._values) + list(self._pending) if node.parent() is group])
+
+    def _isSlow(self, node):
+        """Returns whether the value of a node may call arbitrary code."""
+        return isinstance(node, ParamNode) and (node.is_descriptor() or node.is_expression())
+
+    def _isVisible(self, node):
+        """Returns whether a node and all its ancestors are in fetched rows."""
+        while node is not self._root:
+            parent = node.parent()
+            if parent is None or node.index() >= self._fetchedCount(parent):
+                return False
+            node = parent
+        return True
+
+    def _isCacheable(self, node):
+        """Returns whether the data of a node only changes with events of the model.
+
+        Descriptor values can change at any time, and so can expressions
+        that refer to descriptors.
+        """
+        try:
+            return self._cacheable[node]
+        except KeyError:
+            pass
+
+        cacheable = True
+        visited = set()
+        stack = [node]
+        while stack and cacheable:
+            current = stack.pop()
+            if id(current) in visited or not isinstance(current, ParamNode):
+                continue
+            visited.add(id(current))
+            if current.is_descriptor():
+                cacheable = False
+            elif current.is_expression():
+                stack.extend(referenced_siblings(current, ParamNode.expression_vars(current.raw_value())))
+
+        self._cacheable[node] = cacheable
+        self._cached.setdefault(node.parent(), set()).add(node)
+        if cacheable:
+            self._cache[node] = {}
+        return cacheable
+
+    def _dropValues(self, nodes):
+        """Drops evaluated values and cancels pending evaluations."""
+        for node in nodes:
+            self._values.pop(node, None)
+            future = self._pending.pop(node, None)
+            if future is not None:
+                future.cancel()  # the results of running evaluations are ignored
+
+    def _emitChanged(self):
+        """Emits dataChanged for the changed nodes, with one signal per range of adjacent rows."""
+        changed = self._changed
+        self._changed = {}
+
+        rows = {}  # parent -> rows
+        for node in changed.values():
+            parent = node.parent()
+            if parent is None or node.root() is not self._root:
+                continue  # removed in the meantime
+            if not self._isVisible(node):
+                continue  # not fetched yet
+            rows.setdefault(parent, []).append(node.index())
+
+        for parent, parent_rows in rows.items():
+            parent_index = self.indexFromNode(parent)
+            parent_rows.sort()
+            first = last = parent_rows[0]
+            for row in parent_rows[1:] + [None]:
+                if row is not None and row == last + 1:
+                    last = row
+                    continue
+                self.dataChanged.emit(self.index(first, 0, parent_index), self.index(last, 1, parent_index))
+                if row is not None:
+                    first = last = row
+
+    def _notifyChanged(self, nodes, evaluated=False):
+        """Clears the cached data of changed nodes and schedules their dataChanged signals.
+
+        Signals are coalesced, i.e. all changes of an event loop iteration are
+        emitted together. Values that were evaluated in the background are
+        dropped unless *evaluated* is True.
+        """
+        if not nodes:
+            return
+        schedule = not self._changed
+        for node in nodes:
+            self._cache.pop(node, None)
+            self._cacheable.pop(node, None)
+            if not evaluated:
+                self._dropValues([node])
+            self._changed[id(node)] = node
+        if schedule:
+            QtCore.QTimer.singleShot(0, self._emitChanged)
+
+    def _onEvaluated(self, node, future):
+        if self._pending.get(node) is not future:
+            return  # cancelled or changed in the meantime
+        del self._pending[node]
+        self._values[node] = future.result()
+        self._notifyChanged([node], evaluated=True)
+
+    def _refreshValues(self):
+        """Clears the cached data and emits dataChanged for the values of all fetched rows.
+
+        The layout does not change, so views and proxies keep their indexes.
+        """
+        self._cache.clear()
+        self._cacheable.clear()
+        self._cached.clear()
+        stack = [self._root]
+        while stack:
+            group = stack.pop()
+            count = min(self._childCount(group), self._fetchedCount(group))
+            if not count:
+                continue
+            parent = self.indexFromNode(group)
+            self.dataChanged.emit(self.index(0, 1, parent), self.index(count - 1, 1, parent))
+            children = (group.child(row) for row in range(count))
+            stack.extend(child for child in children if not isinstance(child, ParamNode))
+
+    def _requestValue(self, node):
+        """Submits the evaluation of a node to the thread pool unless it is pending."""
+        if node in self._pending:
+            return
+        future = self._executor.submit(evaluate, node, self._context)
+        self._pending[node] = future
+        future.add_done_callback(lambda f: self._evaluated.emit(node, f))
+
+    def _onRowsInserted(self, parent, first, last):
+        # fetched rows are not new to the tree
+        if self._fetching:
+            return
+        # sibling expressions may refer to the new nodes
+        self._invalidateChildren(self.nodeFromIndex(parent))
+
+    def _onRowsRemoved(self, parent, first, last):
+        # sibling expressions may have referred to the removed nodes
+        self._invalidateChildren(self.nodeFromIndex(parent))
+
+    def _onDataChanged(self, topLeft, bottomRight, roles=()):
+        # only the changed rows, the dependent expressions are notified separately by
+        # _notifyChanged, and evaluated values are kept, dataChanged is also emitted when they arrive
+        group = self.nodeFromIndex(topLeft.parent())
+        for row in range(topLeft.row(), bottomRight.row() + 1):
+            node = group.child(row)
+            self._cache.pop(node, None)
+            self._cacheable.pop(node, None)
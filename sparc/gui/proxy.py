@@ -0,0 +1,177 @@
+# proxy.py
+
+# Qt modules
+from PyQt5 import QtCore
+
+# sparc modules
+from sparc.core import *
+from .model import ParamModel
+
+__all__ = ['ParamFilterProxyModel']
+
+
+class ParamFilterProxyModel(QtCore.QSortFilterProxyModel):
+    """A filter proxy of a ParamModel that finds the matching nodes in a SearchIndex.
+
+    ``QSortFilterProxyModel`` calls ``data`` for every row whenever the filter
+    changes. This proxy searches a prebuilt ``SearchIndex`` instead and
+    accepts the rows of the matching nodes and their ancestors. The index is
+    updated incrementally with the nodeInserted, nodeAboutToBeRemoved and
+    dataChanged signals of the model.
+
+    Rows of matching nodes that were not fetched yet are fetched lazily,
+    ``FETCH_MATCHES`` matches at a time, when a view calls ``fetchMore``, i.e.
+    when it scrolls to its end. Otherwise every keystroke would fetch all rows
+    up to the last match, and the proxy calls ``filterAcceptsRow`` for every
+    fetched row. At most ``MAX_MATCHES`` matches are shown.
+    """
+
+    # the maximum number of matches that are shown
+    MAX_MATCHES = 10000
+
+    # the number of matches whose rows are fetched at once
+    FETCH_MATCHES = 100
+
+    def __init__(self, parent=None):
+        QtCore.QSortFilterProxyModel.__init__(self, parent)
+        self._index = None
+        self._indexValues = False
+        self._pattern = ''
+        self._mode = 'substring'
+        self._fields = ('name',)
+        self._caseSensitive = False
+        self._matches = []
+        self._accepted = None  # the nodes of accepted rows, None accepts all rows
+        self._next = 0  # the number of matches whose rows were fetched
+        self._scheduled = False
+
+    def canFetchMore(self, parent):
+        if self._accepted is None:
+            return QtCore.QSortFilterProxyModel.canFetchMore(self, parent)
+        # all other rows of the source model are filtered out
+        return self._next < len(self._matches)
+
+    def fetchMore(self, parent):
+        if self._accepted is None:
+            QtCore.QSortFilterProxyModel.fetchMore(self, parent)
+        else:
+            self._fetchMatches()
+
+    def filterAcceptsRow(self, sourceRow, sourceParent):
+        if self._accepted is None:
+            return True
+        return self.sourceModel().nodeFromIndex(sourceParent).child(sourceRow) in self._accepted
+
+    def filterPattern(self):
+        return self._pattern
+
+    def matches(self):
+        """Returns the matching nodes."""
+        return list(self._matches)
+
+    def searchIndex(self):
+        return self._index
+
+    def setFilterPattern(self, pattern, mode=None, fields=None, caseSensitive=None):
+        """Filters the rows of the nodes that match a pattern.
+
+        Parameters
+        ----------
+        pattern: str
+            An empty pattern accepts all rows.
+        mode: str or None
+            'prefix', 'substring' or 'glob', see ``SearchIndex.find``. None keeps the mode.
+        fields: Iterable or None
+            Some of 'name', 'path', 'type' and 'value'. None keeps the fields.
+        caseSensitive: bool or None
+            None keeps the case sensitivity.
+        """
+        self._pattern = pattern
+        if mode is not None:
+            self._mode = mode
+        if fields is not None:
+            fields = tuple(fields)
+            if 'value' in fields and not self._indexValues:
+                self.setIndexValues(True)
+            self._fields = fields
+        if caseSensitive is not None:
+            self._caseSensitive = caseSensitive
+        self._refilter()
+
+    def setIndexValues(self, enabled):
+        """Sets whether raw values are indexed, which is required to filter by value."""
+        self._indexValues = enabled
+        self._rebuild()
+
+    def setSourceModel(self, model):
+        assert isinstance(model, ParamModel), 'ParamFilterProxyModel can only be used with ParamModel!'
+        old = self.sourceModel()
+        if old is not None:
+            old.modelReset.disconnect(self._rebuild)
+            old.nodeInserted.disconnect(self._onNodeInserted)
+            old.nodeAboutToBeRemoved.disconnect(self._onNodeAboutToBeRemoved)
+            old.dataChanged.disconnect(self._onDataChanged)
+
+        QtCore.QSortFilterProxyModel.setSourceModel(self, model)
+        model.modelReset.connect(self._rebuild)
+        model.nodeInserted.connect(self._onNodeInserted)
+        model.nodeAboutToBeRemoved.connect(self._onNodeAboutToBeRemoved)
+        model.dataChanged.connect(self._onDataChanged)
+        self._rebuild()
+
+    def _onDataChanged(self, topLeft, bottomRight, roles=()):
+        if not self._indexValues:
+            return
+        parent = self.sourceModel().nodeFromIndex(topLeft.parent())
+        for row in range(topLeft.row(), bottomRight.row() + 1):
+            node = parent.child(row)
+            if node in self._index:
+                self._index.update(node)
+        if 'value' in self._fields:
+            self._scheduleRefilter()
+
+    def _onNodeAboutToBeRemoved(self, node):
+        self._index.remove(node)
+        self._scheduleRefilter()
+
+    def _onNodeInserted(self, node):
+        self._index.add(node)
+        self._scheduleRefilter()
+
+    def _rebuild(self):
+        model = self.sourceModel()
+        if model is None:
+            return
+        self._index = SearchIndex(model.root(), values=self._indexValues)
+        self._refilter()
+
+    def _refilter(self):
+        self._scheduled = False
+        if self._index is None:
+            return
+        if not self._pattern:
+            self._matches = []
+            self._accepted = None
+        else:
+            self._matches = self._index.find(self._pattern, self._mode, self._fields, self._caseSensitive,
+                                             limit=self.MAX_MATCHES)
+            self._accepted = with_ancestors(self._matches, self.sourceModel().root())
+        self._next = 0
+        self.invalidateFilter()
+        if self._accepted is not None:
+            self._fetchMatches()
+
+    def _fetchMatches(self):
+        """Fetches the source rows of the next ``FETCH_MATCHES`` matches."""
+        model = self.sourceModel()
+        end = min(self._next + self.FETCH_MATCHES, len(self._matches))
+        for node in self._matches[self._next:end]:
+            if node in self._index:  # not removed in the meantime
+                model.fetchTo(node)
+        self._next = end
+
+    def _scheduleRefilter(self):
+        """Refilters once in the next event loop iteration, e.g. after a patch of many nodes."""
+        if not self._scheduled:
+            self._scheduled = True
+            QtCore.QTimer.singleShot(0, self._refilter)
@@ -1,20 +1,46 @@
 # settings.py
 
-# Qt modules
-from PyQt5 import QtCore
-from PyQt5 import QtGui
-
 # sparc modules
 from sparc import __version__
 
-__all__ = ['DEFAULT_SETTINGS', 'print_Qt_config']
+__all__ = ['DEFAULT_SETTINGS', 'print_Qt_config', 'setting']
+
+
+# the values of settings that were not stored yet
+DEFAULTS = {
+    'decimals': 5,
+}
+
+_settings = None
+
+
+def default_settings():
+    """Returns the QSettings of sparc, which are created on first use."""
+    global _settings
+    if _settings is None:
+        from PyQt5 import QtCore
+        _settings = QtCore.QSettings('Nutshell', 'sparc')
+    return _settings
+
+
+def setting(key):
+    """Returns the value of a setting or its default value, see ``DEFAULTS``."""
+    if key not in DEFAULTS:
+        return default_settings().value(key)
+    default = DEFAULTS[key]
+    return default_settings().value(key, default, type=type(default))
+
 
-DEFAULT_SETTINGS = QtCore.QSettings('Nutshell', 'sparc')
-DEFAULT_SETTINGS.setValue('decimals', 5)
+def __getattr__(name):
+    if name == 'DEFAULT_SETTINGS':
+        return default_settings()
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
 
 
 def print_Qt_config():
     import sys
+    from PyQt5 import QtCore
+    from PyQt5 import QtGui
 
     print("Python sys.executable:\n\t%s" % sys.executable)
     print("Python sys.path:\n\t%s" % "\n\t".join(sys.path))
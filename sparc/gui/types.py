@@ -2,6 +2,8 @@ from PyQt5.QtGui import QColor
 
 from sparc.core import Types
 
+__all__ = ['ColorSerializer']
+
 
 class ColorSerializer(object):
     """Serialize QColor instances as hex strings."""
@@ -0,0 +1,6 @@
+from fractions import Fraction
+
+from sparc.core import Types
+
+
+Types.register_type('Fraction', Fraction)
@@ -0,0 +1,95 @@
+from unittest import TestCase
+import threading
+import time
+
+from sparc.core import ParamNode, ParamGroupNode, Interval, evaluate_batch
+
+
+class Motor(object):
+
+    def __init__(self, current, voltage=24.0):
+        self.current = current
+        self.voltage = voltage
+        self.threads = set()
+
+    def get_current(self):
+        return self.current
+
+    def get_voltage(self):
+        return self.voltage
+
+    def slow_current(self):
+        self.threads.add(threading.get_ident())
+        time.sleep(0.01)
+        return self.current
+
+
+class Settings(object):
+
+    def __init__(self):
+        self.calls = 0
+
+    def efficiency(self):
+        self.calls += 1
+        return 0.5
+
+
+def schema(settings=None):
+    p = ParamGroupNode('motor')
+    p.add_child(ParamNode('current', type=float, validator=Interval(0, 10), fget=Motor.get_current))
+    p.add_child(ParamNode('voltage', fget=Motor.get_voltage))
+    p.add_child('power', '=current*voltage')
+    p.add_child('count', 2, int)
+    settings = settings or Settings()
+    limits = p.add_child('limits')
+    limits.add_child(ParamNode('efficiency', fget=settings.efficiency))
+    limits.add_child('max', 100.0, float)
+    limits.add_child('loss', '=max*(1-efficiency)')
+    return p
+
+
+class TestBatch(TestCase):
+
+    def test_evaluate(self):
+        motors = [Motor(float(i)) for i in range(10)]
+        p = schema()
+        columns = evaluate_batch(p, motors, recursive=True)
+        self.assertEqual(list(columns), p.child_names(recursive=True)[:4] + ['limits.efficiency', 'limits.max',
+                                                                             'limits.loss'])
+        for name, values in columns.items():
+            self.assertEqual(values, [p[name].value(obj=motor) for motor in motors])
+        self.assertEqual(columns['power'][3], 72.0)
+        self.assertEqual(columns['limits.loss'], [50.0] * 10)
+
+        self.assertEqual(evaluate_batch(p, motors[:2]), {'current': [0.0, 1.0], 'voltage': [24.0, 24.0],
+                                                          'power': [0.0, 24.0], 'count': [2, 2]})
+        self.assertEqual(evaluate_batch(p, []), {'current': [], 'voltage': [], 'power': [], 'count': []})
+
+    def test_resolved_once(self):
+        settings = Settings()
+        evaluate_batch(schema(settings)['limits'], [Motor(1.0)] * 100)
+        self.assertEqual(settings.calls, 1)
+
+    def test_context(self):
+        p = schema()
+        columns = evaluate_batch(p, [Motor(1.0), Motor(2.0)], context={'voltage': 12.0})
+        self.assertEqual(columns['power'], [12.0, 24.0])
+
+    def test_validation(self):
+        with self.assertRaises(ValueError):
+            evaluate_batch(schema(), [Motor(1.0), Motor(20.0)])
+
+        p = ParamGroupNode('group')
+        p.add_child('a', '=b')
+        p.add_child('b', '=a')
+        with self.assertRaises(RecursionError):
+            evaluate_batch(p, [None])
+
+    def test_thread_pool(self):
+        p = ParamGroupNode('motor')
+        p.add_child(ParamNode('current', fget=Motor.slow_current))
+        motors = [Motor(float(i)) for i in range(20)]
+        columns = evaluate_batch(p, motors, max_workers=4)
+        self.assertEqual(columns['current'], [float(i) for i in range(20)])
+        threads = set().union(*[motor.threads for motor in motors])
+        self.assertNotIn(threading.get_ident(), threads)
@@ -0,0 +1,88 @@
+from unittest import TestCase, skipUnless
+import os
+
+from sparc.core import ParamGroupNode
+from sparc.gui import HAVE_QT
+
+if HAVE_QT:
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PyQt5 import QtCore, QtGui, QtWidgets
+    from sparc.gui import ParamModel, ParamDelegate
+    from sparc.gui.delegate import ValidatorListModel
+
+
+def node():
+    p = ParamGroupNode('root')
+    p.add_child('mode', 'low', str, validator=['low', 'medium', 'high'])
+    p.add_child('level', 2, int, validator=[1, 2, 3])
+    p.add_child('other', 'low', str, validator=p['mode'].validator())
+    return p
+
+
+@skipUnless(HAVE_QT, 'requires PyQt5')
+class TestParamDelegate(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+    def setUp(self):
+        self.root = node()
+        self.model = ParamModel(self.root)
+        self.delegate = ParamDelegate()
+        self.parent = QtWidgets.QWidget()
+        self.addCleanup(self.parent.deleteLater)
+
+    def editor(self, name):
+        index = self.model.indexFromNode(self.root[name], 1)
+        return self.delegate.createEditor(self.parent, QtWidgets.QStyleOptionViewItem(), index), index
+
+    def test_validator_model(self):
+        validator = self.root['mode'].validator()
+        choices = self.delegate.validatorModel(validator)
+        self.assertIs(self.delegate.validatorModel(validator), choices)
+        self.assertIsNot(self.delegate.validatorModel(self.root['level'].validator()), choices)
+
+        # the editors of all nodes with the validator share the model
+        mode, _ = self.editor('mode')
+        other, _ = self.editor('other')
+        self.assertIs(mode.model(), choices)
+        self.assertIs(other.model(), choices)
+        self.assertIs(mode.completer().model(), choices)
+
+        validator.append('maximum')
+        updated = self.delegate.validatorModel(validator)
+        self.assertIsNot(updated, choices)
+        self.assertEqual(updated.rowCount(), 4)
+
+    def test_row(self):
+        choices = ValidatorListModel(['a', 'b', 1, 'a'])
+        self.assertEqual(choices.row('a'), 0)
+        self.assertEqual(choices.row(1), 2)
+        self.assertEqual(choices.row('1'), 2)
+        self.assertEqual(choices.row('c'), -1)
+        self.assertEqual(choices.data(choices.index(2), QtCore.Qt.DisplayRole), '1')
+        self.assertEqual(choices.data(choices.index(2), QtCore.Qt.UserRole), 1)
+
+        colors = ValidatorListModel([QtGui.QColor('red'), QtGui.QColor('blue')], colors=True)
+        self.assertEqual(colors.row(QtGui.QColor(0, 0, 255)), 1)
+        self.assertEqual(colors.data(colors.index(1), QtCore.Qt.DisplayRole), '')
+        self.assertEqual(colors.data(colors.index(1), QtCore.Qt.BackgroundColorRole), QtGui.QColor('blue'))
+
+    def test_set_model_data(self):
+        editor, index = self.editor('mode')
+        self.assertEqual(editor.currentText(), 'low')
+        editor.setEditText('medium')
+        self.delegate.setModelData(editor, self.model, index)
+        self.assertEqual(self.root['mode'].value(), 'medium')
+
+        # typed text that matches no entry leaves the value unchanged
+        editor.setEditText('med')
+        self.delegate.setModelData(editor, self.model, index)
+        self.assertEqual(self.root['mode'].value(), 'medium')
+
+        editor, index = self.editor('level')
+        editor.setEditText('3')
+        self.delegate.setModelData(editor, self.model, index)
+        self.assertEqual(self.root['level'].value(), 3)
+        self.assertIs(type(self.root['level'].value()), int)
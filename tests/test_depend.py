@@ -0,0 +1,42 @@
+from unittest import TestCase
+
+from sparc.core import ParamGroupNode, dependents, context_dependents
+
+
+def node():
+    p = ParamGroupNode('set')
+    p.add_child('m', 5.0, float)
+    p.add_child('a', 2.0, float)
+    p.add_child('A', 4.0, float)
+    p.add_child('F', '=m*a')
+    p.add_child('Sigma', '=F/A')
+    p.add_child('l', '=A**0.5')
+    p.add_child('extern', '=l*x')
+    group = p.add_child('group')
+    group.add_child('m', 1.0, float)
+    group.add_child('y', '=m*x')
+    group.add_child('z', '=y+1')
+    return p
+
+
+class TestDepend(TestCase):
+
+    def names(self, nodes):
+        return sorted(node.absolute_name() for node in nodes)
+
+    def test_dependents(self):
+        p = node()
+        self.assertEqual(self.names(dependents(p['m'])), ['set.F', 'set.Sigma'])
+        self.assertEqual(self.names(dependents(p['A'])), ['set.Sigma', 'set.extern', 'set.l'])
+        self.assertEqual(dependents(p['Sigma']), [])
+        self.assertEqual(self.names(dependents(p['group.m'])), ['set.group.y', 'set.group.z'])
+        self.assertEqual(dependents(p), [])
+
+    def test_context_dependents(self):
+        p = node()
+        self.assertEqual(self.names(context_dependents(p, ['x'])),
+                         ['set.extern', 'set.group.y', 'set.group.z'])
+        self.assertEqual(self.names(context_dependents(p, ['m'])), ['set.F', 'set.Sigma', 'set.group.y',
+                                                                      'set.group.z'])
+        self.assertEqual(context_dependents(p, []), [])
+        self.assertEqual(context_dependents(p, ['unknown']), [])
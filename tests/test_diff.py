@@ -0,0 +1,229 @@
+from unittest import TestCase, skipUnless
+import os
+import queue
+import tempfile
+
+from sparc.core import ParamNode, ParamGroupNode, Interval, Change, diff, patch, dump, FileWatcher, RWLock
+from sparc.core.table import HAVE_NUMPY
+
+
+class Box(object):
+
+    def __init__(self, value):
+        self.value = value
+
+
+def node():
+    p = ParamGroupNode('set')
+    p.add_child('m', 5.0, float)
+    p.add_child('a', 2.0, float, validator=Interval(0, 10))
+    p.add_child('F', '=m*a')
+    group = p.add_child('group')
+    group.add_child('x', value=1, type=int, editable=False)
+    group.add_child('y', value=2, type=int)
+    return p
+
+
+class TestDiff(TestCase):
+
+    def test_equal(self):
+        self.assertEqual(diff(node(), node()), [])
+
+    def test_values(self):
+        live = node()
+        m = live['m']
+        new = node()
+        new['m'].set_value(6.0)
+        new['group.x'].set_editable(True)
+        new['group.x'].set_value(3)
+        new['group.x'].set_editable(False)
+
+        changes = patch(live, new)
+        self.assertEqual(changes, [Change(Change.VALUE, 'm', None, 6.0), Change(Change.VALUE, 'group.x', None, 3)])
+        self.assertIs(live['m'], m)
+        self.assertEqual(live['F'].value(), 12.0)
+        self.assertFalse(live['group.x'].is_editable())
+
+    def test_structure(self):
+        live = node()
+        group = live['group']
+        y = live['group.y']
+
+        new = node()
+        new.remove_child('F')
+        new['group'].remove_child('x')
+        new['group'].insert_child(0, ParamNode('z', 0.5, float))
+        new.remove_child('m')
+        new.add_child('m', 5, int)
+        new.insert_child(0, ParamGroupNode('empty'))
+
+        received = []
+        patch(live, new, callback=received.append)
+
+        self.assertEqual(live.child_names(recursive=True), new_tree().child_names(recursive=True))
+        self.assertIs(live['group'], group)
+        self.assertIs(live['group.y'], y)
+        self.assertEqual(live['m'].type(), int)
+        self.assertIn(Change(Change.REMOVED, 'group.x', 0, None), received)
+        self.assertEqual(diff(live, new_tree()), [])
+
+    def test_moved(self):
+        live = node()
+        new = node()
+        new.insert_child(0, new.pop_child('group'))
+        patch(live, new)
+        self.assertEqual(live.child_names(), ['group', 'm', 'a', 'F'])
+        self.assertEqual(live['group.y'].value(), 2)
+
+
+def new_tree():
+    p = ParamGroupNode('set')
+    p.add_child(ParamGroupNode('empty'))
+    p.add_child('a', 2.0, float, validator=Interval(0, 10))
+    group = p.add_child('group')
+    group.add_child('z', value=0.5, type=float)
+    group.add_child('y', value=2, type=int)
+    p.add_child('m', 5, int)
+    return p
+
+
+class TestFileWatcher(TestCase):
+
+    def test_poll(self):
+        filename = os.path.join(tempfile.mkdtemp(), 'params.json')
+        with open(filename, 'w') as fp:
+            dump(node(), fp)
+
+        live = node()
+        received = []
+        watcher = FileWatcher(filename, live, callback=received.append)
+        self.assertEqual(watcher.poll(), [])
+
+        new = node()
+        new['a'].set_value(4.0)
+        with open(filename, 'w') as fp:
+            dump(new, fp)
+        os.utime(filename, ns=(0, 0))
+
+        self.assertEqual(watcher.poll(), [Change(Change.VALUE, 'a', None, 4.0)])
+        self.assertEqual(received, [Change(Change.VALUE, 'a', None, 4.0)])
+        self.assertEqual(live['F'].value(), 20.0)
+        self.assertEqual(watcher.poll(), [])
+
+    def test_dispatch(self):
+        filename = os.path.join(tempfile.mkdtemp(), 'params.json')
+        with open(filename, 'w') as fp:
+            dump(node(), fp)
+
+        live = node()
+        lock = RWLock()
+        pending = queue.Queue()
+        watcher = FileWatcher(filename, live, interval=0.01, lock=lock, dispatch=pending.put)
+        watcher.start()
+        try:
+            new = node()
+            new['a'].set_value(4.0)
+            with open(filename, 'w') as fp:
+                dump(new, fp)
+            os.utime(filename, ns=(0, 0))
+            apply = pending.get(timeout=5)
+        finally:
+            watcher.stop()
+
+        # the polling thread does not change the tree
+        self.assertEqual(live['a'].value(), 2.0)
+        self.assertEqual(apply(), [Change(Change.VALUE, 'a', None, 4.0)])
+        self.assertEqual(live['a'].value(), 4.0)
+        with lock.write():  # released
+            pass
+
+
+class TestContentHash(TestCase):
+
+    def test_hash(self):
+        p = node()
+        q = node()
+        self.assertEqual(p.content_hash(), q.content_hash())
+        self.assertEqual(len(p.content_hash()), 16)
+
+        group_hash = p['group'].content_hash()
+        m_hash = p['m'].content_hash()
+
+        p['group.y'].set_value(3)
+        self.assertNotEqual(p.content_hash(), q.content_hash())
+        self.assertNotEqual(p['group'].content_hash(), group_hash)
+        self.assertEqual(p['m'].content_hash(), m_hash)
+
+        p['group.y'].set_value(2)
+        self.assertEqual(p.content_hash(), q.content_hash())
+
+        p['a'].set_validator(Interval(0, 20))
+        self.assertNotEqual(p.content_hash(), q.content_hash())
+        p['a'].set_validator(Interval(0, 10))
+
+        p['group'].add_child('z', 1.0, float)
+        self.assertNotEqual(p.content_hash(), q.content_hash())
+        p['group'].remove_child('z')
+        self.assertEqual(p.content_hash(), q.content_hash())
+
+        p['m'].set_value(5)
+        self.assertEqual(p['m'].value(), 5.0)
+        self.assertEqual(p.content_hash(), q.content_hash())
+
+    def test_values(self):
+        p = ParamNode('x', 1)
+        q = ParamNode('x', 1.0)
+        self.assertNotEqual(p.content_hash(), q.content_hash())
+        self.assertNotEqual(ParamNode('x', b'\0\0').content_hash(), ParamNode('x', b'\0').content_hash())
+
+    def test_incomplete_repr(self):
+        # the default repr contains the address, the pickle the content
+        self.assertEqual(ParamNode('x', Box(1)).content_hash(), ParamNode('x', Box(1)).content_hash())
+        self.assertNotEqual(ParamNode('x', Box(1)).content_hash(), ParamNode('x', Box(2)).content_hash())
+        self.assertEqual(ParamNode('x', 1, validator=Interval(0, 10)).content_hash(),
+                         ParamNode('x', 1, validator=Interval(0, 10)).content_hash())
+
+        # values that cannot be pickled are compared by diff
+        func = lambda: None  # noqa: E731
+        p = ParamGroupNode('p')
+        p.add_child('f', func)
+        q = ParamGroupNode('q')
+        q.add_child('f', func)
+        self.assertNotEqual(p.content_hash(), q.content_hash())
+        self.assertEqual(diff(p, q), [])
+
+    @skipUnless(HAVE_NUMPY, 'requires NumPy')
+    def test_arrays(self):
+        import numpy as np
+        a = np.arange(20000.0)
+        b = a.copy()
+        b[10000] = -1.0  # hidden by the abbreviated repr
+        self.assertNotEqual(ParamNode('x', a).content_hash(), ParamNode('x', b).content_hash())
+
+        fortran = np.asfortranarray(np.arange(6).reshape(2, 3))
+        self.assertEqual(ParamNode('x', fortran).content_hash(), ParamNode('x', fortran.copy(order='C')).content_hash())
+        strided = np.arange(10)[::2]
+        self.assertNotEqual(ParamNode('x', strided).content_hash(), ParamNode('x', np.arange(10)[1::2]).content_hash())
+
+    def test_skip(self):
+        p = node()
+        q = node()
+        p.content_hash()
+        q.content_hash()
+        q['m'].set_value(6.0)
+
+        visited = []
+        iter_children = ParamGroupNode.iter_children
+
+        def spy(self, recursive=False):
+            visited.append(self.name())
+            return iter_children(self, recursive)
+
+        ParamGroupNode.iter_children = spy
+        try:
+            changes = diff(p, q)
+        finally:
+            ParamGroupNode.iter_children = iter_children
+
+        self.assertEqual(changes, [Change(Change.VALUE, 'm', None, 6.0)])
+        self.assertNotIn('group', visited)
@@ -0,0 +1,109 @@
+from unittest import TestCase
+import pickle
+import threading
+
+from sparc.core import ParamNode, ParamGroupNode, Interval, freeze, thaw, SnapshotPublisher
+
+
+def node():
+    p = ParamGroupNode('set')
+    p.add_child('m', 5.0, float)
+    p.add_child('a', 2.0, float, validator=Interval(0, 10))
+    p.add_child('F', '=m*a')
+    group = p.add_child('group')
+    group.add_child('x', value=1, type=int)
+    other = p.add_child('other')
+    other.add_child('y', value=2, type=int)
+    return p
+
+
+class Counter(object):
+
+    def __init__(self):
+        self.count = 0
+
+    def value(self):
+        return self.count
+
+
+class TestFrozen(TestCase):
+
+    def test_snapshot(self):
+        p = node()
+        snapshot = freeze(p)
+        self.assertEqual(snapshot.to_dict(), p.to_dict())
+        self.assertEqual(snapshot.child_names(recursive=True), p.child_names(recursive=True))
+        self.assertEqual(snapshot['F'].value(), 10.0)
+        self.assertEqual(snapshot['group.x'].absolute_name(), 'set.group.x')
+        self.assertEqual(snapshot['other'].index(), 4)
+        self.assertEqual(snapshot.content_hash(), p.content_hash())
+
+        p['m'].set_value(6.0)
+        self.assertEqual(snapshot['F'].value(), 10.0)
+        self.assertEqual(freeze(p)['F'].value(), 12.0)
+
+        with self.assertRaises(AttributeError):
+            snapshot['m'].set_value(1.0)
+        with self.assertRaises(AttributeError):
+            snapshot.add_child('z', 1.0, float)
+        with self.assertRaises(ValueError):
+            snapshot.child('group.missing')
+
+    def test_sharing(self):
+        p = node()
+        first = freeze(p)
+        self.assertIs(freeze(p)._r, first._r)
+
+        p['group.x'].set_value(3)
+        second = freeze(p)
+        self.assertIsNot(second._r, first._r)
+        self.assertIsNot(second['group']._r, first['group']._r)
+        self.assertIs(second['other']._r, first['other']._r)
+        self.assertIs(second['m']._r, first['m']._r)
+
+        p.add_child('z', 1.0, float)
+        third = freeze(p)
+        self.assertIs(third['group']._r, second['group']._r)
+        self.assertEqual(third.child_names(), ['m', 'a', 'F', 'group', 'other', 'z'])
+
+    def test_descriptor(self):
+        counter = Counter()
+        p = node()
+        p['group'].add_child(ParamNode('count', type=int, fget=counter.value))
+        first = freeze(p)
+        counter.count = 5
+        second = freeze(p)
+        self.assertEqual(first['group.count'].value(), 0)
+        self.assertEqual(second['group.count'].value(), 5)
+        self.assertIs(second['other']._r, first['other']._r)
+
+    def test_thaw(self):
+        snapshot = freeze(node())
+        tree = thaw(snapshot)
+        self.assertNotIsInstance(tree['m'], type(snapshot['m']))
+        tree['m'].set_value(1.0)
+        self.assertEqual(tree['F'].value(), 2.0)
+        self.assertEqual(pickle.loads(pickle.dumps(snapshot)).to_dict(), snapshot.to_dict())
+
+    def test_publisher(self):
+        p = node()
+        publisher = SnapshotPublisher(p)
+        errors = []
+
+        def read():
+            for _ in range(200):
+                snapshot = publisher.snapshot()
+                if snapshot['F'].value() != snapshot['m'].value() * snapshot['a'].value():
+                    errors.append(snapshot)
+
+        readers = [threading.Thread(target=read) for _ in range(4)]
+        for reader in readers:
+            reader.start()
+        for i in range(200):
+            p['m'].set_value(float(i))
+            publisher.publish()
+        for reader in readers:
+            reader.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(publisher.snapshot()['m'].value(), 199.0)
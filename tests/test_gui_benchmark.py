@@ -0,0 +1,25 @@
+from unittest import TestCase, skipUnless
+
+from sparc.gui import HAVE_QT
+
+
+@skipUnless(HAVE_QT, 'requires PyQt5')
+class TestGuiBenchmark(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        from benchmarks import gui
+        # run() would create an application that is destroyed when it returns
+        cls.app = gui.QtWidgets.QApplication.instance() or gui.QtWidgets.QApplication([])
+
+    def test_smoke(self):
+        from benchmarks import gui
+        results = gui.run(['wide', 'deep'], [20], repeat=1, check=gui.HAVE_TESTER, large=False)['results']
+        self.assertEqual(len(results), 2 * len(gui.SCENARIOS))
+        for result in results:
+            self.assertEqual(result['size'], 20)
+            if result['steps']:
+                self.assertGreater(result['frame_ms']['max'], 0)
+        calls = {(result['benchmark'], result['tree']): result['data_calls'] for result in results}
+        self.assertGreater(calls['gui_filter', 'wide'], 0)
+        self.assertGreater(calls['gui_edit', 'wide'], 0)
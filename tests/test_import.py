@@ -0,0 +1,65 @@
+from unittest import TestCase, skipUnless
+import os
+import sys
+import subprocess
+
+import sparc
+import sparc.core
+import sparc.gui
+from sparc.core import Types
+from sparc.core.types import TYPE_MODULES, TYPE_NAMES
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def imported_modules(code, names):
+    """Returns the given module names that are imported after running code in a fresh interpreter."""
+    check = f'import sys; print(",".join(name for name in {names!r} if name in sys.modules))'
+    output = subprocess.check_output([sys.executable, '-W', 'ignore', '-c', f'{code}; {check}'], cwd=ROOT, text=True)
+    return [name for name in output.strip().split(',') if name]
+
+
+class TestImport(TestCase):
+
+    def test_lazy_dependencies(self):
+        slow = ['PyQt5.QtCore', 'numpy', 'asyncio', 'sqlite3', 'multiprocessing', 'tracemalloc']
+        self.assertEqual(imported_modules('import sparc', slow), [])
+        self.assertEqual(imported_modules('import sparc.gui', slow), [])
+        self.assertEqual(imported_modules('from sparc.core import SqliteStore', slow), ['sqlite3'])
+
+    def test_lazy_names(self):
+        for module, names in sparc.core.LAZY_MODULES.items():
+            submodule = __import__(f'sparc.core.{module}', fromlist=['__all__'])
+            self.assertEqual(sorted(names), sorted(submodule.__all__))
+            for name in names:
+                self.assertIs(getattr(sparc.core, name), getattr(submodule, name))
+                self.assertIs(getattr(sparc, name), getattr(submodule, name))
+        self.assertIn('SharedTree', dir(sparc.core))
+        with self.assertRaises(AttributeError):
+            sparc.core.missing
+        with self.assertRaises(AttributeError):
+            sparc.missing
+
+    @skipUnless(sparc.gui.HAVE_QT, 'requires PyQt5')
+    def test_gui_names(self):
+        modules = {}
+        for name, module in sparc.gui.NAMES.items():
+            modules.setdefault(module, []).append(name)
+        for module, names in modules.items():
+            submodule = __import__(f'sparc.gui.{module}', fromlist=['__all__'])
+            self.assertEqual(sorted(names), sorted(submodule.__all__))
+            for name in names:
+                self.assertIs(getattr(sparc.gui, name), getattr(submodule, name))
+        self.assertIn('ColorSerializer', dir(sparc.gui))
+
+    def test_type_modules(self):
+        Types.register_module('Fraction', 'tests.fraction_type')
+        try:
+            self.assertIn('Fraction', TYPE_MODULES)
+            cls = Types.get_type('Fraction')
+            self.assertEqual(Types.get_name(cls), 'Fraction')
+            self.assertNotIn('Fraction', TYPE_MODULES)
+        finally:
+            TYPE_NAMES.pop('Fraction', None)
+            TYPE_MODULES.pop('Fraction', None)
@@ -1,7 +1,9 @@
 from unittest import TestCase
+import array
+import copy
 import pickle
 
-from sparc.core import ParamGroupNode, Interval, dumps, loads
+from sparc.core import ParamNode, ParamGroupNode, Interval, dumps, loads
 
 
 def node():
@@ -12,10 +14,80 @@ def node():
     return p
 
 
+class Oven(object):
+
+    def __init__(self, temperature):
+        self._t = temperature
+
+    def temperature(self):
+        return self._t
+
+    def set_temperature(self, t):
+        self._t = t
+
+
 class TestIO(TestCase):
 
     def test_pickle(self):
-        pickle.loads(pickle.dumps(node()))
+        p = pickle.loads(pickle.dumps(node()))
+        self.assertEqual(p.child_names(recursive=True), node().child_names(recursive=True))
+        self.assertEqual(p['ingredients.milk'].value(), 0.4)
+        self.assertIs(p['ingredients.servings'].parent(), p['ingredients'])
+
+    def test_pickle_subtree(self):
+        ingredients = pickle.loads(pickle.dumps(node()['ingredients']))
+        self.assertIsNone(ingredients.parent())
+        self.assertEqual(ingredients.child_names(), ['servings', 'milk'])
+
+    def test_pickle_deep(self):
+        p = ParamGroupNode('root')
+        group = p
+        for i in range(5000):
+            group = group.add_child(f'level{i}')
+        group.add_child('leaf', value=1, type=int)
+
+        q = pickle.loads(pickle.dumps(p, protocol=pickle.HIGHEST_PROTOCOL))
+        self.assertEqual(q.child_count(recursive=True), 5001)
+        self.assertEqual(copy.deepcopy(p).child_count(recursive=True), 5001)
+
+    def test_pickle_buffers(self):
+        p = ParamGroupNode('buffers')
+        p.add_child('raw', value=b'\x00' * 64)
+        p.add_child('samples', value=array.array('d', [1.0, 2.0, 3.0]))
+
+        buffers = []
+        data = pickle.dumps(p, protocol=5, buffer_callback=buffers.append)
+        self.assertEqual(len(buffers), 2)
+
+        q = pickle.loads(data, buffers=buffers)
+        self.assertEqual(q['raw'].value(), b'\x00' * 64)
+        self.assertEqual(q['samples'].value(), array.array('d', [1.0, 2.0, 3.0]))
+
+        q = pickle.loads(pickle.dumps(p, protocol=5))
+        self.assertEqual(q['samples'].value(), array.array('d', [1.0, 2.0, 3.0]))
+
+    def test_pickle_descriptors(self):
+        oven = Oven(180)
+        p = ParamGroupNode('kitchen')
+        p.add_child(ParamNode('bound', type=int, fget=oven.temperature, fset=oven.set_temperature))
+        p.add_child(ParamNode(type=int, fget=Oven.temperature, fset=Oven.set_temperature))
+
+        q = pickle.loads(pickle.dumps(p))
+        self.assertEqual(q['bound'].value(), 180)
+        self.assertEqual(q['temperature'].value(obj=oven), 180)
+
+        p.add_child(ParamNode('lambda', type=int, fget=lambda: 0))
+        with self.assertRaises(pickle.PicklingError):
+            pickle.dumps(p)
 
     def test_json(self):
         loads(dumps(node()))
+
+    def test_json_callback(self):
+        counts = []
+        s = dumps(node(), callback=counts.append)
+        self.assertEqual(counts, [1, 2, 3, 4])
+        counts.clear()
+        p = loads(s, callback=counts.append)
+        self.assertEqual(counts, [1, 2, 3, 4])
+        self.assertEqual(p['ingredients.servings'].value(), 4)
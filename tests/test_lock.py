@@ -0,0 +1,121 @@
+from unittest import TestCase
+import threading
+import time
+
+from sparc.core import ParamGroupNode, RWLock, ThreadSafeTree
+
+
+def node():
+    p = ParamGroupNode('set')
+    p.add_child('m', 5.0, float)
+    p.add_child('a', 2.0, float)
+    p.add_child('F', '=m*a')
+    group = p.add_child('group')
+    group.add_child('x', value=1, type=int)
+    return p
+
+
+class TestRWLock(TestCase):
+
+    def test_reentrant(self):
+        lock = RWLock()
+        with lock.write():
+            with lock.write():
+                with lock.read():
+                    pass
+        with lock.read():
+            with lock.read():
+                pass
+        with lock.write():
+            pass
+
+    def test_upgrade(self):
+        lock = RWLock()
+        with lock.read():
+            self.assertRaises(RuntimeError, lock.acquire_write)
+
+    def test_concurrent_readers(self):
+        lock = RWLock()
+        barrier = threading.Barrier(3, timeout=5)
+
+        def read():
+            with lock.read():
+                barrier.wait()  # all readers hold the lock at the same time
+
+        threads = [threading.Thread(target=read) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertFalse(barrier.broken)
+
+    def test_exclusive_writer(self):
+        lock = RWLock()
+        events = []
+
+        def write():
+            with lock.write():
+                events.append('write')
+
+        with lock.read():
+            thread = threading.Thread(target=write)
+            thread.start()
+            time.sleep(0.05)
+            events.append('read')
+        thread.join()
+        self.assertEqual(events, ['read', 'write'])
+
+
+class TestThreadSafeTree(TestCase):
+
+    def test_access(self):
+        tree = ThreadSafeTree(node())
+        self.assertEqual(tree.value('F'), 10.0)
+        self.assertEqual(tree.values(['m', 'group.x']), [5.0, 1])
+        tree.set_value('m', 6.0)
+        tree.update_values({'a': 3.0, 'group.x': 2})
+        self.assertEqual(tree.to_dict(), {'m': 6.0, 'a': 3.0, 'F': 18.0, 'group': {'x': 2}})
+
+        self.assertEqual(tree.add_child('b', 1.0, float), 'b')
+        tree.remove_child('group.x')
+        tree.remove_child('a')
+        self.assertEqual(tree.child_names(), ['m', 'F', 'group', 'b'])
+        self.assertEqual(tree.child_names('group'), [])
+
+    def test_write_section(self):
+        tree = ThreadSafeTree(node())
+        with tree.write() as root:
+            root['m'].set_value(1.0)
+            root['group'].add_child('y', 3, int)
+            self.assertEqual(tree.value('F'), 2.0)  # reads are allowed in write sections
+        with tree.read() as root:
+            self.assertEqual(root['group.y'].value(), 3)
+
+    def test_concurrent_changes(self):
+        tree = ThreadSafeTree(ParamGroupNode('root'))
+        errors = []
+
+        def write(prefix):
+            for i in range(100):
+                with tree.write() as root:
+                    root.add_child(f'{prefix}{i}', i, int)
+                    if i % 2:
+                        root.remove_child(f'{prefix}{i - 1}')
+
+        def read():
+            try:
+                for _ in range(50):
+                    with tree.read() as root:
+                        for child in root.iter_children():
+                            root.child(child.name()).value()
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=write, args=(prefix,)) for prefix in 'ab']
+        threads += [threading.Thread(target=read) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(len(tree.child_names()), 100)
@@ -0,0 +1,83 @@
+from unittest import TestCase
+import sys
+import tracemalloc
+
+from sparc.core import ParamNode, ParamGroupNode, memory_report, deep_sizeof, MemoryTrace, dumps, loads
+
+
+class Sensor(object):
+
+    def read(self):
+        return 1.0
+
+
+def node(validator):
+    p = ParamGroupNode('set')
+    for i in range(10):
+        p.add_child(f'x{i}', 'abc' * (i + 1), str, validator=validator)
+    p.add_child(ParamNode('sensor', fget=Sensor().read))
+    p.add_child('values', list(range(100)))
+    return p
+
+
+class TestMemory(TestCase):
+
+    def test_deep_sizeof(self):
+        items = ['a' * 100, 'b' * 100]
+        size = deep_sizeof(items)
+        self.assertEqual(size, sys.getsizeof(items) + sum(sys.getsizeof(item) for item in items))
+        # shared objects are counted once
+        self.assertEqual(deep_sizeof([items, items]), size + sys.getsizeof([items, items]))
+
+        seen = set()
+        deep_sizeof(items, seen)
+        self.assertEqual(deep_sizeof(items, seen), 0)
+
+    def test_report(self):
+        validator = ['abc' * (i + 1) for i in range(20)] + ['other' * 10]
+        p = node(validator)
+        report = memory_report(p)
+
+        self.assertEqual(report.category('nodes')['ParamNode'][0], 12)
+        self.assertEqual(report.category('nodes')['ParamGroupNode'][0], 1)
+        self.assertEqual(report.category('names')['str'][0], 13)
+        self.assertEqual(report.category('accessors')['method'][0], 1)
+        self.assertGreaterEqual(report.category('values')['list'][1], deep_sizeof(list(range(100))))
+
+        # the shared validator is counted once
+        validators = report.category('validators')['list']
+        self.assertEqual(validators[0], 10)
+        # 'abc' * 1 is the same str object as the value of x0, which is counted as value
+        self.assertEqual(validators[1], deep_sizeof(validator, {id(validator[0])}))
+
+        self.assertEqual(report.total, sum(report.category_size(category) for category in
+                                           ['nodes', 'names', 'values', 'validators', 'accessors', 'caches']))
+        self.assertEqual(report.category_size('caches'), 0)
+        p.content_hash()
+        self.assertGreater(memory_report(p).category_size('caches'), 0)
+        self.assertIn('validators', str(report))
+
+    def test_trace(self):
+        p = ParamGroupNode('set')
+        for i in range(100):
+            p.add_child(f'x{i}', float(i), float)
+        s = dumps(p)
+        with MemoryTrace() as trace:
+            root = loads(s)
+        self.assertGreater(trace.current, 0)
+        self.assertGreaterEqual(trace.peak, trace.current)
+        self.assertTrue(trace.top(3))
+        self.assertEqual(root.child_count(), 100)
+
+    def test_nested_trace(self):
+        self.assertEqual(MemoryTrace().current, 0)
+        tracemalloc.start()
+        try:
+            data = [bytearray(1 << 20)]
+            del data
+            with MemoryTrace() as trace:
+                pass
+            self.assertGreaterEqual(trace.outer_peak, 1 << 20)
+            self.assertTrue(tracemalloc.is_tracing())
+        finally:
+            tracemalloc.stop()
@@ -0,0 +1,298 @@
+from unittest import TestCase, skipUnless
+import os
+import tempfile
+import threading
+
+from sparc.core import ParamNode, ParamGroupNode
+from sparc.gui import HAVE_QT
+
+if HAVE_QT:
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PyQt5 import QtCore, QtWidgets
+    from sparc.gui import ParamModel, ParamFilterProxyModel
+    from sparc.gui.model import read_tree, write_tree
+
+
+class CountingGroup(ParamGroupNode):
+
+    def __init__(self, name):
+        ParamGroupNode.__init__(self, name)
+        self.counted = 0
+
+    def child_count(self, recursive=False):
+        self.counted += 1
+        return ParamGroupNode.child_count(self, recursive)
+
+
+def groups(count=20, size=20):
+    p = ParamGroupNode('root')
+    for i in range(count):
+        group = p.add_child(ParamGroupNode(f'g{i}'))
+        for j in range(size):
+            group.add_child(f'x{j}', j / 3, float)
+    return p
+
+
+def node(size=1000):
+    p = ParamGroupNode('root')
+    for i in range(size):
+        p.add_child(f'x{i}', float(i), float)
+    p.add_child('y', '=x1 * 2')
+    return p
+
+
+@skipUnless(HAVE_QT, 'requires PyQt5')
+class TestParamModel(TestCase):
+
+    def setUp(self):
+        self.app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+        self.root = node()
+        self.model = ParamModel(self.root)
+        self.model.setBatchSize(self.root.child_count())
+        self.model.fetchMore(QtCore.QModelIndex())
+        self.changed = []
+        self.model.dataChanged.connect(lambda topLeft, bottomRight: self.changed.extend(
+            self.model.nodeFromIndex(topLeft.sibling(row, 0)).name()
+            for row in range(topLeft.row(), bottomRight.row() + 1)))
+
+    def wait(self, signal, timeout=5000):
+        """Runs the event loop until *signal* is emitted and returns its arguments."""
+        args = []
+        loop = QtCore.QEventLoop()
+
+        def done(*values):
+            args.extend(values)
+            loop.quit()
+        signal.connect(done)
+        QtCore.QTimer.singleShot(timeout, loop.quit)
+        loop.exec_()
+        signal.disconnect(done)
+        return args
+
+    def display(self, name):
+        return self.model.data(self.model.indexFromNode(self.root[name], 1), QtCore.Qt.DisplayRole)
+
+    def test_edit_keeps_cache_of_other_rows(self):
+        for child in self.root:
+            self.display(child.name())
+        self.model.setData(self.model.indexFromNode(self.root['x1'], 1), 3.0, QtCore.Qt.EditRole)
+        self.app.processEvents()
+
+        self.assertEqual(sorted(self.changed), ['x1', 'y'])
+        self.assertIn(self.root['x500'], self.model._cache)
+        self.assertNotIn(self.root['y'], self.model._cache)
+        self.assertEqual(self.display('y'), self.display('x6'))  # 2 * 3.0
+
+    def test_context_changed_in_place(self):
+        self.model.insertNode(ParamNode('z', '=v * 2'))
+        context = {'v': 1.0}
+        self.model.setExpressionContext(context)
+        self.app.processEvents()
+        self.assertEqual(self.display('z'), self.display('x2'))
+
+        self.changed.clear()
+        context['v'] = 3.0
+        self.model.setExpressionContext(context)
+        self.app.processEvents()
+        self.assertEqual(self.changed, ['z'])
+        self.assertEqual(self.display('z'), self.display('x6'))
+
+        self.changed.clear()
+        self.model.setExpressionContext(context)
+        self.app.processEvents()
+        self.assertEqual(self.changed, [])
+
+    def test_child_count_cache(self):
+        root = CountingGroup('root')
+        for i in range(10):
+            root.add_child(f'x{i}', float(i), float)
+        model = ParamModel(root)
+        parent = QtCore.QModelIndex()
+        for _ in range(3):
+            self.assertEqual(model.rowCount(parent), 10)
+            self.assertFalse(model.canFetchMore(parent))
+        self.assertEqual(root.counted, 1)
+
+        model.insertNode(ParamNode('y', 1.0, float))
+        self.assertEqual(model.rowCount(parent), 11)
+        model.removeNode(root['x0'])
+        model.removeNode(root['x1'])
+        self.assertEqual(model.rowCount(parent), 9)
+        self.assertEqual(root.counted, 1)
+
+        model.patch(node(3))
+        self.assertEqual(model.rowCount(parent), 4)
+
+    def test_fetch_in_slot(self):
+        model = ParamModel(node())
+        parent = QtCore.QModelIndex()
+        inserted = []
+        model.rowsAboutToBeInserted.connect(lambda *args: model.fetchMore(parent))
+        model.rowsInserted.connect(lambda parent, first, last: inserted.append((first, last)))
+        while model.canFetchMore(parent):
+            model.fetchMore(parent)
+        batch = model.batchSize()
+        self.assertEqual(inserted[:2], [(batch, 2 * batch - 1), (2 * batch, 3 * batch - 1)])
+        self.assertEqual(model.rowCount(parent), 1001)
+
+    def test_decimals_through_proxy(self):
+        model = ParamModel(groups())
+        proxy = ParamFilterProxyModel()
+        proxy.setSourceModel(model)
+        view = QtWidgets.QTreeView()
+        view.setModel(proxy)
+        view.show()
+        proxy.setFilterPattern('x1')
+        view.expandAll()
+        view.setCurrentIndex(proxy.index(0, 0, proxy.index(0, 0)))
+        self.app.processEvents()
+        messages = []
+        QtCore.qInstallMessageHandler(lambda mode, context, message: messages.append(message))
+        try:
+            for decimals in (2, 4):
+                model.setDecimals(decimals)
+                self.app.processEvents()
+            model.setAsyncEvaluation(False)
+            self.app.processEvents()
+            proxy.setFilterPattern('')
+            self.app.processEvents()
+        finally:
+            QtCore.qInstallMessageHandler(None)
+        self.assertEqual(messages, [])
+        self.assertEqual(proxy.rowCount(QtCore.QModelIndex()), 20)
+        group = proxy.index(0, 0, QtCore.QModelIndex())
+        self.assertEqual(proxy.data(proxy.index(1, 1, group), QtCore.Qt.DisplayRole), '0.3333')
+
+    def test_batch_size_keeps_rows(self):
+        model = ParamModel(node(50))
+        parent = QtCore.QModelIndex()
+        self.assertEqual(model.rowCount(parent), 51)
+        model.setBatchSize(10)
+        self.assertEqual(model.rowCount(parent), 51)
+        group = ParamGroupNode('g')
+        for i in range(30):
+            group.add_child(f'x{i}', float(i), float)
+        model.insertNode(group)
+        index = model.indexFromNode(group)
+        self.assertEqual(model.rowCount(index), 10)
+        model.setBatchSize(20)
+        self.assertEqual(model.rowCount(index), 10)
+        model.fetchMore(index)
+        self.assertEqual(model.rowCount(index), 30)
+
+    def test_save_snapshot(self):
+        filename = os.path.join(tempfile.mkdtemp(), 'params.json')
+        progress = []
+        self.model.ioProgress.connect(lambda count, total: progress.append((count, total)))
+        self.model.saveAsync(filename, binary=False)
+        # changes after the call are not saved
+        self.model.setData(self.model.indexFromNode(self.root['x1'], 1), 42.0, QtCore.Qt.EditRole)
+        self.model.removeNode(self.root['x0'])
+        self.assertEqual(self.wait(self.model.saveFinished), [filename])
+
+        tree = read_tree(filename, binary=False)
+        self.assertEqual(tree['x1'].value(), 1.0)
+        self.assertEqual(tree['x0'].value(), 0.0)
+        self.assertEqual(self.root['x1'].value(), 42.0)
+        total = tree.child_count(recursive=True) + 1
+        self.assertEqual(progress[0], (0, total))
+        self.assertEqual(progress[-1], (total, total))
+        self.assertGreater(len(progress), 2)
+        self.assertEqual([count for count, _ in progress], sorted(count for count, _ in progress))
+
+    def test_load(self):
+        filename = os.path.join(tempfile.mkdtemp(), 'params.spc')
+        write_tree(node(3), filename)
+        self.model.loadAsync(filename)
+        self.assertEqual(self.wait(self.model.loadFinished), [filename])
+        self.assertIsNot(self.model.root(), self.root)
+        self.assertEqual(self.model.rowCount(QtCore.QModelIndex()), 4)
+
+        self.model.setRoot(self.root)
+        self.model.load(filename)
+        self.assertIsNot(self.model.root(), self.root)
+        self.assertEqual(self.model.rowCount(QtCore.QModelIndex()), 4)
+
+    def test_io_error(self):
+        directory = tempfile.mkdtemp()
+        missing = os.path.join(directory, 'missing.spc')
+        self.model.loadAsync(missing)
+        message, = self.wait(self.model.errorMessage)
+        self.assertTrue(message.startswith(missing))
+        self.assertIs(self.model.root(), self.root)
+
+        filename = os.path.join(directory, 'missing', 'params.spc')
+        self.model.saveAsync(filename)
+        message, = self.wait(self.model.errorMessage)
+        self.assertTrue(message.startswith(filename))
+        self.assertEqual(os.listdir(directory), [])
+
+    def waitFor(self, condition, timeout=5.0):
+        """Processes events until *condition* returns True."""
+        timer = threading.Timer(timeout, lambda: None)
+        timer.start()
+        while not condition() and timer.is_alive():
+            self.app.processEvents(QtCore.QEventLoop.AllEvents, 10)
+        timer.cancel()
+        return condition()
+
+    def test_async_evaluation(self):
+        self.model.setAsyncEvaluation(True, 1)
+        self.addCleanup(self.model.setAsyncEvaluation, False)
+        self.changed.clear()
+        submitted = []
+        submit = self.model._executor.submit
+        self.model._executor.submit = lambda *args: submitted.append(args[1]) or submit(*args)
+
+        self.assertEqual(self.display('y'), ParamModel.PLACEHOLDER)
+        # concurrent requests of a node are evaluated once
+        self.assertEqual(self.display('y'), ParamModel.PLACEHOLDER)
+        self.assertIsNone(self.model.data(self.model.indexFromNode(self.root['y'], 1), QtCore.Qt.CheckStateRole))
+        self.assertEqual(submitted, [self.root['y']])
+        # plain values are not evaluated in the background
+        self.assertNotEqual(self.display('x2'), ParamModel.PLACEHOLDER)
+
+        self.assertTrue(self.waitFor(lambda: 'y' in self.changed))
+        self.assertEqual(self.display('y'), self.display('x2'))
+        self.assertEqual(submitted, [self.root['y']])
+
+        self.model.setData(self.model.indexFromNode(self.root['x1'], 1), 3.0, QtCore.Qt.EditRole)
+        self.assertEqual(self.display('y'), ParamModel.PLACEHOLDER)
+        self.assertTrue(self.waitFor(lambda: self.display('y') == self.display('x6')))
+        self.assertEqual(len(submitted), 2)
+
+    def test_cancel_hidden(self):
+        root = node(10)
+        for i in range(200):
+            root.add_child(f'z{i}', f'=x1 * {i}')
+        model = ParamModel(root)
+        model.setAsyncEvaluation(True, 1)
+        self.addCleanup(model.setAsyncEvaluation, False)
+        # the worker is blocked, so that all requests are pending
+        gate = threading.Event()
+        self.addCleanup(gate.set)
+        model._executor.submit(gate.wait)
+        view = QtWidgets.QTreeView()
+        self.addCleanup(view.close)
+        view.setModel(model)
+        view.resize(400, 300)
+        view.show()
+        self.app.processEvents()
+
+        indexes = [model.indexFromNode(root[f'z{i}'], 1) for i in range(200)]
+        for index in indexes:
+            model.data(index, QtCore.Qt.DisplayRole)
+        futures = {node: model._pending[node] for node in root if node.name().startswith('z')}
+        self.assertEqual(len(futures), 200)
+
+        model.cancelHidden(view)
+        rect = view.viewport().rect()
+        visible = {model.nodeFromIndex(index) for index in indexes if rect.intersects(view.visualRect(index))}
+        self.assertTrue(visible)
+        self.assertEqual({node for node in futures if node in model._pending}, visible)
+        self.assertTrue(all(future.cancelled() for node, future in futures.items() if node not in visible))
+
+        gate.set()
+        self.assertTrue(self.waitFor(lambda: visible <= set(model._values)))
+        x1 = model.indexFromNode(root['x1'], 1)
+        self.assertEqual(model.data(indexes[1], QtCore.Qt.DisplayRole), model.data(x1, QtCore.Qt.DisplayRole))
@@ -37,3 +37,58 @@ class TestAbstractNode(TestCase):
 
         p1.remove_child(p2)
         self.assertEqual(p1.child_count(True), 0)
+
+    def test_child_lookup(self):
+        root = AbstractNode('root')
+        for name in ['a', 'b', 'c']:
+            root.add_child(AbstractNode(name))
+        b = root['b']
+        self.assertEqual(b.index(), 1)
+        self.assertEqual(root.index_of_child('c'), 2)
+        self.assertRaises(KeyError, root.add_child, AbstractNode('a'))
+        self.assertRaises(NameError, AbstractNode, 'a', parent=root)
+        self.assertRaises(ValueError, root.child, 'x')
+        self.assertRaises(ValueError, root.index_of_child, 'x')
+
+        self.assertEqual(root.pop_child('a').name(), 'a')
+        self.assertRaises(ValueError, root.child, 'a')
+        self.assertEqual(b.index(), 0)
+
+        other = AbstractNode('other')
+        other.add_child(b)  # moves b
+        self.assertRaises(ValueError, root.child, 'b')
+        self.assertIs(other['b'], b)
+        root.add_child(AbstractNode('b'))
+        self.assertEqual(root.child_names(), ['c', 'b'])
+
+        copied = copy.deepcopy(root)
+        self.assertEqual(copied['b'].index(), 1)
+        copied.remove_child('b')
+        self.assertRaises(ValueError, copied.child, 'b')
+
+    def test_index_after_insert_and_remove(self):
+        root = AbstractNode('root')
+        nodes = [root.add_child(AbstractNode(f'n{i}')) for i in range(5)]
+        self.assertEqual([node.index() for node in nodes], list(range(5)))
+
+        front = root.insert_child(0, AbstractNode('front'))
+        self.assertEqual(front.index(), 0)
+        self.assertEqual([node.index() for node in nodes], list(range(1, 6)))
+
+        root.remove_child(nodes[2])
+        self.assertEqual([node.index() for node in nodes if node is not nodes[2]], [1, 2, 3, 4])
+        self.assertRaises(ValueError, root.index_of_child, nodes[2])
+        root.add_child(nodes[2])
+        self.assertEqual(nodes[2].index(), 5)
+        self.assertEqual([root.index_of_child(child) for child in root], list(range(6)))
+
+    def test_index_after_front_changes(self):
+        root = AbstractNode('root')
+        nodes = [root.add_child(AbstractNode(f'n{i}')) for i in range(100)]
+        self.assertEqual([node.index() for node in nodes], list(range(100)))
+        for i in range(3):
+            root.insert_child(0, AbstractNode(f'front{i}'))
+            self.assertEqual([node.index() for node in nodes], list(range(i + 1, i + 101)))
+        while nodes:
+            root.remove_child(nodes.pop(0))
+            self.assertEqual([node.index() for node in nodes[:2]], list(range(3, 3 + len(nodes[:2]))))
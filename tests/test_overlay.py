@@ -0,0 +1,111 @@
+from unittest import TestCase
+import pickle
+
+from sparc.core import ParamGroupNode, OverlayGroupNode, OverlayParamNode, Interval
+
+
+def node():
+    p = ParamGroupNode('set')
+    p.add_child('m', 5.0, float)
+    p.add_child('a', 2.0, float, validator=Interval(0, 10))
+    p.add_child('F', '=m*a')
+    group = p.add_child('group')
+    group.add_child('x', value=1, type=int, editable=False)
+    group.add_child('y', value=2, type=int)
+    return p
+
+
+class TestOverlay(TestCase):
+
+    def test_overrides(self):
+        base = node()
+        scenario = OverlayGroupNode(base)
+        self.assertEqual(scenario.to_dict(), base.to_dict())
+        self.assertEqual(scenario.child_names(recursive=True), base.child_names(recursive=True))
+
+        scenario['a'].set_value(3.0)
+        scenario['group.y'].set_value('5')
+        self.assertEqual(scenario.overrides(), {'a': 3.0, 'group.y': 5})
+        self.assertEqual(scenario['group'].overrides(), {'y': 5})
+        self.assertTrue(scenario['a'].is_overridden())
+        self.assertFalse(scenario['m'].is_overridden())
+
+        self.assertEqual(scenario['F'].value(), 15.0)
+        self.assertEqual(base['F'].value(), 10.0)
+        self.assertEqual(base['a'].value(), 2.0)
+
+        base['m'].set_value(6.0)
+        self.assertEqual(scenario['F'].value(), 18.0)
+
+        with self.assertRaises(ValueError):
+            scenario['a'].set_value(20.0)
+        with self.assertRaises(AttributeError):
+            scenario['group.x'].set_value(3)
+        with self.assertRaises(AttributeError):
+            scenario.add_child('z', 1.0, float)
+
+        scenario.reset('a')
+        self.assertEqual(scenario['F'].value(), 12.0)
+        scenario.reset()
+        self.assertEqual(scenario.overrides(), {})
+
+    def test_expression_override(self):
+        scenario = OverlayGroupNode(node())
+        scenario['F'].set_value('=m*a*2')
+        self.assertTrue(scenario['F'].is_expression())
+        self.assertEqual(scenario['F'].value(), 20.0)
+
+    def test_stacked(self):
+        base = node()
+        first = OverlayGroupNode(base)
+        first['m'].set_value(1.0)
+        second = OverlayGroupNode(first)
+        second['a'].set_value(4.0)
+
+        self.assertEqual(first['F'].value(), 2.0)
+        self.assertEqual(second['F'].value(), 4.0)
+        self.assertEqual(second.overrides(), {'a': 4.0})
+
+    def test_flatten(self):
+        base = node()
+        scenario = OverlayGroupNode(base)
+        scenario['group.y'].set_value(7)
+
+        tree = scenario.flatten()
+        self.assertIsInstance(tree, ParamGroupNode)
+        self.assertEqual(tree['group.y'].value(), 7)
+        self.assertEqual(tree.content_hash(), scenario.content_hash())
+        self.assertNotEqual(tree.content_hash(), base.content_hash())
+
+        base['m'].set_value(6.0)
+        self.assertNotEqual(tree.content_hash(), scenario.content_hash())
+
+        tree = pickle.loads(pickle.dumps(scenario))
+        self.assertEqual(tree.to_dict(), scenario.to_dict())
+
+    def test_content_hash(self):
+        base = node()
+        scenario = OverlayGroupNode(base)
+        self.assertEqual(scenario.content_hash(), base.content_hash())
+
+        hashed = []
+        update_hash = OverlayParamNode._update_hash
+
+        def spy(self, h):
+            hashed.append(self.absolute_name())
+            update_hash(self, h)
+
+        OverlayParamNode._update_hash = spy
+        try:
+            scenario.content_hash()
+            self.assertEqual(hashed, [])
+            scenario['group.y'].set_value(7)
+            self.assertNotEqual(scenario.content_hash(), base.content_hash())
+            self.assertEqual(hashed, ['set.group.y'])
+        finally:
+            OverlayParamNode._update_hash = update_hash
+
+        scenario.reset()
+        self.assertEqual(scenario.content_hash(), base.content_hash())
+        base['m'].set_value(6.0)
+        self.assertEqual(scenario.content_hash(), base.content_hash())
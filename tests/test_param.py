@@ -1,4 +1,7 @@
 from unittest import TestCase
+import asyncio
+import time
+
 from sparc.core import ParamNode, ParamGroupNode, Interval
 
 
@@ -62,3 +65,66 @@ class TestParamNode(TestCase):
 
         with self.assertRaises(NameError):
             p.child('extern').value()
+
+
+class Device(object):
+    """A device proxy with coroutine accessors."""
+
+    def __init__(self, value=1.0):
+        self._value = value
+        self.reads = 0
+        self.active = 0
+        self.max_active = 0
+
+    async def read(self):
+        self.reads += 1
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(0.05)
+        self.active -= 1
+        return self._value
+
+    async def write(self, value):
+        await asyncio.sleep(0.01)
+        self._value = value
+
+
+class TestAsyncParamNode(TestCase):
+
+    def test_avalue(self):
+        device = Device(2.0)
+        p = ParamGroupNode('set')
+        p.add_child('m', 5.0, float)
+        p.add_child(ParamNode('a', type=float, fget=device.read, fset=device.write))
+        p.add_child('F', '=m*a')
+
+        self.assertEqual(asyncio.run(p['a'].avalue()), 2.0)
+        self.assertEqual(asyncio.run(p['F'].avalue()), 10.0)
+        asyncio.run(p['a'].aset_value(3))
+        self.assertEqual(asyncio.run(p['F'].avalue()), 15.0)
+        self.assertEqual(asyncio.run(p['m'].avalue()), 5.0)
+
+    def test_agather_values(self):
+        devices = [Device(float(i)) for i in range(50)]
+        p = ParamGroupNode('set')
+        group = p.add_child('group')
+        for i, device in enumerate(devices):
+            group.add_child(ParamNode(f'x{i}', fget=device.read))
+        group.add_child('sum', '=x0+x1+x2')
+        p.add_child('y', 1, int)
+
+        start = time.perf_counter()
+        values = asyncio.run(p.agather_values(recursive=True))
+        self.assertLess(time.perf_counter() - start, 1.0)  # 50 sequential reads take 2.5 s
+        self.assertEqual(values['group.x10'], 10.0)
+        self.assertEqual(values['group.sum'], 3.0)
+        self.assertEqual(values['y'], 1)
+        self.assertNotIn('group', values)
+        self.assertEqual(devices[0].reads, 1)  # read once, although sum refers to x0
+
+        shared = Device()
+        p = ParamGroupNode('set')
+        for i in range(6):
+            p.add_child(ParamNode(f'x{i}', fget=shared.read))
+        asyncio.run(p.agather_values(limit=2))
+        self.assertEqual(shared.max_active, 2)
@@ -0,0 +1,90 @@
+from unittest import TestCase
+
+from sparc.core import ParamNode, ParamGroupNode, Interval, Profiler, record_cache
+
+
+class Clock(object):
+    """A clock that advances by one second on every call."""
+
+    def __init__(self):
+        self.time = 0.0
+
+    def __call__(self):
+        self.time += 1.0
+        return self.time
+
+
+class Device(object):
+
+    def __init__(self):
+        self.value = 1.0
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+
+def node():
+    device = Device()
+    p = ParamGroupNode('set')
+    p.add_child('m', 5.0, float, validator=Interval(0, 10))
+    p.add_child(ParamNode('a', type=float, fget=device.get, fset=device.set))
+    p.add_child('F', '=m*a')
+    return p
+
+
+class TestProfiler(TestCase):
+
+    def test_counts(self):
+        p = node()
+        with Profiler() as profiler:
+            self.assertTrue(profiler.is_running())
+            self.assertEqual(p['F'].value(), 5.0)
+            p['a'].set_value(2.0)
+            self.assertEqual(p['F'].value(), 10.0)
+            p['m'].content_hash()
+            p['m'].content_hash()
+            record_cache(p['F'], False)
+        self.assertFalse(profiler.is_running())
+
+        stats = {s.node.name(): s for s in profiler.stats()}
+        self.assertEqual(stats['F'].value_calls, 2)
+        self.assertEqual(stats['m'].value_calls, 2)
+        self.assertEqual(stats['a'].set_value_calls, 1)
+        self.assertEqual((stats['m'].cache_hits, stats['m'].cache_misses), (1, 1))
+        self.assertEqual(stats['F'].cache_misses, 1)
+
+        self.assertGreater(stats['F'].expression_time, 0)
+        self.assertGreater(stats['a'].fget_time, 0)
+        self.assertGreater(stats['a'].fset_time, 0)
+        self.assertGreater(stats['m'].validation_time, 0)
+        self.assertEqual(stats['m'].fget_time, 0)
+
+        # no collection outside of the context
+        p['F'].value()
+        self.assertEqual(stats['F'].value_calls, 2)
+        self.assertEqual(ParamNode.value.__name__, 'value')
+        self.assertNotIn('__wrapped__', ParamNode.__dict__['value'].__dict__)
+
+    def test_exclusive_time(self):
+        p = node()
+        with Profiler(clock=Clock()) as profiler:
+            p['F'].value()
+        stats = {s.node.name(): s for s in profiler.stats()}
+        # the value time includes the evaluation of siblings, the own time does not
+        self.assertGreater(stats['F'].value_time, stats['F'].own_time)
+        self.assertEqual(profiler.top(1)[0].node.name(), 'F')
+        self.assertEqual(profiler.top(1, key='fget_time')[0].node.name(), 'a')
+
+        report = profiler.report(2).splitlines()
+        self.assertEqual(len(report), 3)
+        self.assertTrue(report[1].startswith('set.F'))
+
+        profiler.reset()
+        self.assertEqual(profiler.stats(), [])
+
+    def test_single_profiler(self):
+        with Profiler():
+            self.assertRaises(RuntimeError, Profiler().start)
@@ -0,0 +1,92 @@
+from unittest import TestCase
+
+from sparc.core import ParamGroupNode, ParamNode, SearchIndex, with_ancestors
+
+
+def node():
+    p = ParamGroupNode('root')
+    p.add_child('voltage', 5.0, float)
+    p.add_child('Gain', 2, int)
+    p.add_child('label', 'first\nline', str)
+    channels = p.add_child('channels')
+    for i in range(3):
+        channel = channels.add_child(f'ch{i}')
+        channel.add_child('gain', i, int)
+        channel.add_child('offset', 0.5, float)
+    return p
+
+
+class TestSearchIndex(TestCase):
+
+    def names(self, nodes):
+        return [node.absolute_name() for node in nodes]
+
+    def test_find(self):
+        p = node()
+        index = SearchIndex(p, values=True, chunk_size=4)
+        self.assertEqual(len(index), 13)
+
+        self.assertEqual(self.names(index.find('gain')), ['root.Gain', 'root.channels.ch0.gain',
+                                                          'root.channels.ch1.gain', 'root.channels.ch2.gain'])
+        self.assertEqual(self.names(index.find('gain', case_sensitive=True)),
+                         ['root.channels.ch0.gain', 'root.channels.ch1.gain', 'root.channels.ch2.gain'])
+        self.assertEqual(self.names(index.find('ch', mode='prefix')),
+                         ['root.channels', 'root.channels.ch0', 'root.channels.ch1', 'root.channels.ch2'])
+        self.assertEqual(self.names(index.find('ch?', mode='glob')),
+                         ['root.channels.ch0', 'root.channels.ch1', 'root.channels.ch2'])
+        self.assertEqual(self.names(index.find('*.ch1.*', mode='glob', fields=('path',))),
+                         ['root.channels.ch1.gain', 'root.channels.ch1.offset'])
+        self.assertEqual(self.names(index.find('float', mode='glob', fields=('type',))),
+                         ['root.voltage', 'root.channels.ch0.offset', 'root.channels.ch1.offset',
+                          'root.channels.ch2.offset'])
+        self.assertEqual(self.names(index.find('line', fields=('value',))), ['root.label'])
+        self.assertEqual(len(index.find('')), 13)
+        self.assertEqual(len(index.find('', limit=5)), 5)
+        self.assertEqual(index.find('first line', mode='glob', fields=('value',)), [p['label']])
+
+        self.assertRaises(ValueError, index.find, 'x', mode='regex')
+        self.assertRaises(ValueError, index.find, 'x', fields=('size',))
+        self.assertRaises(ValueError, SearchIndex(p).find, 'x', fields=('value',))
+
+    def test_update(self):
+        p = node()
+        index = SearchIndex(p, values=True, chunk_size=4)
+
+        ch1 = p['channels.ch1']
+        p['channels'].remove_child(ch1)
+        index.remove(ch1)
+        self.assertEqual(len(index), 10)
+        self.assertNotIn(ch1['gain'], index)
+        self.assertEqual(self.names(index.find('gain', case_sensitive=True)),
+                         ['root.channels.ch0.gain', 'root.channels.ch2.gain'])
+
+        p.add_child(ch1)
+        index.add(ch1)
+        self.assertEqual(self.names(index.find('ch1.gain', fields=('path',))), ['root.ch1.gain'])
+
+        p['voltage'].set_value(12.5)
+        index.update(p['voltage'])
+        self.assertEqual(index.find('12.5', fields=('value',)), [p['voltage']])
+        self.assertRaises(ValueError, index.update, ParamNode('other', 1.0))
+
+        index.rebuild()
+        self.assertEqual(len(index), 13)
+
+    def test_remove_chunks(self):
+        p = node()
+        index = SearchIndex(p, chunk_size=4)
+        self.assertEqual(len(index.find('*', mode='glob')), 13)
+        index.remove(p['channels'])
+        self.assertEqual(self.names(index.find('')), ['root.voltage', 'root.Gain', 'root.label'])
+        self.assertEqual(len(index.find('*', mode='glob')), 3)
+        for child in p:
+            index.remove(child)
+        self.assertEqual(index.find(''), [])
+        index.add(p['voltage'])
+        self.assertEqual(index.find('*', mode='glob'), [p['voltage']])
+
+    def test_with_ancestors(self):
+        p = node()
+        nodes = with_ancestors([p['channels.ch0.gain'], p['channels.ch2.gain']], p)
+        self.assertEqual(sorted(self.names(nodes)), ['root.channels', 'root.channels.ch0', 'root.channels.ch0.gain',
+                                                     'root.channels.ch2', 'root.channels.ch2.gain'])
@@ -0,0 +1,88 @@
+from unittest import TestCase, mock
+import pickle
+from multiprocessing import resource_tracker
+
+from sparc.core import ParamNode, ParamGroupNode, SharedTree, Interval
+
+
+class Oven(object):
+
+    def temperature(self):
+        return 180
+
+
+def node():
+    p = ParamGroupNode('set')
+    p.add_child('m', 5.0, float)
+    p.add_child('a', 2.0, float)
+    p.add_child('F', '=m*a')
+    group = p.add_child('group')
+    group.add_child('servings', value=4, type=int, validator=Interval(0, 10))
+    group.add_child('ünïcode', value='text', type=str)
+    group.add_child('empty')
+    return p
+
+
+class TestSharedTree(TestCase):
+
+    def setUp(self):
+        self.tree = SharedTree.freeze(node())
+
+    def tearDown(self):
+        self.tree.close()
+        self.tree.unlink()
+
+    def test_access(self):
+        root = self.tree.root()
+        self.assertEqual(len(self.tree), 8)
+        self.assertEqual(root.name(), 'set')
+        self.assertEqual(root.child_names(recursive=True), node().child_names(recursive=True))
+        self.assertEqual(root.child_count(recursive=True), 7)
+
+        self.assertEqual(root['F'].value(), 10.0)
+        self.assertEqual(root['group.servings'].value(), 4)
+        self.assertEqual(root['group.servings'].type(), int)
+        self.assertEqual(root['group.ünïcode'].value(), 'text')
+        self.assertEqual(root['group.servings'].absolute_name(), 'set.group.servings')
+        self.assertEqual(root[3][1].name(), 'ünïcode')
+        self.assertEqual(root['group.empty'].child_count(), 0)
+        self.assertEqual(root['group.servings'].index(), 0)
+
+        with self.assertRaises(ValueError):
+            root.child('group.missing')
+
+    def test_read_only(self):
+        root = self.tree.root()
+        self.assertFalse(root['m'].is_editable())
+        with self.assertRaises(AttributeError):
+            root['m'].set_value(1.0)
+        with self.assertRaises(AttributeError):
+            root.add_child('x', 1.0, float)
+
+    def test_attach(self):
+        other = pickle.loads(pickle.dumps(self.tree))
+        try:
+            self.assertEqual(other.name, self.tree.name)
+            self.assertEqual(other.root().to_dict(), self.tree.root().to_dict())
+
+            servings = pickle.loads(pickle.dumps(other.root()['group.servings']))
+            self.assertEqual(servings.absolute_name(), 'set.group.servings')
+        finally:
+            other.close()
+
+    def test_attach_untracked(self):
+        # the resource tracker of a worker process would unlink the block when the worker exits
+        with mock.patch.object(resource_tracker, 'register') as register:
+            other = SharedTree.attach(self.tree.name)
+        try:
+            register.assert_not_called()
+            self.assertEqual(other.root().to_dict(), self.tree.root().to_dict())
+        finally:
+            other.close()
+        self.assertIsNot(resource_tracker.register, register)
+
+    def test_unbound(self):
+        p = ParamGroupNode('unbound')
+        p.add_child(ParamNode(type=int, fget=Oven.temperature))
+        with self.assertRaises(TypeError):
+            SharedTree.freeze(p)
@@ -0,0 +1,103 @@
+from unittest import TestCase
+import os
+import pickle
+import tempfile
+
+from sparc.core import ParamNode, ParamGroupNode, SqliteStore, Interval
+
+
+def node():
+    p = ParamGroupNode('set')
+    p.add_child('m', 5.0, float)
+    p.add_child('a', 2.0, float)
+    p.add_child('F', '=m*a')
+    group = p.add_child('group')
+    group.add_child('servings', value=4, type=int, validator=Interval(0, 10))
+    group.add_child('sub').add_child('x', value='text', type=str)
+    return p
+
+
+class TestSqliteStore(TestCase):
+
+    def setUp(self):
+        self.store = SqliteStore(':memory:', name='set')
+        self.store.import_tree(node())
+
+    def tearDown(self):
+        self.store.close()
+
+    def test_access(self):
+        root = self.store.root()
+        self.assertEqual(root.name(), 'set')
+        self.assertEqual(root.child_names(), ['m', 'a', 'F', 'group'])
+        self.assertEqual(root.child_names(recursive=True), node().child_names(recursive=True))
+        self.assertEqual(root.child_count(recursive=True), 7)
+        self.assertEqual(root.to_dict(), node().to_dict())
+
+        self.assertEqual(root['F'].value(), 10.0)
+        self.assertEqual(root['group.sub.x'].absolute_name(), 'set.group.sub.x')
+        self.assertIs(root['group.sub.x'], root['group']['sub'][0])
+        self.assertEqual(root['group'].index(), 3)
+        self.assertEqual(root[-1].name(), 'group')
+
+        with self.assertRaises(ValueError):
+            root.child('group.missing')
+        with self.assertRaises(IndexError):
+            root.child(4)
+
+    def test_items(self):
+        self.assertEqual(list(self.store.items('group')), [('group.servings', 4), ('group.sub.x', 'text')])
+        self.assertEqual(len(list(self.store.items())), 5)
+
+    def test_write(self):
+        root = self.store.root()
+        root['m'].set_value(6.0)
+        with self.assertRaises(ValueError):
+            root['group.servings'].set_value(20)
+
+        with self.store.batch():
+            root['a'].set_value(3.0)
+            root['group.servings'].set_value(5)
+            self.assertEqual(dict(self.store.items())['a'], 3.0)
+
+        self.assertEqual(self.store.to_tree()['F'].value(), 18.0)
+        self.assertEqual(self.store.to_tree('group.servings').value(), 5)
+
+    def test_batch_copies(self):
+        root = self.store.root()
+        with self.store.batch():
+            root['a'].set_value(3.0)
+            root['group.sub.x'].set_value('changed')
+            root['group.servings'].set_validator(Interval(0, 20))
+            self.assertEqual(self.store.to_tree()['F'].value(), 15.0)
+            self.assertEqual(self.store.to_tree('group.servings').validator(), Interval(0, 20))
+            self.assertEqual(pickle.loads(pickle.dumps(root['a'])).value(), 3.0)
+            sub = root['group'].pop_child('sub')
+            self.assertEqual(sub['x'].value(), 'changed')
+        self.assertEqual(self.store.to_tree()['a'].value(), 3.0)
+
+    def test_structure(self):
+        root = self.store.root()
+        root.add_child('group.y', 1.5, float)
+        root['group'].add_child(ParamNode('z', 1, int))
+        self.assertEqual(root['group'].child_names(), ['servings', 'sub', 'y', 'z'])
+
+        with self.assertRaises(KeyError):
+            root.add_child('m', 1.0, float)
+
+        sub = root['group'].pop_child('sub')
+        self.assertEqual(sub['x'].value(), 'text')
+        root.remove_child('F')
+        self.assertEqual(root.child_names(recursive=True), ['m', 'a', 'group', 'group.servings', 'group.y', 'group.z'])
+        self.assertEqual(list(self.store.items('group.sub')), [])
+
+    def test_persistence(self):
+        filename = os.path.join(tempfile.mkdtemp(), 'params.db')
+        with SqliteStore(filename) as store:
+            store.import_tree(node())
+            store.root()['group.servings'].set_value(7)
+
+        with SqliteStore(filename) as store:
+            root = store.root()
+            self.assertEqual(root['group.servings'].value(), 7)
+            self.assertEqual(pickle.loads(pickle.dumps(root)).to_dict(), root.to_dict())
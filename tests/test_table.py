@@ -0,0 +1,78 @@
+from unittest import TestCase, skipUnless
+import io
+
+from sparc.core import ParamGroupNode, Interval, to_columns, from_columns, dump_csv, load_csv, to_array, from_array
+from sparc.core.table import HAVE_NUMPY
+
+
+def node(servings=4, milk=0.5, name='quiche'):
+    p = ParamGroupNode('recipe')
+    p.add_child('name', value=name, type=str)
+    ingredients = p.add_child('ingredients')
+    ingredients.add_child('servings', value=servings, type=int, validator=Interval(0, 10))
+    ingredients.add_child('milk', value=milk, type=float)
+    ingredients.add_child('vegan', value=False, type=bool)
+    ingredients.add_child('total', value='=servings * milk')
+    return p
+
+
+class TestTable(TestCase):
+
+    def setUp(self):
+        self.trees = [node(i, i / 10, f'variant, {i}') for i in range(5)]
+
+    def test_columns(self):
+        columns = to_columns(self.trees)
+        self.assertEqual(list(columns), ['name', 'ingredients.servings', 'ingredients.milk', 'ingredients.vegan'])
+        self.assertEqual(columns['ingredients.servings'], [0, 1, 2, 3, 4])
+
+        columns = to_columns(self.trees, expressions=True)
+        self.assertEqual(columns['ingredients.total'][2], 2 * 0.2)
+
+        trees = from_columns(columns, node())
+        self.assertEqual([tree.to_dict() for tree in trees], [tree.to_dict() for tree in self.trees])
+
+        with self.assertRaises(ValueError):
+            from_columns({'ingredients.servings': [1, 20]}, node())
+
+    def test_structure(self):
+        other = node()
+        other['ingredients'].remove_child('vegan')
+        other['ingredients'].add_child('eggs', value=False, type=bool)
+        with self.assertRaises(ValueError):
+            to_columns([self.trees[0], other])
+
+        trees = from_columns({'ingredients.servings': ['3', 4], 'ingredients.milk': [1, 2]}, node())
+        self.assertEqual([tree['ingredients.servings'].value() for tree in trees], [3, 4])
+        self.assertIs(type(trees[0]['ingredients.milk'].value()), float)
+        self.assertEqual(trees[1]['ingredients.total'].value(), 8.0)
+        with self.assertRaises(ValueError):
+            from_columns({'ingredients.eggs': [1]}, node())
+
+    def test_conversion(self):
+        trees = from_columns({'ingredients.vegan': ['False', 'True'], 'ingredients.servings': ['2', 3.0]}, node())
+        self.assertEqual([tree['ingredients.vegan'].value() for tree in trees], [False, True])
+        self.assertEqual([tree['ingredients.servings'].value() for tree in trees], [2, 3])
+        expected = node()
+        expected['ingredients.vegan'].set_value('False')
+        self.assertEqual(trees[0]['ingredients.vegan'].value(), expected['ingredients.vegan'].value())
+        with self.assertRaises(TypeError):
+            from_columns({'ingredients.milk': [0.5, object()]}, node())
+        with self.assertRaises(ValueError):
+            from_columns({'ingredients.servings': ['20']}, node())
+
+    def test_csv(self):
+        fp = io.StringIO(newline='')
+        dump_csv(self.trees, fp)
+        fp.seek(0)
+        trees = load_csv(fp, node())
+        self.assertEqual([tree.to_dict() for tree in trees], [tree.to_dict() for tree in self.trees])
+        self.assertEqual(trees[3]['name'].value(), 'variant, 3')
+        self.assertIs(trees[3]['ingredients.vegan'].value(), False)
+
+    @skipUnless(HAVE_NUMPY, 'requires NumPy')
+    def test_array(self):
+        table = to_array(self.trees)
+        self.assertEqual(table['ingredients.servings'].sum(), 10)
+        trees = from_array(table, node())
+        self.assertEqual([tree.to_dict() for tree in trees], [tree.to_dict() for tree in self.trees])